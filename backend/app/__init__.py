@@ -1,4 +1,5 @@
 import os
+import click
 from flask import Flask
 from sqlalchemy import BigInteger
 from sqlalchemy.ext.compiler import compiles
@@ -314,3 +315,173 @@ def register_cli(app):
         from app.seed import seed
         seed()
         print('Database reset and seeded.')
+
+    @app.cli.command('rederive-requests')
+    @click.option('--dry-run', is_flag=True, help='Report changes without writing them.')
+    @click.option('--chunk-size', default=1000, show_default=True, help='Requests per batch.')
+    def rederive_requests_command(dry_run, chunk_size):
+        from app.services.rederivation import rederive_open_requests
+        report = rederive_open_requests(chunk_size=chunk_size, dry_run=dry_run, detail_limit=0)
+        print(f'Scanned {report["scanned"]} open requests, {report["changed"]} changed '
+              f'({"dry run" if dry_run else "written"}) in {report["elapsed_seconds"]}s.')
+        for field, counts in report['transitions'].items():
+            for transition, n in sorted(counts.items()):
+                print(f'  {field}: {transition} ({n})')
+
+    @app.cli.command('backfill-action-holders')
+    @click.option('--chunk-size', default=1000, show_default=True, help='Requests per batch.')
+    def backfill_action_holders_command(chunk_size):
+        from app.services.action_holder import backfill_action_holders
+        changed = backfill_action_holders(chunk_size=chunk_size)
+        print(f'Action holder columns updated on {changed} requests.')
+
+    @app.cli.command('notification-worker')
+    @click.option('--batch-size', default=200, show_default=True, help='Outbox events per transaction.')
+    @click.option('--poll-interval', default=1.0, show_default=True, help='Seconds to sleep when the outbox is empty.')
+    @click.option('--once', is_flag=True, help='Exit once the outbox is empty.')
+    def notification_worker_command(batch_size, poll_interval, once):
+        from app.services.notification_outbox import run_worker
+        print(f'Notification worker started (batch size {batch_size}).', flush=True)
+        run_worker(batch_size=batch_size, poll_interval=poll_interval, once=once)
+
+    @app.cli.command('maintenance-worker')
+    @click.option('--poll-interval', default=30.0, show_default=True, help='Seconds between checks for due jobs.')
+    @click.option('--once', is_flag=True, help='Run every job once and exit.')
+    def maintenance_worker_command(poll_interval, once):
+        from app.services.maintenance import JOBS, run_maintenance
+        print(f'Maintenance worker started ({len(JOBS)} jobs).', flush=True)
+        run_maintenance(poll_interval=poll_interval, once=once)
+
+    @app.cli.command('reconcile-unread-counts')
+    def reconcile_unread_counts_command():
+        from app.services.unread_counter import reconcile_unread_counts
+        result = reconcile_unread_counts()
+        print(f'Checked {result["checked"]} unread counters, repaired {len(result["repaired"])}.')
+        for user_id in result['repaired']:
+            print(f'  user {user_id}')
+
+    @app.cli.command('reconcile-rollups')
+    def reconcile_rollups_command():
+        from app.services.dashboard_rollup import reconcile_rollups
+        report = reconcile_rollups()
+        for table, result in report.items():
+            print(f'{table}: rebuilt {result["groups"]} groups, {len(result["drifted"])} had drifted.')
+            for entry in result['drifted']:
+                key = {k: v for k, v in entry.items() if not k.startswith(('stored', 'actual'))}
+                print(f'  {key}: stored {entry["stored"]}, actual {entry["actual"]}'
+                      + (f' (value {entry["stored_value"]} vs {entry["actual_value"]})' if 'stored_value' in entry else ''))
+
+    @app.cli.command('archive-notifications')
+    @click.option('--batch-size', default=500, show_default=True, help='Notifications moved per transaction.')
+    def archive_notifications_command(batch_size):
+        from app.services.notification_retention import archive_notifications
+        result = archive_notifications(batch_size=batch_size)
+        print(f'Archived {result["archived"]} read notifications in {result["batches"]} batches.')
+        for notification_type, n in sorted(result['by_type'].items()):
+            print(f'  {notification_type}: {n}')
+
+    @app.cli.command('sweep-sla')
+    def sweep_sla_command():
+        from app.services.sla_sweeper import sweep_sla
+        result = sweep_sla()
+        print(f'Escalated {result["approvals"]} overdue approval steps and '
+              f'{result["advisories"]} overdue advisories; cleared {result["cleared"]} stale stamps.')
+
+    @app.cli.command('seed-holidays')
+    @click.option('--year', 'years', multiple=True, type=int, help='Year to add (repeatable); default last year to two years out.')
+    def seed_holidays_command(years):
+        from app.services.sla_calendar import default_holiday_years, seed_federal_holidays
+        added = seed_federal_holidays(years or default_holiday_years())
+        print(f'Added {added} federal holidays.')
+
+    @app.cli.command('recompute-due-dates')
+    def recompute_due_dates_command():
+        from app.services.sla_calendar import recompute_open_due_dates
+        counts = recompute_open_due_dates()
+        for table, n in counts.items():
+            print(f'  {table}: {n} due dates recomputed')
+
+    @app.cli.command('refresh-cycle-times')
+    def refresh_cycle_times_command():
+        from app.services.cycle_time import refresh_cycle_time_stats
+        result = refresh_cycle_time_stats()
+        print(f'Added {result["request_samples"]} request and {result["gate_samples"]} gate samples; '
+              f'recomputed {result["groups"]} stat groups.')
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        from app.services.request_search import rebuild_search_index
+        rebuild_search_index()
+        print('Request search index rebuilt.')
+
+    @app.cli.command('snapshot-dashboard')
+    def snapshot_dashboard_command():
+        from app.services.dashboard_snapshot import take_snapshot
+        print(f'Wrote {take_snapshot()} snapshot rows for today.')
+
+    @app.cli.command('backfill-snapshots')
+    @click.option('--days', default=90, show_default=True, help='Days before today to reconstruct.')
+    def backfill_snapshots_command(days):
+        from datetime import datetime, timedelta
+        from app.services.dashboard_snapshot import backfill_snapshots
+        result = backfill_snapshots(datetime.utcnow().date() - timedelta(days=days))
+        print(f'Backfilled {result["days"]} days ({result["rows"]} rows).')
+
+    @app.cli.command('notification-outbox-stats')
+    @click.option('--window', default=60, show_default=True, help='Minutes of deliveries to measure lag over.')
+    def notification_outbox_stats_command(window):
+        from app.services.notification_outbox import outbox_stats
+        stats = outbox_stats(window_minutes=window)
+
+        def seconds(key):
+            return '-' if stats[key] is None else f'{stats[key]}s'
+
+        print(f'Pending events: {stats["pending"]} (oldest {seconds("oldest_pending_seconds")})')
+        print(f'Delivered in last {window} min: {stats["delivered"]}, lag p50 {seconds("lag_p50_seconds")}, '
+              f'p95 {seconds("lag_p95_seconds")}, max {seconds("lag_max_seconds")}')
+
+    @app.cli.command('bench-checklist')
+    @click.option('--requests', 'count', default=10000, show_default=True, help='Synthetic requests to evaluate.')
+    def bench_checklist_command(count):
+        from app.benchmarks import bench_checklist_rules
+        result = bench_checklist_rules(count)
+        print(f'{result["requests"]} requests x {result["templates"]} templates ({result["rules"]} rules)')
+        print(f'  parse per evaluation: {result["parse_per_evaluation_seconds"]}s')
+        print(f'  checklist plan build: {result["plan_build_seconds"]}s')
+        print(f'  compiled predicates:  {result["compiled_seconds"]}s ({result["speedup"]}x)')
+        print(f'  results match: {result["results_match"]}')
+
+    @app.cli.command('bench-checklist-queries')
+    def bench_checklist_queries_command():
+        from app.benchmarks import bench_checklist_queries
+        result = bench_checklist_queries()
+        for run in result['runs']:
+            print(f'{run["templates"]:>4} templates: generate {run["generate_statements"]} statements '
+                  f'({run["generate_selects"]} selects), recalculate {run["recalculate_statements"]} '
+                  f'statements ({run["recalculate_selects"]} selects)')
+        print(f'Query count independent of template count: {result["constant"]}')
+        if not result['constant']:
+            raise SystemExit(1)
+
+    @app.cli.command('bench-dashboard')
+    @click.option('--size', 'sizes', multiple=True, type=int, help='Request count to test (repeatable); default 1k, 10k, 100k.')
+    @click.option('--repeat', default=5, show_default=True, help='Timed calls per size (median reported).')
+    def bench_dashboard_command(sizes, repeat):
+        from app.benchmarks import bench_dashboard
+        result = bench_dashboard(sizes=sizes or (1000, 10000, 100000), repeat=repeat)
+        print(f'{"requests":>10}{"current ms":>14}{"statements":>12}{"legacy ms":>14}{"statements":>12}')
+        for run in result['runs']:
+            print(f'{run["requests"]:>10}{run["current_ms"]:>14}{run["current_statements"]:>12}'
+                  f'{run["legacy_ms"]:>14}{run["legacy_statements"]:>12}')
+
+    @app.cli.command('bench-request-queries')
+    def bench_request_queries_command():
+        from app.benchmarks import bench_request_list_queries
+        result = bench_request_list_queries()
+        sizes = result['sizes']
+        print('endpoint'.ljust(48) + ''.join(f'{n:>8} rows' for n in sizes))
+        for path, counts in result['endpoints'].items():
+            print(path.ljust(48) + ''.join(f'{counts[n]:>13}' for n in sizes))
+        print(f'Query count independent of row count: {result["constant"]}')
+        if not result['constant']:
+            raise SystemExit(1)
@@ -14,6 +14,7 @@ def register_blueprints(app):
     from app.api.dashboard import dashboard_bp
     from app.api.admin import admin_bp
     from app.api.notifications import notifications_bp
+    from app.api.stream import stream_bp
 
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(requests_bp, url_prefix='/api/requests')
@@ -30,3 +31,4 @@ def register_blueprints(app):
     app.register_blueprint(dashboard_bp, url_prefix='/api/dashboard')
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
     app.register_blueprint(notifications_bp, url_prefix='/api/notifications')
+    app.register_blueprint(stream_bp, url_prefix='/api/stream')
@@ -1,7 +1,8 @@
 import json
 import os
 import tempfile
-from flask import Blueprint, request, jsonify
+from datetime import date
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt
 from app.extensions import db
 from app.models.threshold import ThresholdConfig
@@ -11,6 +12,14 @@ from app.models.user import User
 from app.models.intake_path import IntakePath
 from app.models.advisory_trigger import AdvisoryTriggerRule
 from app.models.advisory_pipeline_config import AdvisoryPipelineConfig
+from app.models.holiday import Holiday
+from app.services.rules_cache import bump_rules_version, cache_stats
+from app.services.decision_table import get_decision_report
+from app.services.rederivation import rederive_open_requests, DEFAULT_CHUNK_SIZE
+from app.services.checklist import preview_rule_impact, apply_template_to_open_requests
+from app.services.notification_outbox import outbox_stats
+from app.services.sla_calendar import recompute_open_due_dates
+from app.services.response_cache import cached_response, response_cache_stats
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -116,12 +125,72 @@ def update_threshold(threshold_id):
     if 'description' in data:
         threshold.description = data['description']
 
+    bump_rules_version()
     db.session.commit()
     return jsonify(threshold.to_dict())
 
 
+@admin_bp.route('/rules-cache', methods=['GET'])
+@jwt_required()
+def rules_cache_stats():
+    """Hit/miss counters for the compiled rule caches in this worker process.
+    ---
+    tags:
+      - Admin
+    responses:
+      200:
+        description: Current rules version and per-cache hit/miss counts
+        schema:
+          type: object
+          properties:
+            rules_version:
+              type: integer
+            caches:
+              type: object
+      403:
+        description: Admin access required
+    """
+    err = _require_admin()
+    if err:
+        return err
+
+    return jsonify(cache_stats())
+
+
+@admin_bp.route('/response-cache', methods=['GET'])
+@jwt_required()
+def response_cache():
+    """Response cache backend state and per-endpoint hit/miss/304 counters.
+    ---
+    tags:
+      - Admin
+    responses:
+      200:
+        description: Cache backend, entry count, table generations and endpoint counters
+        schema:
+          type: object
+          properties:
+            backend:
+              type: string
+            entries:
+              type: integer
+            generations:
+              type: object
+            endpoints:
+              type: object
+      403:
+        description: Admin access required
+    """
+    err = _require_admin()
+    if err:
+        return err
+
+    return jsonify(response_cache_stats())
+
+
 @admin_bp.route('/templates', methods=['GET'])
 @jwt_required()
+@cached_response(ApprovalTemplate, ApprovalTemplateStep)
 def list_templates():
     """List all approval templates (pipeline definitions).
     ---
@@ -245,6 +314,7 @@ def update_template_steps(template_id):
         if sid not in seen_ids:
             db.session.delete(step)
 
+    bump_rules_version()
     db.session.commit()
 
     # Return updated template
@@ -278,6 +348,7 @@ GATE_CATALOG = [
 
 @admin_bp.route('/gate-catalog', methods=['GET'])
 @jwt_required()
+@cached_response()
 def gate_catalog():
     """Return catalog of available gate types for template configuration.
     ---
@@ -386,6 +457,122 @@ def list_document_rules():
     })
 
 
+@admin_bp.route('/document-rules/preview', methods=['POST'])
+@jwt_required()
+def preview_document_rule():
+    """Count the open requests a document rule change would affect, without saving. Requires admin.
+    ---
+    tags:
+      - Admin
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            document_template_id:
+              type: integer
+              description: Template the rule belongs to (defaults to the rule's template when rule_id is given)
+            rule_id:
+              type: integer
+              description: Existing rule being edited or deleted
+            conditions:
+              type: object
+              description: Proposed JSON conditions (default with rule_id is the rule's current conditions)
+            delete:
+              type: boolean
+              default: false
+              description: Preview deleting rule_id
+    responses:
+      200:
+        description: Impact counts over open requests
+        schema:
+          type: object
+          properties:
+            open_requests:
+              type: integer
+            rule_matches:
+              type: integer
+            required_after:
+              type: integer
+            newly_required:
+              type: integer
+            no_longer_required:
+              type: integer
+      400:
+        description: Missing template or a condition that cannot be evaluated in SQL
+      403:
+        description: Admin access required
+      404:
+        description: Rule not found
+    """
+    err = _require_admin()
+    if err:
+        return err
+
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+
+    rule_id = data.get('rule_id')
+    template_id = data.get('document_template_id')
+    if rule_id:
+        rule = DocumentRule.query.get_or_404(rule_id)
+        template_id = template_id or rule.document_template_id
+    if not template_id:
+        return jsonify({'error': 'document_template_id or rule_id is required'}), 400
+
+    impact = preview_rule_impact(
+        template_id,
+        conditions=data.get('conditions'),
+        rule_id=rule_id,
+        delete=bool(data.get('delete')),
+    )
+    return jsonify(impact)
+
+
+@admin_bp.route('/document-templates/<int:template_id>/apply', methods=['POST'])
+@jwt_required()
+def apply_document_template(template_id):
+    """Re-apply a document template's rules to all open requests in bulk. Requires admin.
+    ---
+    tags:
+      - Admin
+    parameters:
+      - name: template_id
+        in: path
+        type: integer
+        required: true
+    responses:
+      200:
+        description: Number of checklist rows added, removed and created
+        schema:
+          type: object
+          properties:
+            added:
+              type: integer
+            removed:
+              type: integer
+            created:
+              type: integer
+      400:
+        description: A rule cannot be evaluated in SQL
+      403:
+        description: Admin access required
+      404:
+        description: Template not found
+    """
+    err = _require_admin()
+    if err:
+        return err
+
+    result = apply_template_to_open_requests(template_id)
+    if result is None:
+        return jsonify({'error': 'Template not found'}), 404
+    return jsonify(result)
+
+
 @admin_bp.route('/document-rules', methods=['POST'])
 @jwt_required()
 def create_document_rule():
@@ -439,6 +626,7 @@ def create_document_rule():
         priority=data.get('priority', 0),
     )
     db.session.add(rule)
+    bump_rules_version()
     db.session.commit()
 
     return jsonify(rule.to_dict()), 201
@@ -498,6 +686,7 @@ def update_document_rule(rule_id):
     if 'priority' in data:
         rule.priority = data['priority']
 
+    bump_rules_version()
     db.session.commit()
     return jsonify(rule.to_dict())
 
@@ -535,6 +724,7 @@ def delete_document_rule(rule_id):
 
     rule = DocumentRule.query.get_or_404(rule_id)
     db.session.delete(rule)
+    bump_rules_version()
     db.session.commit()
 
     return jsonify({'success': True, 'message': 'Rule deleted'})
@@ -598,6 +788,54 @@ def list_intake_paths():
     })
 
 
+@admin_bp.route('/intake-paths/decision-table', methods=['GET'])
+@jwt_required()
+def decision_table_report():
+    """Ambiguity report for the precomputed intake decision table.
+    ---
+    tags:
+      - Admin
+    responses:
+      200:
+        description: Table metadata with ties, unreachable paths and fallthrough groups
+        schema:
+          type: object
+          properties:
+            fingerprint:
+              type: string
+            entry_count:
+              type: integer
+            stored:
+              type: boolean
+            report:
+              type: object
+              properties:
+                tie_count:
+                  type: integer
+                ties:
+                  type: array
+                  items:
+                    type: object
+                unreachable_paths:
+                  type: array
+                  items:
+                    type: string
+                fallthrough_count:
+                  type: integer
+                fallthrough:
+                  type: array
+                  items:
+                    type: object
+      403:
+        description: Admin access required
+    """
+    err = _require_admin()
+    if err:
+        return err
+
+    return jsonify(get_decision_report())
+
+
 # ---------------------------------------------------------------------------
 # Advisory Trigger Rules
 # ---------------------------------------------------------------------------
@@ -804,6 +1042,11 @@ def import_rules():
         type: file
         required: true
         description: Excel workbook (.xlsx) with rules sheets
+      - name: rederive
+        in: formData
+        type: boolean
+        default: true
+        description: Re-derive open requests against the imported rules
     responses:
       200:
         description: Import results
@@ -841,7 +1084,255 @@ def import_rules():
         from app.services.excel_importer import import_all
         result = import_all(tmp_path)
         if 'error' in result:
+            db.session.rollback()
             return jsonify(result), 400
-        return jsonify(result)
+        db.session.commit()
     finally:
         os.unlink(tmp_path)
+
+    # Bring open requests in line with the new rules
+    if request.form.get('rederive', 'true').lower() != 'false':
+        claims = get_jwt()
+        result['rederivation'] = rederive_open_requests(actor=claims.get('name') or 'System')
+    return jsonify(result)
+
+
+@admin_bp.route('/rederive', methods=['POST'])
+@jwt_required()
+def rederive_requests():
+    """Re-derive classification for all open requests against the current rules. Requires admin.
+    ---
+    tags:
+      - Admin
+    parameters:
+      - name: body
+        in: body
+        required: false
+        schema:
+          type: object
+          properties:
+            dry_run:
+              type: boolean
+              default: false
+              description: Report what would change without writing
+            chunk_size:
+              type: integer
+              default: 1000
+    responses:
+      200:
+        description: Diff report of changed tiers, pipelines and acquisition types
+        schema:
+          type: object
+          properties:
+            scanned:
+              type: integer
+            changed:
+              type: integer
+            tier_changes:
+              type: integer
+            pipeline_changes:
+              type: integer
+            acquisition_type_changes:
+              type: integer
+            transitions:
+              type: object
+            requests:
+              type: array
+              items:
+                type: object
+      400:
+        description: Invalid chunk_size
+      403:
+        description: Admin access required
+    """
+    err = _require_admin()
+    if err:
+        return err
+
+    data = request.get_json(silent=True) or {}
+    try:
+        chunk_size = int(data.get('chunk_size', DEFAULT_CHUNK_SIZE))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'chunk_size must be an integer'}), 400
+    if chunk_size < 1:
+        return jsonify({'error': 'chunk_size must be positive'}), 400
+
+    claims = get_jwt()
+    report = rederive_open_requests(
+        chunk_size=chunk_size,
+        dry_run=bool(data.get('dry_run')),
+        actor=claims.get('name') or 'System',
+    )
+    return jsonify(report)
+
+
+@admin_bp.route('/notification-outbox', methods=['GET'])
+@jwt_required()
+def notification_outbox():
+    """Notification outbox backlog and enqueue-to-delivery lag. Requires admin.
+    ---
+    tags:
+      - Admin
+    parameters:
+      - name: window_minutes
+        in: query
+        type: integer
+        required: false
+        default: 60
+        description: Lag statistics cover events delivered in this window
+    responses:
+      200:
+        description: Outbox statistics
+        schema:
+          type: object
+          properties:
+            delivery_mode:
+              type: string
+              enum: [inline, worker]
+            pending:
+              type: integer
+            oldest_pending_seconds:
+              type: number
+            window_minutes:
+              type: integer
+            delivered:
+              type: integer
+            lag_p50_seconds:
+              type: number
+            lag_p95_seconds:
+              type: number
+            lag_max_seconds:
+              type: number
+      403:
+        description: Admin access required
+    """
+    err = _require_admin()
+    if err:
+        return err
+
+    window = max(request.args.get('window_minutes', 60, type=int), 1)
+    stats = outbox_stats(window_minutes=window)
+    stats['delivery_mode'] = current_app.config.get('NOTIFICATION_DELIVERY', 'inline')
+    return jsonify(stats)
+
+
+@admin_bp.route('/holidays', methods=['GET'])
+@jwt_required()
+def list_holidays():
+    """List the holidays skipped by the SLA calendar.
+    ---
+    tags:
+      - Admin
+    parameters:
+      - name: year
+        in: query
+        type: integer
+        required: false
+    responses:
+      200:
+        description: Holidays in date order
+        schema:
+          type: array
+          items:
+            type: object
+            properties:
+              id:
+                type: integer
+              date:
+                type: string
+                format: date
+              name:
+                type: string
+              is_federal:
+                type: boolean
+    """
+    query = Holiday.query.order_by(Holiday.date)
+    year = request.args.get('year', type=int)
+    if year:
+        query = query.filter(Holiday.date >= date(year, 1, 1), Holiday.date <= date(year, 12, 31))
+    return jsonify([h.to_dict() for h in query.all()])
+
+
+@admin_bp.route('/holidays', methods=['POST'])
+@jwt_required()
+def create_holiday():
+    """Add a holiday to the SLA calendar and re-date open work. Requires admin.
+    ---
+    tags:
+      - Admin
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          required: [date, name]
+          properties:
+            date:
+              type: string
+              format: date
+            name:
+              type: string
+    responses:
+      201:
+        description: Holiday created; open due dates recomputed
+      400:
+        description: Missing or invalid date/name, or the date is already a holiday
+      403:
+        description: Admin access required
+    """
+    err = _require_admin()
+    if err:
+        return err
+
+    data = request.get_json() or {}
+    name = (data.get('name') or '').strip()
+    try:
+        day = date.fromisoformat(data.get('date') or '')
+    except ValueError:
+        return jsonify({'error': 'date must be YYYY-MM-DD'}), 400
+    if not name:
+        return jsonify({'error': 'name is required'}), 400
+    if Holiday.query.filter_by(date=day).first():
+        return jsonify({'error': f'{day.isoformat()} is already a holiday'}), 400
+
+    holiday = Holiday(date=day, name=name, is_federal=False)
+    db.session.add(holiday)
+    bump_rules_version()
+    db.session.commit()
+    recompute_open_due_dates()
+
+    return jsonify(holiday.to_dict()), 201
+
+
+@admin_bp.route('/holidays/<int:holiday_id>', methods=['DELETE'])
+@jwt_required()
+def delete_holiday(holiday_id):
+    """Remove a holiday from the SLA calendar and re-date open work. Requires admin.
+    ---
+    tags:
+      - Admin
+    parameters:
+      - name: holiday_id
+        in: path
+        type: integer
+        required: true
+    responses:
+      200:
+        description: Holiday deleted; open due dates recomputed
+      403:
+        description: Admin access required
+      404:
+        description: Holiday not found
+    """
+    err = _require_admin()
+    if err:
+        return err
+
+    holiday = Holiday.query.get_or_404(holiday_id)
+    db.session.delete(holiday)
+    bump_rules_version()
+    db.session.commit()
+    recompute_open_due_dates()
+
+    return jsonify({'success': True, 'message': 'Holiday deleted'})
@@ -7,6 +7,8 @@ from app.extensions import db
 from app.models.advisory import AdvisoryInput
 from app.models.request import AcquisitionRequest
 from app.models.activity import ActivityLog
+from app.services.action_holder import ROLE_TEAM_MAP, sync_advisories
+from app.services.event_bus import publish_queue_changed
 from app.services.notifications import notify_requestor, notify_users_by_team
 
 UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data', 'advisory_uploads')
@@ -50,17 +52,7 @@ def advisory_queue():
     user_team = claims.get('team', '')
     user_role = claims.get('role', '')
 
-    # Map roles to teams for advisory routing
-    role_team_map = {
-        'scrm': 'scrm',
-        'sb': 'sbo',
-        'cto': 'cio',
-        'cio': 'cio',
-        'legal': 'legal',
-        'budget': 'fm',
-    }
-
-    team = role_team_map.get(user_role, '') or user_team
+    team = ROLE_TEAM_MAP.get(user_role, '') or user_team
 
     query = AdvisoryInput.query.filter(
         AdvisoryInput.status.in_(['requested', 'in_review', 'info_requested'])
@@ -227,6 +219,9 @@ def submit_advisory(advisory_id):
 
         req = AcquisitionRequest.query.get(adv.request_id)
         title_name = req.title if req else f'Request #{adv.request_id}'
+        if req:
+            sync_advisories(req)
+        publish_queue_changed(team=adv.team)
         notify_requestor(
             adv.request_id, 'info_requested',
             f'{adv.team.upper()} team needs more information',
@@ -266,6 +261,9 @@ def submit_advisory(advisory_id):
         if notes_field and adv.findings:
             setattr(req, notes_field, adv.findings)
 
+        sync_advisories(req)
+    publish_queue_changed(team=adv.team)
+
     log = ActivityLog(
         request_id=adv.request_id,
         activity_type='advisory_completed',
@@ -368,6 +366,9 @@ def respond_to_info_request(advisory_id):
     # Notify the advisory team that info has been provided
     req = AcquisitionRequest.query.get(adv.request_id)
     title_name = req.title if req else f'Request #{adv.request_id}'
+    if req:
+        sync_advisories(req)
+    publish_queue_changed(team=adv.team)
     file_note = f' (with attached file: {adv.info_response_filename})' if adv.info_response_filename else ''
     notify_users_by_team(
         adv.team, adv.request_id, 'info_provided',
@@ -459,5 +460,11 @@ def update_advisory(advisory_id):
     if data.get('status') in ('complete_no_issues', 'complete_issues_found', 'waived'):
         adv.completed_date = datetime.utcnow()
 
+    if 'status' in data:
+        req = AcquisitionRequest.query.get(adv.request_id)
+        if req:
+            sync_advisories(req)
+        publish_queue_changed(team=adv.team)
+
     db.session.commit()
     return jsonify(adv.to_dict())
@@ -1,3 +1,4 @@
+from datetime import datetime
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.models.approval import ApprovalStep
@@ -5,6 +6,7 @@ from app.models.request import AcquisitionRequest
 from app.models.user import User
 from app.services.workflow import process_approval, get_approval_status
 from app.services.gate_checker import check_gate_readiness
+from app.services.sla_calendar import business_days_between
 
 approvals_bp = Blueprint('approvals', __name__)
 
@@ -31,6 +33,9 @@ def approval_queue():
                     $ref: '#/definitions/ApprovalStep'
                   request:
                     $ref: '#/definitions/AcquisitionRequest'
+                  business_days_waiting:
+                    type: integer
+                    description: Business days since the step was activated (weekends and holidays excluded)
             count:
               type: integer
             role:
@@ -47,12 +52,18 @@ def approval_queue():
 
     steps = query.all()
 
+    now = datetime.utcnow()
+    waiting = business_days_between(
+        [s.activated_at or now for s in steps], [now] * len(steps)
+    )
+
     # Enrich with request info
     items = []
-    for step in steps:
+    for step, days in zip(steps, waiting):
         req = AcquisitionRequest.query.get(step.request_id)
         items.append({
             'step': step.to_dict(),
+            'business_days_waiting': days,
             'request': {
                 'id': req.id,
                 'request_number': req.request_number,
@@ -1,5 +1,7 @@
+from datetime import date, datetime, timedelta
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
+from sqlalchemy.orm import selectinload
 from app.extensions import db
 from app.models.request import AcquisitionRequest
 from app.models.approval import ApprovalStep
@@ -8,12 +10,49 @@ from app.models.loa import LineOfAccounting
 from app.models.execution import CLINExecutionRequest
 from app.models.forecast import DemandForecast
 from app.models.clin import AcquisitionCLIN
+from app.models.cycle_time import CycleTimeStat
+from app.models.dashboard_rollup import AdvisoryRollup, ApprovalRollup, RequestRollup
+from app.models.dashboard_snapshot import DashboardSnapshot
+from app.services.cycle_time import ALL_TIERS
+from app.services.dashboard_rollup import NO_KEY, PIPELINE_GATES, key_column
+from app.services.dashboard_snapshot import METRICS
+from app.services.response_cache import cached_response
+from app.services.request_serializer import load_requests
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
 
+# Statuses reported in by_status, in display order
+DASHBOARD_STATUSES = (
+    'draft', 'submitted', 'iss_review', 'asr_review', 'finance_review',
+    'ko_review', 'legal_review', 'cio_approval', 'senior_review',
+    'approved', 'awarded', 'closed', 'cancelled', 'returned',
+)
+
+
+# Submitted but not yet awarded: value still to be committed against LOAs
+IN_PIPELINE_STATUSES = (
+    'submitted', 'iss_review', 'asr_review', 'finance_review', 'ko_review',
+    'legal_review', 'cio_approval', 'senior_review', 'approved',
+)
+
+
+def _count(model, *criteria):
+    """COUNT(*) of `model` rows matching `criteria`, as a scalar subquery."""
+    return db.select(db.func.count()).select_from(model).where(*criteria).scalar_subquery()
+
+
+def _total(column, *criteria):
+    """SUM of a rollup column over the groups matching `criteria`, as a scalar subquery."""
+    return db.select(db.func.coalesce(db.func.sum(column), 0)).where(*criteria).scalar_subquery()
+
+
 @dashboard_bp.route('', methods=['GET'])
 @jwt_required()
+@cached_response(
+    RequestRollup, ApprovalRollup, AdvisoryRollup, ApprovalStep, AdvisoryInput,
+    CLINExecutionRequest, DemandForecast, ttl=60,
+)
 def main_dashboard():
     """Main dashboard metrics (request counts, approvals, advisories, executions, forecasts).
     ---
@@ -50,6 +89,8 @@ def main_dashboard():
               properties:
                 pending:
                   type: integer
+                overdue:
+                  type: integer
             executions:
               type: object
               properties:
@@ -61,64 +102,53 @@ def main_dashboard():
                 open:
                   type: integer
     """
-    # Request counts by status
-    total = AcquisitionRequest.query.count()
+    now = datetime.utcnow()
+
+    # Requests: the rollup groups summed over (status, type, tier) and folded
+    # into every breakdown
+    groups = db.session.query(
+        key_column(RequestRollup.status),
+        key_column(RequestRollup.derived_acquisition_type),
+        key_column(RequestRollup.derived_tier),
+        db.func.sum(RequestRollup.request_count),
+        db.func.sum(RequestRollup.total_value),
+    ).filter(RequestRollup.request_count != 0).group_by(
+        RequestRollup.status,
+        RequestRollup.derived_acquisition_type,
+        RequestRollup.derived_tier,
+    ).all()
+
+    total = 0
+    total_value = 0
     by_status = {}
-    for status in ['draft', 'submitted', 'iss_review', 'asr_review', 'finance_review',
-                    'ko_review', 'legal_review', 'cio_approval', 'senior_review',
-                    'approved', 'awarded', 'closed', 'cancelled', 'returned']:
-        count = AcquisitionRequest.query.filter_by(status=status).count()
-        if count > 0:
-            by_status[status] = count
-
-    # Requests by type
     by_type = {}
-    types = db.session.query(
-        AcquisitionRequest.derived_acquisition_type,
-        db.func.count(AcquisitionRequest.id)
-    ).filter(
-        AcquisitionRequest.derived_acquisition_type.isnot(None)
-    ).group_by(AcquisitionRequest.derived_acquisition_type).all()
-    for acq_type, count in types:
-        by_type[acq_type] = count
-
-    # Requests by tier
     by_tier = {}
-    tiers = db.session.query(
-        AcquisitionRequest.derived_tier,
-        db.func.count(AcquisitionRequest.id)
-    ).filter(
-        AcquisitionRequest.derived_tier.isnot(None)
-    ).group_by(AcquisitionRequest.derived_tier).all()
-    for tier, count in tiers:
-        by_tier[tier] = count
-
-    # Total value
-    total_value = db.session.query(
-        db.func.coalesce(db.func.sum(AcquisitionRequest.estimated_value), 0)
-    ).scalar()
-
-    # Active approvals
-    active_approvals = ApprovalStep.query.filter_by(status='active').count()
-    overdue_approvals = sum(
-        1 for s in ApprovalStep.query.filter_by(status='active').all()
-        if s.is_overdue
-    )
-
-    # Pending advisories
-    pending_advisories = AdvisoryInput.query.filter(
-        AdvisoryInput.status.in_(['requested', 'in_review'])
-    ).count()
-
-    # Execution requests
-    active_executions = CLINExecutionRequest.query.filter(
-        CLINExecutionRequest.status.notin_(['complete', 'cancelled', 'rejected', 'draft'])
-    ).count()
-
-    # Forecasts
-    open_forecasts = DemandForecast.query.filter(
-        DemandForecast.status.in_(['forecasted', 'acknowledged', 'funded'])
-    ).count()
+    for status, acq_type, tier, count, value in groups:
+        total += count
+        total_value += value
+        if status in DASHBOARD_STATUSES:
+            by_status[status] = by_status.get(status, 0) + count
+        if acq_type is not None:
+            by_type[acq_type] = by_type.get(acq_type, 0) + count
+        if tier is not None:
+            by_tier[tier] = by_tier.get(tier, 0) + count
+    by_status = {status: by_status[status] for status in DASHBOARD_STATUSES if status in by_status}
+
+    # Everything else in one statement of scalar subqueries: active and
+    # pending counts from the rollups, overdue (past due_date) from the
+    # (status, due_date) indexes
+    pending_statuses = ['requested', 'in_review']
+    pending = AdvisoryInput.status.in_(pending_statuses)
+    counts = db.session.query(
+        _total(ApprovalRollup.step_count, ApprovalRollup.status == 'active'),
+        _count(ApprovalStep, ApprovalStep.status == 'active', ApprovalStep.due_date < now),
+        _total(AdvisoryRollup.input_count, AdvisoryRollup.status.in_(pending_statuses)),
+        _count(AdvisoryInput, pending, AdvisoryInput.due_date < now),
+        _count(CLINExecutionRequest, CLINExecutionRequest.status.notin_(['complete', 'cancelled', 'rejected', 'draft'])),
+        _count(DemandForecast, DemandForecast.status.in_(['forecasted', 'acknowledged', 'funded'])),
+    ).one()
+    (active_approvals, overdue_approvals, pending_advisories, overdue_advisories,
+     active_executions, open_forecasts) = counts
 
     return jsonify({
         'requests': {
@@ -134,6 +164,7 @@ def main_dashboard():
         },
         'advisories': {
             'pending': pending_advisories,
+            'overdue': overdue_advisories,
         },
         'executions': {
             'active': active_executions,
@@ -146,14 +177,15 @@ def main_dashboard():
 
 @dashboard_bp.route('/pipeline', methods=['GET'])
 @jwt_required()
+@cached_response(RequestRollup)
 def pipeline_dashboard():
-    """Gate flow pipeline data showing requests at each stage.
+    """Gate flow pipeline data: request count and value at each stage.
     ---
     tags:
       - Dashboard
     responses:
       200:
-        description: Pipeline funnel data
+        description: Pipeline funnel data (one entry per gate; request lists come from /pipeline/{gate}/requests)
         schema:
           type: object
           properties:
@@ -170,62 +202,137 @@ def pipeline_dashboard():
                     type: integer
                   total_value:
                     type: number
-                  requests:
-                    type: array
-                    items:
-                      $ref: '#/definitions/AcquisitionRequest'
     """
-    # Requests grouped by pipeline status
-    pipeline_data = []
+    # One aggregate over the request rollup
+    totals = {
+        status: (count, value) for status, count, value in db.session.query(
+            RequestRollup.status,
+            db.func.sum(RequestRollup.request_count),
+            db.func.sum(RequestRollup.total_value),
+        ).filter(RequestRollup.status.in_([g for g, _ in PIPELINE_GATES])).group_by(RequestRollup.status)
+    }
 
-    # Define pipeline gates
-    gates = [
-        ('draft', 'Draft'),
-        ('submitted', 'Submitted'),
-        ('iss_review', 'ISS Review'),
-        ('asr_review', 'ASR Review'),
-        ('finance_review', 'Finance'),
-        ('ko_review', 'KO Review'),
-        ('legal_review', 'Legal'),
-        ('cio_approval', 'CIO'),
-        ('senior_review', 'Senior'),
-        ('approved', 'Approved'),
-        ('awarded', 'Awarded'),
-    ]
-
-    for status_key, label in gates:
-        requests_at_gate = AcquisitionRequest.query.filter_by(status=status_key).all()
-        gate_data = {
+    pipeline_data = []
+    for status_key, label in PIPELINE_GATES:
+        count, total_value = totals.get(status_key, (0, 0))
+        pipeline_data.append({
             'gate': status_key,
             'label': label,
-            'count': len(requests_at_gate),
-            'total_value': sum(r.estimated_value or 0 for r in requests_at_gate),
-            'requests': [{
-                'id': r.id,
-                'request_number': r.request_number,
-                'title': r.title,
-                'estimated_value': r.estimated_value,
-                'derived_tier': r.derived_tier,
-                'derived_pipeline': r.derived_pipeline,
-            } for r in requests_at_gate],
-        }
-        pipeline_data.append(gate_data)
+            'count': count,
+            'total_value': total_value,
+        })
 
     return jsonify({
         'pipeline': pipeline_data,
     })
 
 
+@dashboard_bp.route('/pipeline/<gate>/requests', methods=['GET'])
+@jwt_required()
+@cached_response(AcquisitionRequest)
+def pipeline_gate_requests(gate):
+    """Paginated requests at one pipeline gate, newest first.
+    ---
+    tags:
+      - Dashboard
+    parameters:
+      - name: gate
+        in: path
+        type: string
+        required: true
+        description: Gate key from /api/dashboard/pipeline (request status)
+      - name: page
+        in: query
+        type: integer
+        default: 1
+      - name: per_page
+        in: query
+        type: integer
+        default: 25
+        description: Max 100
+    responses:
+      200:
+        description: One page of requests at the gate
+        schema:
+          type: object
+          properties:
+            gate:
+              type: string
+            requests:
+              type: array
+              items:
+                type: object
+                properties:
+                  id:
+                    type: integer
+                  request_number:
+                    type: string
+                  title:
+                    type: string
+                  estimated_value:
+                    type: number
+                  derived_tier:
+                    type: string
+                  derived_pipeline:
+                    type: string
+            total:
+              type: integer
+            page:
+              type: integer
+            pages:
+              type: integer
+            per_page:
+              type: integer
+      404:
+        description: Unknown gate
+    """
+    if gate not in dict(PIPELINE_GATES):
+        return jsonify({'error': f'Unknown pipeline gate: {gate}'}), 404
+
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 25, type=int)
+    per_page = min(per_page, 100)
+
+    # Only the displayed columns, off the (status, created_at) index
+    query = db.session.query(
+        AcquisitionRequest.id,
+        AcquisitionRequest.request_number,
+        AcquisitionRequest.title,
+        AcquisitionRequest.estimated_value,
+        AcquisitionRequest.derived_tier,
+        AcquisitionRequest.derived_pipeline,
+    ).filter(AcquisitionRequest.status == gate).order_by(
+        AcquisitionRequest.created_at.desc(), AcquisitionRequest.id.desc()
+    )
+    paginated = query.paginate(page=page, per_page=per_page, error_out=False)
+
+    return jsonify({
+        'gate': gate,
+        'requests': [row._asdict() for row in paginated.items],
+        'total': paginated.total,
+        'page': paginated.page,
+        'pages': paginated.pages,
+        'per_page': per_page,
+    })
+
+
 @dashboard_bp.route('/cycle-time', methods=['GET'])
 @jwt_required()
+@cached_response(CycleTimeStat, RequestRollup)
 def cycle_time():
-    """Cycle time analytics by pipeline type.
+    """Cycle time analytics by pipeline, tier and gate.
     ---
     tags:
       - Dashboard
+    description: >
+      Reads the cycle_time_stats table, which the maintenance worker
+      refreshes from approval step and activity log timestamps
+      (`flask refresh-cycle-times`). Request cycles run from first
+      submission to full approval; gate dwell from step activation to
+      decision. Throughput counts completions in the last 28 days.
     responses:
       200:
-        description: Average processing time by pipeline type
+        description: Cycle time percentiles and throughput
         schema:
           type: object
           properties:
@@ -238,42 +345,168 @@ def cycle_time():
                     type: string
                   avg_days:
                     type: integer
+                  avg_business_days:
+                    type: integer
+                    description: Same average counted in business days (weekends and holidays excluded)
+                  p50_days:
+                    type: number
+                  p90_days:
+                    type: number
+                  p99_days:
+                    type: number
+                  completed:
+                    type: integer
+                    description: Cycle-time samples (fully approved requests)
+                  throughput_per_week:
+                    type: number
                   total_requests:
                     type: integer
+            by_tier:
+              type: array
+              items:
+                type: object
+            gates:
+              type: array
+              items:
+                type: object
+                description: Dwell time per pipeline and gate, across tiers
+            refreshed_at:
+              type: string
+              format: date-time
     """
-    from sqlalchemy import func
-    pipelines = db.session.query(
-        AcquisitionRequest.derived_pipeline,
-        func.count(AcquisitionRequest.id),
-    ).filter(
-        AcquisitionRequest.derived_pipeline.isnot(None)
-    ).group_by(AcquisitionRequest.derived_pipeline).all()
+    stats = CycleTimeStat.query.order_by(
+        CycleTimeStat.kind, CycleTimeStat.pipeline, CycleTimeStat.tier, CycleTimeStat.gate
+    ).all()
+    requests_by_pipeline = dict(db.session.query(
+        key_column(RequestRollup.derived_pipeline), db.func.sum(RequestRollup.request_count),
+    ).filter(RequestRollup.derived_pipeline != NO_KEY).group_by(RequestRollup.derived_pipeline).all())
 
+    pipeline_stats = {s.pipeline: s for s in stats if s.kind == 'request' and s.tier == ALL_TIERS}
+    refreshed_at = max((s.refreshed_at for s in stats if s.refreshed_at), default=None)
     result = []
-    for pipeline_type, count in pipelines:
-        # Calculate average days in pipeline (created_at to updated_at)
-        reqs = AcquisitionRequest.query.filter_by(derived_pipeline=pipeline_type).all()
-        total_days = 0
-        measured = 0
-        for r in reqs:
-            if r.created_at and r.updated_at and r.status not in ('draft',):
-                delta = (r.updated_at - r.created_at).days
-                total_days += delta
-                measured += 1
-        avg_days = round(total_days / measured) if measured > 0 else 0
+    for pipeline_type in sorted(set(requests_by_pipeline) | {p for p in pipeline_stats if p}):
+        s = pipeline_stats.get(pipeline_type)
         result.append({
             'pipeline': pipeline_type,
-            'avg_days': avg_days,
-            'total_requests': count,
+            'avg_days': round(s.mean_days) if s else 0,
+            'avg_business_days': round(s.mean_business_days) if s else 0,
+            'p50_days': s.p50_days if s else None,
+            'p90_days': s.p90_days if s else None,
+            'p99_days': s.p99_days if s else None,
+            'completed': s.samples if s else 0,
+            'throughput_per_week': s.throughput_per_week if s else 0,
+            'total_requests': requests_by_pipeline.get(pipeline_type, 0),
         })
 
     return jsonify({
         'pipelines': result,
+        'by_tier': [s.to_dict() for s in stats if s.kind == 'request' and s.tier != ALL_TIERS],
+        'gates': [s.to_dict() for s in stats if s.kind == 'gate' and s.tier == ALL_TIERS],
+        'refreshed_at': refreshed_at.isoformat() if refreshed_at else None,
+    })
+
+
+@dashboard_bp.route('/trends', methods=['GET'])
+@jwt_required()
+@cached_response(DashboardSnapshot)
+def trends():
+    """Daily dashboard snapshots over a date range.
+    ---
+    tags:
+      - Dashboard
+    description: >
+      Reads the dashboard_snapshots table, written once a day by the
+      maintenance worker (`flask snapshot-dashboard`); days before it
+      existed are reconstructed from the activity log (`flask
+      backfill-snapshots`). Metrics are backlog and backlog_value per gate,
+      overdue_approvals per approver role, pending_advisories per team and
+      loa_utilization per LOA; dimension '' is the metric's total.
+    parameters:
+      - name: start
+        in: query
+        type: string
+        format: date
+        description: First day (YYYY-MM-DD). Defaults to 90 days before end.
+      - name: end
+        in: query
+        type: string
+        format: date
+        description: Last day (YYYY-MM-DD). Defaults to today.
+      - name: metric
+        in: query
+        type: string
+        description: Comma-separated metrics to return (default all)
+    responses:
+      200:
+        description: One series per metric and dimension
+        schema:
+          type: object
+          properties:
+            start:
+              type: string
+              format: date
+            end:
+              type: string
+              format: date
+            series:
+              type: array
+              items:
+                type: object
+                properties:
+                  metric:
+                    type: string
+                  dimension:
+                    type: string
+                  points:
+                    type: array
+                    items:
+                      type: object
+                      properties:
+                        date:
+                          type: string
+                          format: date
+                        value:
+                          type: number
+      400:
+        description: Invalid date or metric
+    """
+    try:
+        end = date.fromisoformat(request.args['end']) if request.args.get('end') else datetime.utcnow().date()
+        start = date.fromisoformat(request.args['start']) if request.args.get('start') else end - timedelta(days=90)
+    except ValueError:
+        return jsonify({'error': 'start and end must be YYYY-MM-DD'}), 400
+    if start > end:
+        return jsonify({'error': 'start must not be after end'}), 400
+
+    metrics = [m for m in (request.args.get('metric') or '').split(',') if m]
+    unknown = [m for m in metrics if m not in METRICS]
+    if unknown:
+        return jsonify({'error': f'Unknown metric: {", ".join(unknown)}'}), 400
+
+    query = db.session.query(
+        DashboardSnapshot.snapshot_date, DashboardSnapshot.metric,
+        DashboardSnapshot.dimension, DashboardSnapshot.value,
+    ).filter(DashboardSnapshot.snapshot_date.between(start, end))
+    if metrics:
+        query = query.filter(DashboardSnapshot.metric.in_(metrics))
+
+    series = {}
+    for day, metric, dimension, value in query.order_by(DashboardSnapshot.snapshot_date):
+        series.setdefault((metric, dimension), []).append({'date': day.isoformat(), 'value': value})
+
+    return jsonify({
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'series': [
+            {'metric': metric, 'dimension': dimension, 'points': points}
+            for (metric, dimension), points in sorted(series.items())
+        ],
     })
 
 
 @dashboard_bp.route('/funding', methods=['GET'])
 @jwt_required()
+@cached_response(LineOfAccounting, RequestRollup)
 def funding_dashboard():
     """LOA overview and funding status across all lines of accounting.
     ---
@@ -321,9 +554,35 @@ def funding_dashboard():
                   type: number
                 utilization_pct:
                   type: number
+                in_pipeline:
+                  type: number
+                  description: Estimated value of requests submitted but not yet awarded
+            by_fiscal_year:
+              type: array
+              items:
+                type: object
+                properties:
+                  fiscal_year:
+                    type: string
+                  allocation:
+                    type: number
+                  in_pipeline:
+                    type: number
+                  requests:
+                    type: integer
     """
     loas = LineOfAccounting.query.all()
 
+    # Demand still heading for the LOAs, per fiscal year, from the request rollup
+    demand = db.session.query(
+        key_column(RequestRollup.fiscal_year),
+        db.func.sum(RequestRollup.request_count),
+        db.func.sum(RequestRollup.total_value),
+    ).filter(
+        RequestRollup.status.in_(IN_PIPELINE_STATUSES),
+        RequestRollup.request_count != 0,
+    ).group_by(RequestRollup.fiscal_year).all()
+
     loa_data = []
     total_allocation = 0
     total_committed = 0
@@ -352,9 +611,22 @@ def funding_dashboard():
             'status': loa.status,
         })
 
+    allocation_by_year = {}
+    for loa in loas:
+        allocation_by_year[loa.fiscal_year] = allocation_by_year.get(loa.fiscal_year, 0) + (loa.total_allocation or 0)
+    demand_by_year = {fiscal_year: (count, value) for fiscal_year, count, value in demand}
+    by_fiscal_year = [{
+        'fiscal_year': fiscal_year,
+        'allocation': allocation_by_year.get(fiscal_year, 0),
+        'in_pipeline': demand_by_year.get(fiscal_year, (0, 0))[1],
+        'requests': demand_by_year.get(fiscal_year, (0, 0))[0],
+    } for fiscal_year in sorted(set(allocation_by_year) | set(demand_by_year), key=lambda y: y or '')]
+
     return jsonify({
         'loas': loa_data,
+        'by_fiscal_year': by_fiscal_year,
         'totals': {
+            'in_pipeline': sum(value for _, _, value in demand),
             'allocation': total_allocation,
             'committed': total_committed,
             'obligated': total_obligated,
@@ -417,17 +689,19 @@ def drilldown_approvals():
                 type: boolean
     """
     overdue_only = request.args.get('overdue_only', 'false').lower() == 'true'
-    steps = ApprovalStep.query.filter_by(status='active').all()
+    query = ApprovalStep.query.filter_by(status='active')
     if overdue_only:
-        steps = [s for s in steps if s.is_overdue]
+        query = query.filter(ApprovalStep.due_date < datetime.utcnow())
+    steps = query.all()
 
+    requests = load_requests(s.request_id for s in steps)
     seen = set()
     items = []
     for s in steps:
         if s.request_id in seen:
             continue
         seen.add(s.request_id)
-        r = AcquisitionRequest.query.get(s.request_id)
+        r = requests.get(s.request_id)
         if r:
             item = _request_summary(r)
             item['gate_name'] = s.step_name
@@ -467,13 +741,14 @@ def drilldown_advisories():
         AdvisoryInput.status.in_(['requested', 'in_review'])
     ).all()
 
+    requests = load_requests(a.request_id for a in advs)
     seen = set()
     items = []
     for a in advs:
         if a.request_id in seen:
             continue
         seen.add(a.request_id)
-        r = AcquisitionRequest.query.get(a.request_id)
+        r = requests.get(a.request_id)
         if r:
             item = _request_summary(r)
             item['team'] = a.team
@@ -510,7 +785,9 @@ def drilldown_executions():
               status:
                 type: string
     """
-    execs = CLINExecutionRequest.query.filter(
+    execs = CLINExecutionRequest.query.options(
+        selectinload(CLINExecutionRequest.requested_by)
+    ).filter(
         CLINExecutionRequest.status.notin_(['complete', 'cancelled', 'rejected', 'draft'])
     ).all()
     return jsonify([{
@@ -554,13 +831,14 @@ def drilldown_funding(loa_id):
                 type: string
     """
     clins = AcquisitionCLIN.query.filter_by(loa_id=loa_id).all()
+    requests = load_requests(c.request_id for c in clins)
     seen = set()
     items = []
     for c in clins:
         if c.request_id in seen:
             continue
         seen.add(c.request_id)
-        r = AcquisitionRequest.query.get(c.request_id)
+        r = requests.get(c.request_id)
         if r:
             item = _request_summary(r)
             item['clin_number'] = c.clin_number
@@ -6,6 +6,8 @@ from app.models.execution import CLINExecutionRequest
 from app.models.request import AcquisitionRequest
 from app.models.clin import AcquisitionCLIN
 from app.services.funding import check_clin_balance
+from app.services.thresholds import get_threshold_snapshot
+from app.services.sla_calendar import due_date, execution_approval_start, execution_sla_days
 
 execution_bp = Blueprint('execution', __name__)
 
@@ -340,6 +342,8 @@ def submit_execution(exec_id):
 
     exe.status = 'submitted'
     exe.pm_approval = 'pending'
+    exe.submitted_date = datetime.utcnow()
+    exe.due_date = due_date(exe.submitted_date, execution_sla_days(exe))
     db.session.commit()
 
     return jsonify({
@@ -440,6 +444,11 @@ def approve_execution(exec_id):
     else:
         return jsonify({'error': 'No pending approval for your role'}), 400
 
+    # Due date follows whichever approval is now pending
+    if action in ('approve', 'reject', 'return'):
+        start = execution_approval_start(exe)
+        exe.due_date = due_date(start, execution_sla_days(exe)) if start else None
+
     db.session.commit()
     return jsonify({
         'success': True,
@@ -646,7 +655,7 @@ def request_funding(exec_id):
         existing_contract_end_date=contract.existing_contract_end_date if contract else None,
         # Derived classification
         derived_acquisition_type='clin_execution_funding',
-        derived_tier='sat' if shortfall < 250000 else 'above_sat',
+        derived_tier=get_threshold_snapshot().tier_for(shortfall),
         derived_pipeline='clin_exec_funding',
         derived_contract_character='product' if exe.execution_type == 'odc' else 'service',
         intake_completed=True,
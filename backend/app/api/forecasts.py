@@ -4,6 +4,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db
 from app.models.forecast import DemandForecast
 from app.models.request import AcquisitionRequest
+from app.services.thresholds import get_threshold_snapshot
 
 forecasts_bp = Blueprint('forecasts', __name__)
 
@@ -58,9 +59,17 @@ def list_forecasts():
         query = query.filter(DemandForecast.source == source)
 
     forecasts = query.order_by(DemandForecast.need_by_date).all()
+    thresholds = get_threshold_snapshot()
+
+    items = []
+    for f in forecasts:
+        d = f.to_dict()
+        d['tier'] = thresholds.tier_for(f.estimated_value)
+        items.append(d)
+
     return jsonify({
-        'forecasts': [f.to_dict() for f in forecasts],
-        'count': len(forecasts),
+        'forecasts': items,
+        'count': len(items),
     })
 
 
@@ -280,6 +289,7 @@ def create_request_from_forecast(forecast_id):
         status='draft',
         requestor_id=int(user_id),
         intake_q_buy_category=forecast.buy_category,
+        derived_tier=get_threshold_snapshot().tier_for(forecast.estimated_value),
     )
     db.session.add(acq)
     db.session.flush()
@@ -1,3 +1,4 @@
+import json
 from datetime import datetime
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
@@ -8,10 +9,14 @@ from app.models.activity import ActivityLog
 from app.models.intake_path import IntakePath
 from app.models.advisory_trigger import AdvisoryTriggerRule
 from app.models.advisory_pipeline_config import AdvisoryPipelineConfig
-from app.services.derivation import derive_classification
-from app.services.checklist import generate_checklist, recalculate_checklist
+from app.services.derivation import derive_classification, derive_classification_batch
+from app.services.checklist import generate_checklist, recalculate_checklist, get_checklist_plan
 from app.services.workflow import select_template
 from app.services.notifications import notify_users_by_team
+from app.services.action_holder import find_trigger_rule, sync_advisories
+from app.services.event_bus import publish_queue_changed
+from app.services.sla_calendar import due_date
+from app.services.response_cache import cached_response
 
 intake_bp = Blueprint('intake', __name__)
 
@@ -69,8 +74,99 @@ def preview_derivation():
     return jsonify(result)
 
 
+MAX_BATCH_ROWS = 100000
+
+
+@intake_bp.route('/derive-batch', methods=['POST'])
+@jwt_required()
+def derive_batch():
+    """Derive classifications for many answer sets in one call (forecast / legacy pre-classification).
+    ---
+    tags:
+      - Intake
+    consumes:
+      - application/json
+      - application/x-ndjson
+    parameters:
+      - name: body
+        in: body
+        required: true
+        description: >
+          A JSON array of answer sets (same keys as /derive), an object with an
+          "items" array, or newline-delimited JSON with one answer set per line.
+        schema:
+          type: array
+          items:
+            type: object
+            properties:
+              intake_q1_need_type:
+                type: string
+              intake_q2_situation:
+                type: string
+              intake_q3_specific_vendor:
+                type: string
+              intake_q5_change_type:
+                type: string
+              intake_q_buy_category:
+                type: string
+              intake_q_mixed_predominant:
+                type: string
+              estimated_value:
+                type: number
+    responses:
+      200:
+        description: Derived classifications in input order
+        schema:
+          type: object
+          properties:
+            results:
+              type: array
+              items:
+                type: object
+            count:
+              type: integer
+            unique:
+              type: integer
+              description: Distinct answer tuples actually computed
+      400:
+        description: Malformed body or row
+    """
+    if request.mimetype == 'application/x-ndjson':
+        rows = []
+        for line_no, line in enumerate(request.get_data(as_text=True).splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                return jsonify({'error': f'Invalid JSON on line {line_no}'}), 400
+    else:
+        data = request.get_json(silent=True)
+        rows = data.get('items') if isinstance(data, dict) else data
+
+    if not isinstance(rows, list) or not rows:
+        return jsonify({'error': 'No data provided'}), 400
+    if len(rows) > MAX_BATCH_ROWS:
+        return jsonify({'error': f'Batch too large (max {MAX_BATCH_ROWS} rows)'}), 400
+    for i, row in enumerate(rows):
+        if not isinstance(row, dict):
+            return jsonify({'error': f'Row {i} is not an object'}), 400
+
+    try:
+        results, unique = derive_classification_batch(rows)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid answer value: {e}'}), 400
+
+    return jsonify({
+        'results': results,
+        'count': len(results),
+        'unique': unique,
+    })
+
+
 @intake_bp.route('/options', methods=['GET'])
 @jwt_required()
+@cached_response(IntakePath)
 def get_intake_options():
     """Return the question tree for the intake wizard, derived from IntakePath table.
     ---
@@ -408,6 +504,10 @@ def recalculate(request_id):
               type: string
             estimated_value:
               type: number
+            full:
+              type: boolean
+              default: false
+              description: Re-evaluate every document rule, not only those reading changed fields
     responses:
       200:
         description: Recalculated classification and checklist diff
@@ -428,6 +528,10 @@ def recalculate(request_id):
     acq = AcquisitionRequest.query.get_or_404(request_id)
     data = request.get_json() or {}
 
+    # Remember the fields document rules read, to re-evaluate only affected rules
+    rule_fields = get_checklist_plan().fields
+    before = {f: getattr(acq, f, None) for f in rule_fields}
+
     # Update any changed intake fields
     intake_fields = [
         'intake_q1_need_type', 'intake_q2_situation', 'intake_q3_specific_vendor',
@@ -465,8 +569,13 @@ def recalculate(request_id):
 
     db.session.flush()
 
-    # Recalculate checklist (oops design)
-    diff = recalculate_checklist(acq)
+    # Recalculate checklist (oops design). A bare call, or full=true, re-evaluates
+    # every template in case the request was edited elsewhere since.
+    if data.get('full') or not any(f in data for f in intake_fields):
+        changed_fields = None
+    else:
+        changed_fields = {f for f in rule_fields if getattr(acq, f, None) != before[f]}
+    diff = recalculate_checklist(acq, changed_fields=changed_fields)
 
     # Log
     log = ActivityLog(
@@ -551,6 +660,7 @@ def _trigger_advisories(request_obj, advisory_triggers_str=None):
                 team=team,
                 status='requested',
                 blocks_gate=blocks_gate,
+                due_date=due_date(None, config.sla_days),
             )
             db.session.add(adv)
 
@@ -580,7 +690,7 @@ def _trigger_advisories(request_obj, advisory_triggers_str=None):
                 if team in triggered_teams:
                     continue
 
-                rule = _find_trigger_rule(team)
+                rule = find_trigger_rule(team)
                 blocks_gate = info['default_gate']
                 if rule:
                     blocks_gate = _normalize_gate(rule.feeds_into_gate) or info['default_gate']
@@ -590,6 +700,7 @@ def _trigger_advisories(request_obj, advisory_triggers_str=None):
                     team=team,
                     status='requested',
                     blocks_gate=blocks_gate,
+                    due_date=due_date(None, rule.sla_days if rule else None),
                 )
                 db.session.add(adv)
 
@@ -621,6 +732,7 @@ def _trigger_advisories(request_obj, advisory_triggers_str=None):
                     team=team,
                     status='requested',
                     blocks_gate=blocks_gate,
+                    due_date=due_date(None, rule.sla_days),
                 )
                 db.session.add(adv)
 
@@ -635,26 +747,12 @@ def _trigger_advisories(request_obj, advisory_triggers_str=None):
     except Exception:
         pass  # Table may not exist yet during initial setup
 
-    return advisories
-
+    if advisories:
+        sync_advisories(request_obj)
+    for team in advisories:
+        publish_queue_changed(team=team)
 
-def _find_trigger_rule(team):
-    """Find the AdvisoryTriggerRule for a given team."""
-    try:
-        team_map = {
-            'scrm': 'SCRM',
-            'sbo': 'Small Business Office',
-            'cio': 'CIO / IT Governance',
-            'section508': 'Section 508',
-            'fm': 'Business Manager (FM)',
-            'fedramp': 'FedRAMP PMO',
-        }
-        search_name = team_map.get(team, team)
-        return AdvisoryTriggerRule.query.filter(
-            AdvisoryTriggerRule.team.ilike(f'%{search_name}%')
-        ).first()
-    except Exception:
-        return None
+    return advisories
 
 
 def _normalize_team(team_name):
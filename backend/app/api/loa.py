@@ -3,12 +3,14 @@ from flask_jwt_extended import jwt_required
 from app.extensions import db
 from app.models.loa import LineOfAccounting
 from app.services.funding import update_loa_committed
+from app.services.response_cache import cached_response
 
 loa_bp = Blueprint('loa', __name__)
 
 
 @loa_bp.route('', methods=['GET'])
 @jwt_required()
+@cached_response(LineOfAccounting)
 def list_loas():
     """List all lines of accounting with optional filters.
     ---
@@ -1,7 +1,8 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db
-from app.models.notification import Notification
+from app.models.notification import Notification, NotificationArchive
+from app.services.unread_counter import get_unread_count, remove_unread
 
 notifications_bp = Blueprint('notifications', __name__)
 
@@ -70,6 +71,68 @@ def list_notifications():
     })
 
 
+@notifications_bp.route('/archive', methods=['GET'])
+@jwt_required()
+def list_archived_notifications():
+    """Get the current user's archived (read, past retention) notifications, newest first.
+    ---
+    tags:
+      - Notifications
+    parameters:
+      - name: page
+        in: query
+        type: integer
+        required: false
+        default: 1
+      - name: per_page
+        in: query
+        type: integer
+        required: false
+        default: 20
+      - name: notification_type
+        in: query
+        type: string
+        required: false
+    responses:
+      200:
+        description: Paginated archived notifications
+        schema:
+          type: object
+          properties:
+            notifications:
+              type: array
+              items:
+                $ref: '#/definitions/Notification'
+            total:
+              type: integer
+            page:
+              type: integer
+            pages:
+              type: integer
+    """
+    user_id = int(get_jwt_identity())
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 20, type=int)
+    per_page = min(per_page, 50)
+
+    query = NotificationArchive.query.filter_by(user_id=user_id).order_by(
+        NotificationArchive.created_at.desc()
+    )
+
+    notification_type = request.args.get('notification_type')
+    if notification_type:
+        query = query.filter_by(notification_type=notification_type)
+
+    paginated = query.paginate(page=page, per_page=per_page, error_out=False)
+
+    return jsonify({
+        'notifications': [n.to_dict() for n in paginated.items],
+        'total': paginated.total,
+        'page': paginated.page,
+        'pages': paginated.pages,
+    })
+
+
 @notifications_bp.route('/unread-count', methods=['GET'])
 @jwt_required()
 def unread_count():
@@ -87,8 +150,7 @@ def unread_count():
               type: integer
     """
     user_id = int(get_jwt_identity())
-    count = Notification.query.filter_by(user_id=user_id, is_read=False).count()
-    return jsonify({'unread_count': count})
+    return jsonify({'unread_count': get_unread_count(user_id)})
 
 
 @notifications_bp.route('/<int:notification_id>/read', methods=['POST'])
@@ -117,8 +179,13 @@ def mark_read(notification_id):
     n = Notification.query.get_or_404(notification_id)
     if n.user_id != user_id:
         return jsonify({'error': 'Not your notification'}), 403
-    n.is_read = True
+    # Conditional update so two concurrent reads of one notification decrement once
+    flipped = Notification.query.filter_by(id=n.id, is_read=False).update(
+        {'is_read': True}, synchronize_session=False
+    )
+    remove_unread(user_id, flipped)
     db.session.commit()
+    db.session.refresh(n)
     return jsonify(n.to_dict())
 
 
@@ -142,5 +209,6 @@ def mark_all_read():
     count = Notification.query.filter_by(user_id=user_id, is_read=False).update(
         {'is_read': True}
     )
+    remove_unread(user_id, count)
     db.session.commit()
     return jsonify({'marked_read': count})
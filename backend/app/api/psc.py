@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from app.models.psc import PSCCode
 from app.extensions import db
+from app.services.response_cache import cached_response
 
 psc_bp = Blueprint('psc', __name__)
 
@@ -53,6 +54,7 @@ def search_psc():
 
 @psc_bp.route('', methods=['GET'])
 @jwt_required()
+@cached_response(PSCCode)
 def list_psc():
     """List PSC codes with optional filters.
     ---
@@ -5,6 +5,8 @@ from app.extensions import db
 from app.models.request import AcquisitionRequest
 from app.models.activity import ActivityLog
 from app.services.workflow import submit_request as workflow_submit
+from app.services.request_serializer import serialize_requests
+from app.services.request_search import apply_search, markup
 
 requests_bp = Blueprint('requests', __name__)
 
@@ -54,7 +56,11 @@ def list_requests():
         in: query
         type: string
         required: false
-        description: Search across title, request_number, description
+        description: >
+          Full-text search of title, request_number and description. Each
+          word matches as a prefix and all must match. Results carry a
+          `search` object (score, highlighted title, description snippet
+          with <mark> around matches) and sort by relevance by default.
       - name: pipeline
         in: query
         type: string
@@ -68,8 +74,8 @@ def list_requests():
         in: query
         type: string
         required: false
-        default: created_desc
-        enum: [created_desc, created_asc, value_desc, value_asc]
+        default: created_desc (relevance when searching)
+        enum: [relevance, created_desc, created_asc, value_desc, value_asc]
       - name: page
         in: query
         type: integer
@@ -115,14 +121,11 @@ def list_requests():
         query = query.filter(AcquisitionRequest.derived_tier == tier)
 
     search = request.args.get('search')
+    rank = None
     if search:
-        query = query.filter(
-            db.or_(
-                AcquisitionRequest.title.ilike(f'%{search}%'),
-                AcquisitionRequest.request_number.ilike(f'%{search}%'),
-                AcquisitionRequest.description.ilike(f'%{search}%'),
-            )
-        )
+        query, rank, highlights = apply_search(query, search)
+        if rank is not None:
+            query = query.add_columns(rank, *highlights)
 
     pipeline = request.args.get('pipeline')
     if pipeline:
@@ -133,8 +136,10 @@ def list_requests():
         query = query.filter(AcquisitionRequest.fiscal_year == fiscal_year)
 
     # Sort
-    sort = request.args.get('sort', 'created_desc')
-    if sort == 'created_asc':
+    sort = request.args.get('sort', 'relevance' if rank is not None else 'created_desc')
+    if sort == 'relevance' and rank is not None:
+        query = query.order_by(rank, AcquisitionRequest.id.desc())
+    elif sort == 'created_asc':
         query = query.order_by(AcquisitionRequest.created_at.asc())
     elif sort == 'value_desc':
         query = query.order_by(AcquisitionRequest.estimated_value.desc())
@@ -150,8 +155,15 @@ def list_requests():
 
     paginated = query.paginate(page=page, per_page=per_page, error_out=False)
 
+    if rank is None:
+        results = serialize_requests(paginated.items)
+    else:
+        results = serialize_requests([row[0] for row in paginated.items])
+        for data, (_, row_rank, title, snippet) in zip(results, paginated.items):
+            data['search'] = {'score': round(-row_rank, 4), 'title': markup(title), 'snippet': markup(snippet)}
+
     return jsonify({
-        'requests': [r.to_dict() for r in paginated.items],
+        'requests': results,
         'total': paginated.total,
         'page': paginated.page,
         'pages': paginated.pages,
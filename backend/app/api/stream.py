@@ -0,0 +1,140 @@
+"""
+Server-Sent Events stream of notifications and queue changes.
+
+Each open stream holds one gunicorn thread for its whole life, so the app
+runs gthread workers (supervisord.conf: --worker-class gthread --threads 40)
+and caps streams per worker with STREAM_MAX_CONNECTIONS (default 32),
+leaving the remaining threads for ordinary API calls. Past the cap the
+endpoint answers 503 and the client falls back to polling. Streams are
+closed after STREAM_MAX_AGE_SECONDS; EventSource reconnects on its own.
+
+EventSource cannot send an Authorization header, and an access token in
+the URL would end up in nginx, gunicorn and proxy logs. So the client first
+POSTs to /api/stream/ticket and opens the stream with the returned ticket.
+The ticket is signed with SECRET_KEY, lives for STREAM_TICKET_SECONDS and
+is not a JWT, so it opens a stream and nothing else. When an expired
+ticket is refused on reconnect, the client fetches a new one.
+"""
+
+import json
+import time
+from flask import Blueprint, Response, current_app, jsonify, request
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from app.services.action_holder import ROLE_TEAM_MAP
+from app.services.event_bus import get_bus
+
+stream_bp = Blueprint('stream', __name__)
+
+
+def _sse(event_name, data):
+    return f'event: {event_name}\ndata: {json.dumps(data)}\n\n'
+
+
+def _tickets():
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt='stream-ticket')
+
+
+@stream_bp.route('/ticket', methods=['POST'])
+@jwt_required()
+def stream_ticket():
+    """Issue a short-lived ticket for opening the event stream.
+    ---
+    tags:
+      - Stream
+    responses:
+      200:
+        description: Ticket to pass as /api/stream?ticket=...
+        schema:
+          type: object
+          properties:
+            ticket:
+              type: string
+            expires_in:
+              type: integer
+              description: Seconds the ticket can be used to (re)connect
+    """
+    claims = get_jwt()
+    ticket = _tickets().dumps({
+        'user_id': int(get_jwt_identity()),
+        'role': claims.get('role', ''),
+        'team': claims.get('team', ''),
+    })
+    return jsonify({'ticket': ticket, 'expires_in': current_app.config.get('STREAM_TICKET_SECONDS', 60)})
+
+
+@stream_bp.route('', methods=['GET'])
+def stream():
+    """Open a Server-Sent Events stream for the current user.
+    ---
+    tags:
+      - Stream
+    produces:
+      - text/event-stream
+    parameters:
+      - name: ticket
+        in: query
+        type: string
+        required: true
+        description: Ticket from POST /api/stream/ticket
+    responses:
+      200:
+        description: >
+          Event stream. Events: ready, notification (for this user),
+          queue_changed (approvals queue for the user's role, advisory queue
+          for the user's team; every queue for admins) and resync (the client
+          fell behind and should reload its data).
+      401:
+        description: Missing, invalid or expired ticket
+      503:
+        description: This worker has reached STREAM_MAX_CONNECTIONS; poll instead
+    """
+    config = current_app.config
+    try:
+        ticket = _tickets().loads(request.args.get('ticket', ''), max_age=config.get('STREAM_TICKET_SECONDS', 60))
+    except BadSignature:
+        return jsonify({'error': 'Invalid or expired stream ticket'}), 401
+
+    user_id = ticket['user_id']
+    role = ticket['role']
+    team = ROLE_TEAM_MAP.get(role, '') or ticket['team']
+
+    channels = {f'user:{user_id}', f'role:{role}'}
+    if team:
+        channels.add(f'team:{team}')
+    if role == 'admin':
+        channels.add('queues')
+
+    bus = get_bus()
+    sub = bus.subscribe(channels, max_connections=config.get('STREAM_MAX_CONNECTIONS', 32))
+    if sub is None:
+        resp = jsonify({'error': 'Too many open streams on this server; poll instead'})
+        resp.status_code = 503
+        resp.headers['Retry-After'] = '30'
+        return resp
+
+    heartbeat = config.get('STREAM_HEARTBEAT_SECONDS', 15)
+    max_age = config.get('STREAM_MAX_AGE_SECONDS', 300)
+
+    def generate():
+        try:
+            yield 'retry: 5000\n\n'
+            yield _sse('ready', {'channels': sorted(channels)})
+            deadline = time.monotonic() + max_age
+            while time.monotonic() < deadline:
+                message = sub.get(timeout=heartbeat)
+                if sub.overflowed:
+                    sub.overflowed = False
+                    yield _sse('resync', {})
+                if message is None:
+                    # Keeps proxies from timing out and detects closed connections
+                    yield ': keepalive\n\n'
+                else:
+                    yield _sse(*message)
+        finally:
+            bus.unsubscribe(sub)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
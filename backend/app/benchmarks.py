@@ -0,0 +1,391 @@
+"""
+Benchmarks for the rule and dashboard engines, run through `flask bench-*`
+commands (see register_cli). They read the data already in the database;
+anything they write happens inside rolled_back_session() and is discarded.
+"""
+
+import inspect
+import time
+from contextlib import contextmanager
+from flask import current_app, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models.document import DocumentTemplate, DocumentRule
+from app.models.request import AcquisitionRequest
+from app.services.rule_engine import compile_condition
+from app.services.rules_cache import bump_rules_version, clear_caches
+
+# Request fields copied into the synthetic requests used by the benchmarks
+REQUEST_FIELDS = [c.name for c in AcquisitionRequest.__table__.columns]
+
+
+def synthetic_requests(count):
+    """Return `count` request dicts cycled from the requests in the database."""
+    base = [
+        {f: getattr(r, f) for f in REQUEST_FIELDS}
+        for r in AcquisitionRequest.query.order_by(AcquisitionRequest.id).all()
+    ]
+    if not base:
+        return []
+    return [dict(base[i % len(base)], id=i + 1) for i in range(count)]
+
+
+def bench_checklist_rules(count=10000):
+    """Time checklist rule evaluation for `count` requests.
+
+    Compares parsing each rule's JSON on every evaluation (the previous
+    behaviour) against the compiled predicates of the checklist plan that
+    generate_checklist uses, and checks that both produce the same
+    checklists. Building the plan is timed separately.
+
+    Returns:
+        dict with request/rule counts and seconds for each strategy
+    """
+    from app.services.checklist import get_checklist_plan
+
+    requests = synthetic_requests(count)
+    templates = DocumentTemplate.query.order_by(DocumentTemplate.id).all()
+    rules = {}
+    for rule in DocumentRule.query.order_by(DocumentRule.priority.desc(), DocumentRule.id).all():
+        rules.setdefault(rule.document_template_id, []).append(rule)
+
+    def checklist(template_ids, evaluate):
+        result = []
+        for req in requests:
+            required = []
+            for template_id, template_rules in template_ids:
+                for rule in template_rules:
+                    if evaluate(rule, req):
+                        required.append(rule.applicability)
+                        break
+                else:
+                    required.append(None)
+            result.append(required)
+        return result
+
+    started = time.perf_counter()
+    parsed = checklist(
+        [(t.id, rules.get(t.id, ())) for t in templates],
+        lambda rule, req: compile_condition(rule.conditions)(req),
+    )
+    parse_seconds = time.perf_counter() - started
+
+    clear_caches()
+    started = time.perf_counter()
+    plan = get_checklist_plan()
+    plan_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    compiled = checklist([(t.id, t.rules) for t in plan], lambda rule, req: rule.predicate(req))
+    compiled_seconds = time.perf_counter() - started
+
+    return {
+        'requests': len(requests),
+        'templates': len(templates),
+        'rules': sum(len(r) for r in rules.values()),
+        'parse_per_evaluation_seconds': round(parse_seconds, 3),
+        'plan_build_seconds': round(plan_seconds, 3),
+        'compiled_seconds': round(compiled_seconds, 3),
+        'speedup': round(parse_seconds / compiled_seconds, 1) if compiled_seconds else None,
+        'results_match': parsed == compiled,
+    }
+
+
+@contextmanager
+def rolled_back_session():
+    """Swap db.session for one whose commits are savepoints of an outer
+    transaction that is rolled back on exit."""
+    connection = db.engine.connect()
+    driver = connection.connection.driver_connection
+    sqlite = connection.dialect.name == 'sqlite'
+    if sqlite:
+        # pysqlite defers BEGIN to the first write and commits on SAVEPOINT;
+        # take over transaction control so the savepoints nest properly
+        isolation_level = driver.isolation_level
+        driver.isolation_level = None
+    outer = connection.begin()
+    if sqlite:
+        connection.exec_driver_sql('BEGIN')
+    session = Session(bind=connection, join_transaction_mode='create_savepoint')
+    db.session.registry.set(session)
+    try:
+        yield session
+    finally:
+        session.close()
+        outer.rollback()
+        if sqlite:
+            driver.isolation_level = isolation_level
+        connection.close()
+        db.session.registry.clear()
+        clear_caches()
+
+
+def raw_view(view):
+    """The undecorated view function: no JWT check and no response cache."""
+    return inspect.unwrap(view)
+
+
+@contextmanager
+def count_statements():
+    """Count SELECT/INSERT/UPDATE/DELETE statements sent to the database.
+
+    Yields a dict whose 'count' and 'selects' keys are updated live.
+    """
+    counts = {'count': 0, 'selects': 0}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        verb = statement.lstrip().split(None, 1)[0].upper()
+        if verb in ('SELECT', 'INSERT', 'UPDATE', 'DELETE'):
+            counts['count'] += 1
+            if verb == 'SELECT':
+                counts['selects'] += 1
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield counts
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def bench_checklist_queries(extra_templates=(0, 25, 100)):
+    """Count the statements generate_checklist and recalculate_checklist issue.
+
+    For each entry in extra_templates, that many DocumentTemplates (each
+    with one rule) are added, then a new request's checklist is generated
+    and recalculated with the checklist plan already cached. Everything is
+    rolled back afterwards.
+
+    Returns:
+        dict with one row per template count and 'constant', True when the
+        statement counts did not grow with the number of templates
+    """
+    from app.services.checklist import generate_checklist, recalculate_checklist, get_checklist_plan
+
+    runs = []
+    for extra in extra_templates:
+        with rolled_back_session() as session:
+            for i in range(extra):
+                template = DocumentTemplate(doc_type_key=f'bench_{i}', name=f'Benchmark {i}')
+                session.add(template)
+                session.flush()
+                session.add(DocumentRule(
+                    document_template_id=template.id,
+                    conditions='{"field": "estimated_value", "operator": ">", "value": %d}' % (i * 1000),
+                ))
+            acq = AcquisitionRequest(
+                request_number='BENCH-1', title='Checklist query benchmark',
+                estimated_value=50000, derived_tier='sat', intake_q_buy_category='service',
+            )
+            session.add(acq)
+            bump_rules_version()
+            session.commit()
+            templates = len(get_checklist_plan())
+
+            with count_statements() as generate:
+                generate_checklist(acq)
+            acq.estimated_value = 500000
+            session.flush()
+            with count_statements() as recalculate:
+                recalculate_checklist(acq)
+
+            runs.append({
+                'templates': templates,
+                'generate_statements': generate['count'],
+                'generate_selects': generate['selects'],
+                'recalculate_statements': recalculate['count'],
+                'recalculate_selects': recalculate['selects'],
+            })
+
+    keys = ('generate_selects', 'recalculate_selects')
+    return {
+        'runs': runs,
+        'constant': all(len({r[k] for r in runs}) == 1 for k in keys),
+    }
+
+
+# Endpoints whose query count must not depend on how many rows they return
+REQUEST_LIST_ENDPOINTS = (
+    '/api/requests?per_page=100',
+    '/api/dashboard/drilldown/approvals',
+    '/api/dashboard/drilldown/advisories',
+    '/api/dashboard/drilldown/executions',
+    '/api/dashboard/drilldown/funding/{loa_id}',
+)
+
+
+def bench_request_list_queries(sizes=(5, 50)):
+    """Count the statements each request list endpoint issues as rows grow.
+
+    For each entry in sizes, that many requests are added, each with its
+    own requestor, an active approval step, a pending advisory, a CLIN on
+    one benchmark LOA and an open execution request. Every endpoint in
+    REQUEST_LIST_ENDPOINTS is then called directly (bypassing JWT) and its
+    statements counted. Everything is rolled back afterwards.
+
+    Returns:
+        dict with statement counts per endpoint per size and 'constant',
+        True when no endpoint's count grew with the number of rows
+    """
+    from app.models.advisory import AdvisoryInput
+    from app.models.approval import ApprovalStep
+    from app.models.clin import AcquisitionCLIN
+    from app.models.execution import CLINExecutionRequest
+    from app.models.loa import LineOfAccounting
+    from app.models.user import User
+
+    counts = {path: {} for path in REQUEST_LIST_ENDPOINTS}
+    for size in sizes:
+        with rolled_back_session() as session:
+            loa = LineOfAccounting(display_name='Benchmark LOA')
+            session.add(loa)
+            for i in range(size):
+                user = User(email=f'bench{i}@example.com', name=f'Bench User {i}',
+                            password_hash='-', role='requestor')
+                session.add(user)
+                session.flush()
+                acq = AcquisitionRequest(
+                    request_number=f'BENCH-{i}', title=f'Request list benchmark {i}',
+                    status='iss_review', requestor_id=user.id, estimated_value=10000 + i,
+                )
+                session.add(acq)
+                session.flush()
+                session.add_all([
+                    ApprovalStep(request_id=acq.id, step_number=1, step_name='ISS Review',
+                                 approver_role='branch_chief', status='active'),
+                    AdvisoryInput(request_id=acq.id, team='scrm', status='requested'),
+                    AcquisitionCLIN(request_id=acq.id, clin_number='0001', loa_id=loa.id),
+                    CLINExecutionRequest(request_number=f'BENCH-EX-{i}', execution_type='odc',
+                                         title=f'Execution benchmark {i}', status='submitted',
+                                         requested_by_id=user.id),
+                ])
+            session.commit()
+
+            for path in REQUEST_LIST_ENDPOINTS:
+                with current_app.test_request_context(path.format(loa_id=loa.id)):
+                    view = current_app.view_functions[request.url_rule.endpoint]
+                    with count_statements() as statements:
+                        raw_view(view)(**request.view_args)
+                counts[path][size] = statements['count']
+                session.expunge_all()
+
+    return {
+        'sizes': list(sizes),
+        'endpoints': counts,
+        'constant': all(len(set(c.values())) == 1 for c in counts.values()),
+    }
+
+
+def bench_dashboard(sizes=(1000, 10000, 100000), repeat=5):
+    """Time the main dashboard (GET /api/dashboard) as the request count grows.
+
+    For each entry in sizes, that many synthetic requests are bulk-inserted,
+    spread over the dashboard statuses, tiers and acquisition types; every
+    third gets an active approval step (half of them past due) and every
+    fifth a pending advisory, and the rollups are rebuilt. The view is then
+    called `repeat` times (bypassing JWT and the response cache) next to legacy_dashboard_counts(),
+    the per-status COUNTs and Python overdue pass it replaced. Everything is
+    rolled back afterwards.
+
+    Returns:
+        dict with one row per size: median milliseconds and statement
+        counts for the current and legacy versions
+    """
+    from datetime import datetime, timedelta
+    from sqlalchemy import insert
+    from app.api.dashboard import DASHBOARD_STATUSES, main_dashboard
+    from app.models.advisory import AdvisoryInput
+    from app.models.approval import ApprovalStep
+    from app.services.dashboard_rollup import rebuild_rollups
+
+    tiers = ('micro', 'sat', 'above_sat', 'major')
+    types = ('new_competitive', 'option_exercise', 'brand_name_sole_source', None)
+    now = datetime.utcnow()
+
+    def timed(fn):
+        times = []
+        for _ in range(repeat):
+            with count_statements() as statements:
+                start = time.perf_counter()
+                fn()
+                times.append(time.perf_counter() - start)
+        return round(sorted(times)[len(times) // 2] * 1000, 2), statements['count']
+
+    runs = []
+    for size in sizes:
+        with rolled_back_session() as session:
+            session.execute(insert(AcquisitionRequest.__table__), [
+                {
+                    'request_number': f'BENCH-{i}', 'title': f'Dashboard benchmark {i}',
+                    'status': DASHBOARD_STATUSES[i % len(DASHBOARD_STATUSES)],
+                    'derived_tier': tiers[i % len(tiers)],
+                    'derived_acquisition_type': types[i % len(types)],
+                    'estimated_value': 1000 + i,
+                }
+                for i in range(size)
+            ])
+            ids = [row_id for (row_id,) in session.query(AcquisitionRequest.id).filter(
+                AcquisitionRequest.request_number.like('BENCH-%'))]
+            session.execute(insert(ApprovalStep.__table__), [
+                {
+                    'request_id': request_id, 'step_number': 1, 'step_name': 'ISS Review',
+                    'approver_role': 'branch_chief', 'status': 'active',
+                    'due_date': now + timedelta(days=-1 if n % 2 else 1),
+                }
+                for n, request_id in enumerate(ids[::3])
+            ])
+            session.execute(insert(AdvisoryInput.__table__), [
+                {'request_id': request_id, 'team': 'scrm', 'status': 'requested', 'due_date': now}
+                for request_id in ids[::5]
+            ])
+            # Bulk inserts bypass the flush hooks that maintain the rollups
+            rebuild_rollups()
+            session.commit()
+
+            with current_app.test_request_context('/api/dashboard'):
+                current_ms, current_statements = timed(raw_view(main_dashboard))
+                legacy_ms, legacy_statements = timed(legacy_dashboard_counts)
+            runs.append({
+                'requests': AcquisitionRequest.query.count(),
+                'current_ms': current_ms,
+                'current_statements': current_statements,
+                'legacy_ms': legacy_ms,
+                'legacy_statements': legacy_statements,
+            })
+    return {'runs': runs}
+
+
+def legacy_dashboard_counts():
+    """The counting the main dashboard did before it was rewritten as
+    grouped queries, kept as the bench_dashboard baseline."""
+    from app.api.dashboard import DASHBOARD_STATUSES
+    from app.models.advisory import AdvisoryInput
+    from app.models.approval import ApprovalStep
+    from app.models.execution import CLINExecutionRequest
+    from app.models.forecast import DemandForecast
+
+    total = AcquisitionRequest.query.count()
+    by_status = {}
+    for status in DASHBOARD_STATUSES:
+        count = AcquisitionRequest.query.filter_by(status=status).count()
+        if count > 0:
+            by_status[status] = count
+    by_type = dict(db.session.query(
+        AcquisitionRequest.derived_acquisition_type, db.func.count(AcquisitionRequest.id)
+    ).filter(AcquisitionRequest.derived_acquisition_type.isnot(None)).group_by(
+        AcquisitionRequest.derived_acquisition_type).all())
+    by_tier = dict(db.session.query(
+        AcquisitionRequest.derived_tier, db.func.count(AcquisitionRequest.id)
+    ).filter(AcquisitionRequest.derived_tier.isnot(None)).group_by(
+        AcquisitionRequest.derived_tier).all())
+    total_value = db.session.query(
+        db.func.coalesce(db.func.sum(AcquisitionRequest.estimated_value), 0)).scalar()
+    active = ApprovalStep.query.filter_by(status='active').count()
+    overdue = sum(1 for s in ApprovalStep.query.filter_by(status='active').all() if s.is_overdue)
+    pending = AdvisoryInput.query.filter(AdvisoryInput.status.in_(['requested', 'in_review'])).count()
+    executions = CLINExecutionRequest.query.filter(
+        CLINExecutionRequest.status.notin_(['complete', 'cancelled', 'rejected', 'draft'])).count()
+    forecasts = DemandForecast.query.filter(
+        DemandForecast.status.in_(['forecasted', 'acknowledged', 'funded'])).count()
+    db.session.expunge_all()
+    return total, by_status, by_type, by_tier, total_value, active, overdue, pending, executions, forecasts
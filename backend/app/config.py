@@ -12,6 +12,25 @@ class BaseConfig:
     JWT_REFRESH_TOKEN_EXPIRES = 86400 * 30
     JWT_TOKEN_LOCATION = ['headers']
     ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY', '')
+    # 'inline' expands notification events in the request; 'worker' leaves them to `flask notification-worker`
+    NOTIFICATION_DELIVERY = os.getenv('NOTIFICATION_DELIVERY', 'inline')
+    # /api/stream: 'local' event bus for a single process, 'database' to relay between processes
+    EVENT_BUS_BACKEND = os.getenv('EVENT_BUS_BACKEND', 'local')
+    STREAM_MAX_CONNECTIONS = int(os.getenv('STREAM_MAX_CONNECTIONS', '32'))  # per gunicorn worker
+    STREAM_HEARTBEAT_SECONDS = 15
+    STREAM_MAX_AGE_SECONDS = 300
+    STREAM_TICKET_SECONDS = 60  # lifetime of the /api/stream URL ticket
+    # Cached GET responses: 'local' LRU for a single process, 'database' to share them between processes
+    RESPONSE_CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', 'local')
+    RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '512'))  # entries, local backend
+    RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', '300'))  # seconds an entry may be served
+    # Read notifications older than this many days move to notifications_archive
+    NOTIFICATION_RETENTION_DAYS = int(os.getenv('NOTIFICATION_RETENTION_DAYS', '90'))
+    # Per-type overrides as 'type=days,...'; 0 keeps that type in the inbox forever
+    NOTIFICATION_RETENTION_BY_TYPE = os.getenv(
+        'NOTIFICATION_RETENTION_BY_TYPE',
+        'step_activated=30,advisory_requested=30,info_provided=30',
+    )
 
 
 class DevelopmentConfig(BaseConfig):
@@ -5,3 +5,12 @@ from flask_cors import CORS
 db = SQLAlchemy()
 jwt = JWTManager()
 cors = CORS()
+
+
+def dialect_insert():
+    """INSERT construct with ON CONFLICT support for the bound database."""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
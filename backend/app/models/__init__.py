@@ -11,10 +11,19 @@ from app.models.clin import AcquisitionCLIN
 from app.models.forecast import DemandForecast
 from app.models.execution import CLINExecutionRequest
 from app.models.activity import ActivityLog
-from app.models.notification import Notification
+from app.models.notification import Notification, NotificationArchive, NotificationCounter
+from app.models.notification_event import NotificationEvent
+from app.models.stream_event import StreamEvent
 from app.models.intake_path import IntakePath
 from app.models.advisory_trigger import AdvisoryTriggerRule
 from app.models.advisory_pipeline_config import AdvisoryPipelineConfig
+from app.models.rules_version import RulesVersion
+from app.models.derivation_table import DerivationTable
+from app.models.holiday import Holiday
+from app.models.dashboard_rollup import RequestRollup, ApprovalRollup, AdvisoryRollup
+from app.models.cycle_time import CycleTimeSample, CycleTimeStat
+from app.models.dashboard_snapshot import DashboardSnapshot
+from app.models.response_cache import CacheGeneration, ResponseCacheEntry
 
 __all__ = [
     'User', 'ThresholdConfig', 'PSCCode', 'PerDiemRate',
@@ -22,6 +31,10 @@ __all__ = [
     'DocumentTemplate', 'DocumentRule', 'PackageDocument',
     'ApprovalTemplate', 'ApprovalTemplateStep', 'ApprovalStep',
     'AdvisoryInput', 'AcquisitionCLIN', 'DemandForecast',
-    'CLINExecutionRequest', 'ActivityLog', 'Notification',
+    'CLINExecutionRequest', 'ActivityLog',
+    'Notification', 'NotificationArchive', 'NotificationCounter', 'NotificationEvent',
     'IntakePath', 'AdvisoryTriggerRule', 'AdvisoryPipelineConfig',
+    'RulesVersion', 'DerivationTable', 'StreamEvent', 'Holiday',
+    'RequestRollup', 'ApprovalRollup', 'AdvisoryRollup', 'CycleTimeSample', 'CycleTimeStat',
+    'DashboardSnapshot', 'CacheGeneration', 'ResponseCacheEntry',
 ]
@@ -14,6 +14,11 @@ class ActivityLog(db.Model):
     new_value = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Serves a request's timeline and its submission lookups (services/cycle_time.py)
+        db.Index('ix_activity_logs_request_type', 'request_id', 'activity_type'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -15,6 +15,8 @@ class AdvisoryInput(db.Model):
     reviewer_id = db.Column(db.Integer, db.ForeignKey('users.id'))
     requested_date = db.Column(db.DateTime, default=datetime.utcnow)
     completed_date = db.Column(db.DateTime)
+    due_date = db.Column(db.DateTime)  # requested_date + the team's SLA days
+    overdue_since = db.Column(db.DateTime)  # stamped by the SLA sweeper when it escalates the breach
     impacts_strategy = db.Column(db.Boolean, default=False)
     blocks_gate = db.Column(db.String(20))  # none, iss, asr, ko_review
     info_request_message = db.Column(db.Text)  # What info the reviewer needs
@@ -24,6 +26,10 @@ class AdvisoryInput(db.Model):
 
     reviewer = db.relationship('User', foreign_keys=[reviewer_id])
 
+    __table_args__ = (
+        db.Index('ix_advisory_inputs_status_due', 'status', 'due_date'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -34,6 +40,7 @@ class AdvisoryInput(db.Model):
             'recommendation': self.recommendation,
             'assigned_at': self.requested_date.isoformat() if self.requested_date else None,
             'completed_at': self.completed_date.isoformat() if self.completed_date else None,
+            'due_date': self.due_date.isoformat() if self.due_date else None,
             'impacts_strategy': self.impacts_strategy,
             'blocks_gate': self.blocks_gate,
             'info_request_message': self.info_request_message,
@@ -70,9 +70,16 @@ class ApprovalStep(db.Model):
     action_by = db.Column(db.String(200))
     action_by_id = db.Column(db.Integer, db.ForeignKey('users.id'))
     comments = db.Column(db.Text)
+    overdue_since = db.Column(db.DateTime)  # stamped by the SLA sweeper when it escalates the breach
 
     actor = db.relationship('User', foreign_keys=[action_by_id])
 
+    __table_args__ = (
+        db.Index('ix_approval_steps_status_due', 'status', 'due_date'),
+        # Finds steps decided since the last cycle-time refresh
+        db.Index('ix_approval_steps_acted_on', 'acted_on_date'),
+    )
+
     @property
     def is_overdue(self):
         if self.status == 'active' and self.due_date:
@@ -0,0 +1,69 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class CycleTimeSample(db.Model):
+    """One measured duration: a request's submission-to-approval cycle or
+    one approval step's dwell at its gate.
+
+    Appended by services/cycle_time.py from ActivityLog and ApprovalStep
+    timestamps; (kind, source_id) points back at the row it came from.
+    """
+    __tablename__ = 'cycle_time_samples'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(10), nullable=False)  # request, gate
+    source_id = db.Column(db.Integer, nullable=False)  # activity_logs.id (request) or approval_steps.id (gate)
+    request_id = db.Column(db.Integer, nullable=False)
+    pipeline = db.Column(db.String(20), nullable=False, default='')
+    tier = db.Column(db.String(20), nullable=False, default='')
+    gate = db.Column(db.String(100), nullable=False, default='')  # step name; '' for request cycles
+    outcome = db.Column(db.String(20))  # approved, rejected, returned
+    started_at = db.Column(db.DateTime, nullable=False)
+    finished_at = db.Column(db.DateTime, nullable=False)
+    days = db.Column(db.Float, nullable=False)
+    business_days = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('kind', 'source_id', name='uix_cycle_time_sample_source'),
+        db.Index('ix_cycle_time_samples_group', 'kind', 'pipeline', 'tier', 'gate'),
+        db.Index('ix_cycle_time_samples_finished', 'kind', 'finished_at'),
+    )
+
+
+class CycleTimeStat(db.Model):
+    """Percentiles and throughput per (kind, pipeline, tier, gate) group.
+
+    tier '*' is the whole pipeline. Refreshed from cycle_time_samples by
+    services/cycle_time.py, only for groups that gained samples.
+    """
+    __tablename__ = 'cycle_time_stats'
+
+    kind = db.Column(db.String(10), primary_key=True)
+    pipeline = db.Column(db.String(20), primary_key=True)
+    tier = db.Column(db.String(20), primary_key=True)
+    gate = db.Column(db.String(100), primary_key=True)
+    samples = db.Column(db.Integer, nullable=False, default=0)
+    mean_days = db.Column(db.Float)
+    mean_business_days = db.Column(db.Float)
+    p50_days = db.Column(db.Float)
+    p90_days = db.Column(db.Float)
+    p99_days = db.Column(db.Float)
+    completed_recent = db.Column(db.Integer, nullable=False, default=0)  # finished in the throughput window
+    throughput_per_week = db.Column(db.Float, nullable=False, default=0)
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'pipeline': self.pipeline or None,
+            'tier': None if self.tier == '*' else (self.tier or None),
+            'gate': self.gate or None,
+            'samples': self.samples,
+            'mean_days': self.mean_days,
+            'mean_business_days': self.mean_business_days,
+            'p50_days': self.p50_days,
+            'p90_days': self.p90_days,
+            'p99_days': self.p99_days,
+            'completed_recent': self.completed_recent,
+            'throughput_per_week': self.throughput_per_week,
+        }
@@ -0,0 +1,41 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class RequestRollup(db.Model):
+    """Request count and estimated value per (status, type, pipeline, tier, fiscal year).
+
+    Maintained by services/dashboard_rollup.py in the same transaction as
+    every request change. Empty key parts are stored as '' so the key can
+    be the primary key.
+    """
+    __tablename__ = 'request_rollups'
+
+    status = db.Column(db.String(50), primary_key=True, default='')
+    derived_acquisition_type = db.Column(db.String(40), primary_key=True, default='')
+    derived_pipeline = db.Column(db.String(20), primary_key=True, default='')
+    derived_tier = db.Column(db.String(20), primary_key=True, default='')
+    fiscal_year = db.Column(db.String(4), primary_key=True, default='')
+    request_count = db.Column(db.Integer, nullable=False, default=0)
+    total_value = db.Column(db.Float, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ApprovalRollup(db.Model):
+    """Approval step count per (status, approver_role); see RequestRollup."""
+    __tablename__ = 'approval_rollups'
+
+    status = db.Column(db.String(20), primary_key=True, default='')
+    approver_role = db.Column(db.String(50), primary_key=True, default='')
+    step_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class AdvisoryRollup(db.Model):
+    """Advisory input count per (status, team); see RequestRollup."""
+    __tablename__ = 'advisory_rollups'
+
+    status = db.Column(db.String(30), primary_key=True, default='')
+    team = db.Column(db.String(30), primary_key=True, default='')
+    input_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,20 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class DashboardSnapshot(db.Model):
+    """One dashboard number on one day, for trend charts.
+
+    Written once a day by services/dashboard_snapshot.py. dimension is the
+    gate, role, team or LOA the value belongs to ('' for the metric's
+    total). The primary key leads with the date, so a date range is one
+    index range scan.
+    """
+    __tablename__ = 'dashboard_snapshots'
+
+    snapshot_date = db.Column(db.Date, primary_key=True)
+    metric = db.Column(db.String(40), primary_key=True)
+    dimension = db.Column(db.String(200), primary_key=True, default='')
+    value = db.Column(db.Float, nullable=False, default=0)
+    backfilled = db.Column(db.Boolean, default=False)  # reconstructed from history rather than observed
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
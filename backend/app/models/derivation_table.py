@@ -0,0 +1,31 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class DerivationTable(db.Model):
+    """Precomputed IntakePath winners for every answer tuple in the intake domain.
+
+    Regenerated by each rules import (see services/decision_table.py) and keyed
+    by a fingerprint of the IntakePath rows it was built from, so workers load
+    it at startup instead of re-enumerating the answer space.
+    """
+    __tablename__ = 'derivation_tables'
+
+    id = db.Column(db.Integer, primary_key=True)
+    fingerprint = db.Column(db.String(64), unique=True, nullable=False)  # sha256 of the path rows
+    rules_version = db.Column(db.Integer)
+    path_count = db.Column(db.Integer, default=0)
+    entry_count = db.Column(db.Integer, default=0)
+    table_json = db.Column(db.Text, nullable=False)   # domain, path ids, winner index per tuple
+    report_json = db.Column(db.Text)                  # ties, unreachable paths, fallthroughs
+    built_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'fingerprint': self.fingerprint,
+            'rules_version': self.rules_version,
+            'path_count': self.path_count,
+            'entry_count': self.entry_count,
+            'built_at': self.built_at.isoformat() if self.built_at else None,
+        }
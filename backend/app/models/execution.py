@@ -17,6 +17,8 @@ class CLINExecutionRequest(db.Model):
     requested_by_id = db.Column(db.Integer, db.ForeignKey('users.id'))
     requested_date = db.Column(db.DateTime, default=datetime.utcnow)
     need_by_date = db.Column(db.String(10))
+    submitted_date = db.Column(db.DateTime)
+    due_date = db.Column(db.DateTime)  # SLA due date of the pending PM/CTO approval (business days)
 
     # Status lifecycle
     status = db.Column(db.String(30), default='draft')
@@ -118,6 +120,8 @@ class CLINExecutionRequest(db.Model):
             'requested_by_name': self.requested_by.name if self.requested_by else None,
             'requested_date': self.requested_date.isoformat() if self.requested_date else None,
             'need_by_date': self.need_by_date,
+            'submitted_date': self.submitted_date.isoformat() if self.submitted_date else None,
+            'due_date': self.due_date.isoformat() if self.due_date else None,
             'status': self.status,
             'funding_status': self.funding_status,
             'funding_action_required': self.funding_action_required,
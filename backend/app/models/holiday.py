@@ -0,0 +1,24 @@
+from app.extensions import db
+
+
+class Holiday(db.Model):
+    """A non-working day skipped by the SLA calendar (services/sla_calendar.py).
+
+    Seeded with U.S. federal holidays (observed dates); admins can add or
+    remove days. Changes bump the rules version so every worker reloads the
+    calendar.
+    """
+    __tablename__ = 'holidays'
+
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, unique=True, nullable=False)
+    name = db.Column(db.String(100), nullable=False)
+    is_federal = db.Column(db.Boolean, default=False)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'date': self.date.isoformat() if self.date else None,
+            'name': self.name,
+            'is_federal': self.is_federal,
+        }
@@ -6,16 +6,58 @@ class Notification(db.Model):
     __tablename__ = 'notifications'
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     request_id = db.Column(db.Integer, db.ForeignKey('acquisition_requests.id'), nullable=True)
     notification_type = db.Column(db.String(50), nullable=False)
     title = db.Column(db.String(300), nullable=False)
     message = db.Column(db.Text)
     is_read = db.Column(db.Boolean, default=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    event_id = db.Column(db.Integer, db.ForeignKey('notification_events.id'), nullable=True)  # outbox event it came from
 
     user = db.relationship('User', foreign_keys=[user_id])
 
+    __table_args__ = (
+        db.UniqueConstraint('event_id', 'user_id', name='uix_notification_event_user'),
+        # Serves a user's inbox (and unread-only inbox) newest first
+        db.Index('ix_notifications_user_read_created', 'user_id', 'is_read', 'created_at'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'request_id': self.request_id,
+            'notification_type': self.notification_type,
+            'title': self.title,
+            'message': self.message,
+            'is_read': self.is_read,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+class NotificationArchive(db.Model):
+    """Read notifications moved out of `notifications` by the retention job.
+
+    Rows keep their original id; see services/notification_retention.py.
+    """
+    __tablename__ = 'notifications_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    request_id = db.Column(db.Integer, db.ForeignKey('acquisition_requests.id'), nullable=True)
+    notification_type = db.Column(db.String(50), nullable=False)
+    title = db.Column(db.String(300), nullable=False)
+    message = db.Column(db.Text)
+    is_read = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime)
+    event_id = db.Column(db.Integer, nullable=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_notifications_archive_user_created', 'user_id', 'created_at'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -26,4 +68,18 @@ class Notification(db.Model):
             'message': self.message,
             'is_read': self.is_read,
             'created_at': self.created_at.isoformat() if self.created_at else None,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None,
         }
+
+
+class NotificationCounter(db.Model):
+    """Unread notification count per user, kept in step with notifications.
+
+    Maintained by services/unread_counter.py so the unread badge never
+    counts the notifications table.
+    """
+    __tablename__ = 'notification_counters'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    unread_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,36 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class NotificationEvent(db.Model):
+    """Outbox row for one notify_* call, expanded into per-user Notifications.
+
+    Workflow code writes the event in the same transaction as the state
+    change; the notification worker (services/notification_outbox.py) later
+    resolves the audience to users and inserts their notifications.
+    """
+    __tablename__ = 'notification_events'
+
+    id = db.Column(db.Integer, primary_key=True)
+    audience_type = db.Column(db.String(20), nullable=False)  # role, team, requestor, user
+    audience = db.Column(db.String(50))  # role name, team name or user id; unused for requestor
+    request_id = db.Column(db.Integer, db.ForeignKey('acquisition_requests.id'), nullable=True)
+    notification_type = db.Column(db.String(50), nullable=False)
+    title = db.Column(db.String(300), nullable=False)
+    message = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    processed_at = db.Column(db.DateTime, index=True)  # null until delivered
+    delivered_count = db.Column(db.Integer)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'audience_type': self.audience_type,
+            'audience': self.audience,
+            'request_id': self.request_id,
+            'notification_type': self.notification_type,
+            'title': self.title,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'processed_at': self.processed_at.isoformat() if self.processed_at else None,
+            'delivered_count': self.delivered_count,
+        }
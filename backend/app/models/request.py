@@ -1,6 +1,10 @@
 from datetime import datetime
 from app.extensions import db
 
+# Requests in these statuses are finished with intake: re-derivation and
+# checklist rule changes leave them alone
+CLOSED_STATUSES = ('approved', 'awarded', 'closed', 'cancelled')
+
 
 class AcquisitionRequest(db.Model):
     __tablename__ = 'acquisition_requests'
@@ -66,6 +70,12 @@ class AcquisitionRequest(db.Model):
     cio_notes = db.Column(db.Text)
     section508_status = db.Column(db.String(30), default='not_required')
 
+    # --- Current action holder (denormalized, kept by services/action_holder.py) ---
+    current_step_id = db.Column(db.Integer)  # active ApprovalStep, if any
+    current_step_role = db.Column(db.String(50))  # approver_role of the active step
+    pending_advisory_teams = db.Column(db.String(200))  # comma-separated teams with requested/in_review advisories
+    advisory_info_requested = db.Column(db.Boolean, default=False)  # an advisory is waiting on the requestor
+
     # --- People ---
     requestor_id = db.Column(db.Integer, db.ForeignKey('users.id'))
     requestor_name = db.Column(db.String(200))
@@ -90,6 +100,11 @@ class AcquisitionRequest(db.Model):
     advisory_inputs = db.relationship('AdvisoryInput', backref='request', lazy='dynamic', cascade='all, delete-orphan')
     activity_logs = db.relationship('ActivityLog', backref='request', lazy='dynamic', cascade='all, delete-orphan')
 
+    __table_args__ = (
+        # Serves status-filtered lists newest first (request list, pipeline gate pages)
+        db.Index('ix_acquisition_requests_status_created', 'status', 'created_at'),
+    )
+
     ROLE_DISPLAY = {
         'branch_chief': 'Branch Chief',
         'cto': 'CTO',
@@ -104,7 +119,11 @@ class AcquisitionRequest(db.Model):
 
     @property
     def action_with(self):
-        """Determine who currently holds the action for this request."""
+        """Determine who currently holds the action for this request.
+
+        Reads only the denormalized holder columns, so serializing a list
+        of requests issues no extra queries.
+        """
         if self.status == 'draft':
             return 'Requestor'
         if self.status in ('approved', 'awarded', 'closed', 'cancelled'):
@@ -112,29 +131,17 @@ class AcquisitionRequest(db.Model):
         if self.status == 'returned':
             return 'Requestor'
 
-        # Check for active approval step
-        from app.models.approval import ApprovalStep
-        active_step = ApprovalStep.query.filter_by(
-            request_id=self.id, status='active'
-        ).first()
-        if active_step:
-            return self.ROLE_DISPLAY.get(active_step.approver_role, active_step.approver_role.replace('_', ' ').title())
-
-        # Check for advisory info requests waiting on requestor
-        from app.models.advisory import AdvisoryInput
-        info_req = AdvisoryInput.query.filter_by(
-            request_id=self.id, status='info_requested'
-        ).first()
-        if info_req:
+        # Active approval step
+        if self.current_step_role:
+            return self.ROLE_DISPLAY.get(self.current_step_role, self.current_step_role.replace('_', ' ').title())
+
+        # Advisory info requests waiting on requestor
+        if self.advisory_info_requested:
             return 'Requestor (info requested)'
 
-        # Check if any advisories are pending
-        pending_adv = AdvisoryInput.query.filter(
-            AdvisoryInput.request_id == self.id,
-            AdvisoryInput.status.in_(['requested', 'in_review'])
-        ).first()
-        if pending_adv:
-            return f'Advisory ({pending_adv.team.upper()})'
+        # Pending advisories
+        if self.pending_advisory_teams:
+            return f'Advisory ({self.pending_advisory_teams.split(",")[0].upper()})'
 
         # Fallback based on status name
         status_map = {
@@ -0,0 +1,31 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class CacheGeneration(db.Model):
+    """Write counter for one table, bumped by every transaction that changes it.
+
+    Only used by the 'database' response cache backend; see
+    services/response_cache.py.
+    """
+    __tablename__ = 'cache_generations'
+
+    table_name = db.Column(db.String(100), primary_key=True)
+    generation = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class ResponseCacheEntry(db.Model):
+    """A cached GET response body shared by every worker process.
+
+    cache_key hashes the endpoint, arguments, role and the generations of
+    the tables the response was built from, so a write elsewhere simply
+    stops the entry from being looked up; old entries are purged by age.
+    """
+    __tablename__ = 'response_cache_entries'
+
+    cache_key = db.Column(db.String(64), primary_key=True)
+    endpoint = db.Column(db.String(100), nullable=False)
+    etag = db.Column(db.String(64), nullable=False)
+    body = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
@@ -0,0 +1,23 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class RulesVersion(db.Model):
+    """Single-row counter bumped whenever the rule tables change.
+
+    Every gunicorn worker keeps compiled copies of the rule tables in memory
+    (see services/rules_cache.py). Those caches are keyed by this counter, so
+    a rules import or admin edit in one worker is picked up by the others.
+    """
+    __tablename__ = 'rules_versions'
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'version': self.version,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
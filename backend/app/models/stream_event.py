@@ -0,0 +1,19 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class StreamEvent(db.Model):
+    """Short-lived relay row for the 'database' event bus backend.
+
+    Each process publishing stream events (gunicorn workers, the notification
+    worker) inserts rows here; every process serving /api/stream polls for
+    new ids and pushes them to its connected clients. Rows are deleted after
+    a few minutes (see services/event_bus.py).
+    """
+    __tablename__ = 'stream_events'
+
+    id = db.Column(db.Integer, primary_key=True)
+    channel = db.Column(db.String(80), nullable=False)  # user:<id>, role:<role>, team:<team>, queues
+    event = db.Column(db.String(50), nullable=False)
+    data = db.Column(db.Text)  # JSON payload
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
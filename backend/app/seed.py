@@ -19,6 +19,12 @@ from app.models import (
     CLINExecutionRequest, ActivityLog, Notification,
     IntakePath, AdvisoryTriggerRule, AdvisoryPipelineConfig,
 )
+from app.services.action_holder import backfill_action_holders
+from app.services.unread_counter import reconcile_unread_counts
+from app.services.dashboard_rollup import reconcile_rollups
+from app.services.cycle_time import refresh_cycle_time_stats
+from app.services.dashboard_snapshot import DEFAULT_BACKFILL_DAYS, backfill_snapshots, take_snapshot
+from app.services.sla_calendar import default_holiday_years, recompute_open_due_dates, seed_federal_holidays
 
 
 def seed():
@@ -31,6 +37,9 @@ def seed():
     print('Importing rules from Excel workbook...')
     _import_rules_from_excel()
 
+    print('Seeding federal holidays...')
+    seed_federal_holidays(default_holiday_years())
+
     print('Seeding advisory pipeline config...')
     _seed_advisory_pipeline_config()
 
@@ -69,6 +78,25 @@ def seed():
     _seed_notifications(users, requests)
 
     db.session.commit()
+
+    print('Backfilling action holders...')
+    backfill_action_holders()
+
+    print('Setting SLA due dates...')
+    recompute_open_due_dates()
+
+    print('Counting unread notifications...')
+    reconcile_unread_counts()
+
+    print('Building dashboard rollups...')
+    reconcile_rollups()
+
+    print('Computing cycle-time statistics...')
+    refresh_cycle_time_stats()
+
+    print('Snapshotting dashboard trends...')
+    backfill_snapshots(datetime.utcnow().date() - timedelta(days=DEFAULT_BACKFILL_DAYS))
+    take_snapshot()
     print('Seed complete.')
 
 
@@ -1361,6 +1389,8 @@ def _seed_execution_requests(requests, users):
         for key, val in d.items():
             if hasattr(exe, key):
                 setattr(exe, key, val)
+        if exe.status != 'draft':
+            exe.submitted_date = now - timedelta(days=9)
 
         # Set approval dates for approved items
         if d.get('pm_approval') == 'approved':
@@ -0,0 +1,164 @@
+"""
+Action Holder — keeps the denormalized "who has the ball" columns on
+AcquisitionRequest (current_step_id, current_step_role,
+pending_advisory_teams, advisory_info_requested) in step with approval
+steps and advisory inputs.
+
+The workflow and advisory code call these helpers in the same transaction
+as the state change, so AcquisitionRequest.action_with never has to query.
+backfill_action_holders() rebuilds the columns for every request from the
+underlying tables. find_trigger_rule() maps an advisory team to its
+trigger rule, for intake and the SLA sweeper.
+"""
+
+from sqlalchemy import update
+from app.extensions import db
+from app.models.request import AcquisitionRequest
+from app.models.approval import ApprovalStep
+from app.models.advisory import AdvisoryInput
+from app.models.advisory_trigger import AdvisoryTriggerRule
+from app.services.event_bus import publish_queue_changed
+
+PENDING_ADVISORY_STATUSES = ('requested', 'in_review')
+OPEN_ADVISORY_STATUSES = PENDING_ADVISORY_STATUSES + ('info_requested',)
+
+# User role -> the advisory team whose queue it works (advisory queue and streams)
+ROLE_TEAM_MAP = {
+    'scrm': 'scrm',
+    'sb': 'sbo',
+    'cto': 'cio',
+    'cio': 'cio',
+    'legal': 'legal',
+    'budget': 'fm',
+}
+
+# Advisory team key -> the team name its AdvisoryTriggerRule rows use
+TRIGGER_RULE_TEAMS = {
+    'scrm': 'SCRM',
+    'sbo': 'Small Business Office',
+    'cio': 'CIO / IT Governance',
+    'section508': 'Section 508',
+    'fm': 'Business Manager (FM)',
+    'fedramp': 'FedRAMP PMO',
+}
+
+
+def set_current_step(request, step):
+    """Record `step` (an active ApprovalStep, or None) as the request's current step."""
+    if step is not None and step.id is None:
+        db.session.flush()
+    previous_role = request.current_step_role
+    request.current_step_id = step.id if step else None
+    request.current_step_role = step.approver_role if step else None
+
+    # The request left one approval queue and/or entered another
+    publish_queue_changed(role=previous_role)
+    if request.current_step_role != previous_role:
+        publish_queue_changed(role=request.current_step_role)
+
+
+def sync_advisories(request):
+    """Recompute the advisory holder columns from the request's open advisories."""
+    rows = db.session.query(AdvisoryInput.team, AdvisoryInput.status).filter(
+        AdvisoryInput.request_id == request.id,
+        AdvisoryInput.status.in_(OPEN_ADVISORY_STATUSES),
+    ).order_by(AdvisoryInput.id).all()
+    request.pending_advisory_teams, request.advisory_info_requested = _advisory_columns(rows)
+
+
+def sync_action_holder(request):
+    """Recompute all holder columns for one request from its steps and advisories."""
+    active = ApprovalStep.query.filter_by(
+        request_id=request.id, status='active'
+    ).order_by(ApprovalStep.id).first()
+    set_current_step(request, active)
+    sync_advisories(request)
+
+
+def _advisory_columns(rows):
+    """(pending_advisory_teams, advisory_info_requested) from (team, status) rows in id order."""
+    pending = []
+    for team, status in rows:
+        if status in PENDING_ADVISORY_STATUSES and team not in pending:
+            pending.append(team)
+    return ','.join(pending) or None, any(status == 'info_requested' for _, status in rows)
+
+
+def find_trigger_rule(team):
+    """Find the AdvisoryTriggerRule for an advisory team key (None if there is none)."""
+    try:
+        search_name = TRIGGER_RULE_TEAMS.get(team, team)
+        return AdvisoryTriggerRule.query.filter(
+            AdvisoryTriggerRule.team.ilike(f'%{search_name}%')
+        ).first()
+    except Exception:
+        return None
+
+
+def backfill_action_holders(chunk_size=1000):
+    """Rebuild the holder columns for every request.
+
+    Reads active steps and open advisories with one grouped query each per
+    chunk of request ids and writes the columns back with one bulk UPDATE
+    per chunk. Commits after each chunk.
+
+    Returns:
+        number of requests whose columns changed
+    """
+    changed = 0
+    last_id = 0
+    while True:
+        requests = db.session.query(
+            AcquisitionRequest.id,
+            AcquisitionRequest.current_step_id,
+            AcquisitionRequest.current_step_role,
+            AcquisitionRequest.pending_advisory_teams,
+            AcquisitionRequest.advisory_info_requested,
+        ).filter(AcquisitionRequest.id > last_id).order_by(AcquisitionRequest.id).limit(chunk_size).all()
+        if not requests:
+            break
+        first_id, last_id = requests[0].id, requests[-1].id
+
+        steps = {}
+        for request_id, step_id, role in db.session.query(
+            ApprovalStep.request_id, ApprovalStep.id, ApprovalStep.approver_role,
+        ).filter(
+            ApprovalStep.request_id.between(first_id, last_id),
+            ApprovalStep.status == 'active',
+        ).order_by(ApprovalStep.id):
+            steps.setdefault(request_id, (step_id, role))
+
+        advisories = {}
+        for request_id, team, status in db.session.query(
+            AdvisoryInput.request_id, AdvisoryInput.team, AdvisoryInput.status,
+        ).filter(
+            AdvisoryInput.request_id.between(first_id, last_id),
+            AdvisoryInput.status.in_(OPEN_ADVISORY_STATUSES),
+        ).order_by(AdvisoryInput.id):
+            advisories.setdefault(request_id, []).append((team, status))
+
+        updates = []
+        for row in requests:
+            step_id, role = steps.get(row.id, (None, None))
+            pending, info_requested = _advisory_columns(advisories.get(row.id, []))
+            values = {
+                'current_step_id': step_id,
+                'current_step_role': role,
+                'pending_advisory_teams': pending,
+                'advisory_info_requested': info_requested,
+            }
+            current = {
+                'current_step_id': row.current_step_id,
+                'current_step_role': row.current_step_role,
+                'pending_advisory_teams': row.pending_advisory_teams,
+                'advisory_info_requested': bool(row.advisory_info_requested),
+            }
+            if values != current:
+                updates.append(dict(values, id=row.id))
+
+        if updates:
+            db.session.execute(update(AcquisitionRequest), updates)
+            changed += len(updates)
+        db.session.commit()
+
+    return changed
@@ -0,0 +1,113 @@
+"""
+Approval Template Graph — approval templates, their steps, SLA days and
+compiled step conditions, held per process for the current rules version.
+
+Templates only change on a rules import or an admin step edit, both of which
+bump the rules version, so submitting a request or advancing a step reads
+its template from memory instead of querying approval_templates and
+approval_template_steps.
+"""
+
+from collections import namedtuple
+from app.models.approval import ApprovalTemplate, ApprovalTemplateStep
+from app.services.rule_engine import compile_condition
+from app.services.rules_cache import get_cached
+
+DEFAULT_SLA_DAYS = 5
+
+TemplateStep = namedtuple('TemplateStep', [
+    'id', 'step_number', 'step_name', 'approver_role', 'sla_days',
+    'is_conditional', 'is_enabled', 'escalation_to', 'predicate',
+])
+
+
+class TemplateNode:
+    """Read-only snapshot of an ApprovalTemplate and its steps.
+
+    Exposes the same attributes callers used on the model (id, name,
+    template_key, pipeline_type) plus an identical to_dict().
+    """
+
+    def __init__(self, template, steps):
+        self.id = template.id
+        self.template_key = template.template_key
+        self.name = template.name
+        self.description = template.description
+        self.pipeline_type = template.pipeline_type
+        self.is_default = template.is_default
+
+        self.steps = tuple(
+            TemplateStep(
+                id=s.id,
+                step_number=s.step_number,
+                step_name=s.step_name,
+                approver_role=s.approver_role,
+                sla_days=s.sla_days,
+                is_conditional=s.is_conditional,
+                is_enabled=s.is_enabled,
+                escalation_to=s.escalation_to,
+                # Steps whose condition cannot be evaluated stay in the chain
+                predicate=compile_condition(s.condition_rule, default=True),
+            )
+            for s in steps
+        )
+        self.enabled_steps = tuple(s for s in self.steps if s.is_enabled)
+        self._step_dicts = [s.to_dict() for s in steps]
+
+        self._sla = {}
+        self._escalation = {}
+        for s in sorted(steps, key=lambda s: s.id):
+            self._sla.setdefault(s.step_number, s.sla_days)
+            self._escalation.setdefault(s.step_number, s.escalation_to)
+
+    def sla_days(self, step_number):
+        """SLA days for a step number (first matching step, enabled or not)."""
+        return self._sla.get(step_number, DEFAULT_SLA_DAYS)
+
+    def escalation_to(self, step_number):
+        """Configured escalation target for a step number, or None."""
+        return self._escalation.get(step_number)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'template_key': self.template_key,
+            'name': self.name,
+            'description': self.description,
+            'pipeline_type': self.pipeline_type,
+            'is_default': self.is_default,
+            'steps': [dict(s) for s in self._step_dicts],
+        }
+
+
+class TemplateGraph:
+    """All approval templates indexed by id, template_key and pipeline_type."""
+
+    def __init__(self, templates, steps):
+        steps_by_template = {}
+        for s in steps:
+            steps_by_template.setdefault(s.template_id, []).append(s)
+
+        self.by_id = {}
+        self.by_key = {}
+        self.by_pipeline = {}
+        for t in templates:
+            node = TemplateNode(t, steps_by_template.get(t.id, []))
+            self.by_id[t.id] = node
+            if t.template_key:
+                self.by_key.setdefault(t.template_key, node)
+            if t.pipeline_type:
+                self.by_pipeline.setdefault(t.pipeline_type, node)
+
+
+def get_template_graph():
+    """Return the TemplateGraph for the current rules version."""
+    return get_cached('approval_templates', _build_template_graph)
+
+
+def _build_template_graph():
+    templates = ApprovalTemplate.query.order_by(ApprovalTemplate.id).all()
+    steps = ApprovalTemplateStep.query.order_by(
+        ApprovalTemplateStep.step_number, ApprovalTemplateStep.id
+    ).all()
+    return TemplateGraph(templates, steps)
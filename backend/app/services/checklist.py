@@ -1,12 +1,125 @@
 """
 Document Checklist Engine — evaluates DocumentRule conditions against
 request fields and creates/updates PackageDocument records.
+
+Templates and their rules are loaded once per rules version into a cached
+checklist plan (conditions compiled by services/rule_engine.py), so building
+a request's checklist costs one query for its existing PackageDocuments plus
+a single bulk insert for new ones, however many templates there are. The
+plan also indexes rules by the request fields they read, so recalculation
+after an edit only re-evaluates the templates those fields can affect.
 """
 
-import json
+from collections import namedtuple
 from datetime import datetime
+from sqlalchemy import and_, case, exists, false, func, insert, literal, not_, or_, select, update
 from app.extensions import db
 from app.models.document import DocumentTemplate, DocumentRule, PackageDocument
+from app.models.request import CLOSED_STATUSES, AcquisitionRequest
+from app.services.rule_engine import build_field_index, compile_condition, condition_fields, condition_to_sql
+from app.services.rules_cache import get_cached
+
+ChecklistTemplate = namedtuple('ChecklistTemplate', [
+    'id', 'doc_type_key', 'name', 'required_before_gate', 'rules',
+])
+ChecklistRule = namedtuple('ChecklistRule', ['id', 'applicability', 'predicate', 'fields'])
+
+
+class ChecklistPlan:
+    """Templates in checklist order, plus an inverted index from each request
+    field to the rules that read it."""
+
+    def __init__(self, templates):
+        self.templates = tuple(templates)
+        self.field_index = build_field_index(
+            (rule.id, rule.fields) for t in self.templates for rule in t.rules
+        )
+        self._rule_template = {rule.id: t.id for t in self.templates for rule in t.rules}
+
+    def __iter__(self):
+        return iter(self.templates)
+
+    def __len__(self):
+        return len(self.templates)
+
+    @property
+    def fields(self):
+        """Every request field read by some rule."""
+        return frozenset(self.field_index)
+
+    def templates_reading(self, fields):
+        """Ids of templates with at least one rule that reads any of `fields`."""
+        return {
+            self._rule_template[rule_id]
+            for field in fields
+            for rule_id in self.field_index.get(field, ())
+        }
+
+
+def get_checklist_plan():
+    """Return every DocumentTemplate with its rules, highest priority first.
+
+    Cached per rules version; holds plain tuples, not ORM instances, so it is
+    safe to share across requests and sessions.
+    """
+    return get_cached('checklist_plan', _build_checklist_plan)
+
+
+def _build_checklist_plan():
+    rules_by_template = {}
+    rules = DocumentRule.query.order_by(
+        DocumentRule.priority.desc(), DocumentRule.id
+    ).all()
+    for rule in rules:
+        rules_by_template.setdefault(rule.document_template_id, []).append(ChecklistRule(
+            id=rule.id,
+            applicability=rule.applicability,
+            predicate=compile_condition(rule.conditions, default=False),
+            fields=condition_fields(rule.conditions),
+        ))
+
+    return ChecklistPlan(
+        ChecklistTemplate(
+            id=t.id,
+            doc_type_key=t.doc_type_key,
+            name=t.name,
+            required_before_gate=t.required_before_gate,
+            rules=tuple(rules_by_template.get(t.id, ())),
+        )
+        for t in DocumentTemplate.query.order_by(DocumentTemplate.id).all()
+    )
+
+
+def _matching_rule(template, request):
+    """Return the highest priority rule whose conditions match, or None."""
+    for rule in template.rules:
+        if rule.predicate(request):
+            return rule
+    return None
+
+
+def _existing_documents(request):
+    """PackageDocuments for the request keyed by template id (first row wins)."""
+    existing = {}
+    docs = PackageDocument.query.filter_by(request_id=request.id).order_by(PackageDocument.id).all()
+    for doc in docs:
+        existing.setdefault(doc.document_template_id, doc)
+    return existing
+
+
+def _new_document_row(request, template, is_required, now):
+    return {
+        'request_id': request.id,
+        'document_template_id': template.id,
+        'document_type': template.doc_type_key,
+        'title': template.name,
+        'status': 'not_started' if is_required else 'not_required',
+        'required_before_gate': template.required_before_gate,
+        'is_required': is_required,
+        'was_required': False,
+        'created_at': now,
+        'updated_at': now,
+    }
 
 
 def generate_checklist(request):
@@ -21,44 +134,22 @@ def generate_checklist(request):
         list of created PackageDocument dicts
     """
     created = []
-    templates = DocumentTemplate.query.all()
-
-    for template in templates:
-        rules = DocumentRule.query.filter_by(document_template_id=template.id).order_by(
-            DocumentRule.priority.desc()
-        ).all()
+    new_rows = []
+    now = datetime.utcnow()
+    existing_docs = _existing_documents(request)
 
-        is_required = False
-        applicability = 'not_required'
-
-        for rule in rules:
-            if _evaluate_conditions(rule.conditions, request):
-                is_required = True
-                applicability = rule.applicability
-                break  # highest priority matching rule wins
-
-        # Check if document already exists for this request+template
-        existing = PackageDocument.query.filter_by(
-            request_id=request.id,
-            document_template_id=template.id,
-        ).first()
+    for template in get_checklist_plan():
+        rule = _matching_rule(template, request)  # highest priority matching rule wins
+        is_required = rule is not None
+        applicability = rule.applicability if rule else 'not_required'
 
+        existing = existing_docs.get(template.id)
         if existing:
             # Update existing
             existing.is_required = is_required
             existing.status = 'not_started' if is_required else 'not_required'
         else:
-            doc = PackageDocument(
-                request_id=request.id,
-                document_template_id=template.id,
-                document_type=template.doc_type_key,
-                title=template.name,
-                status='not_started' if is_required else 'not_required',
-                required_before_gate=template.required_before_gate,
-                is_required=is_required,
-                was_required=False,
-            )
-            db.session.add(doc)
+            new_rows.append(_new_document_row(request, template, is_required, now))
             created.append({
                 'doc_type_key': template.doc_type_key,
                 'name': template.name,
@@ -67,36 +158,41 @@ def generate_checklist(request):
                 'required_before_gate': template.required_before_gate,
             })
 
+    if new_rows:
+        db.session.execute(insert(PackageDocument), new_rows)
     db.session.commit()
     return created
 
 
-def recalculate_checklist(request):
+def recalculate_checklist(request, changed_fields=None):
     """
     "Oops" design: re-evaluate conditions after request changes.
     Mark is_required/was_required and return diff of what changed.
 
+    Args:
+        request: AcquisitionRequest instance
+        changed_fields: request fields changed since the checklist was last
+            evaluated. Only templates with a rule reading one of them are
+            re-evaluated; the rest keep their current requirement. None
+            re-evaluates every template.
+
     Returns:
         dict with added, removed, unchanged lists
     """
     diff = {'added': [], 'removed': [], 'unchanged': []}
-    templates = DocumentTemplate.query.all()
+    new_rows = []
+    now = datetime.utcnow()
+    existing_docs = _existing_documents(request)
 
-    for template in templates:
-        rules = DocumentRule.query.filter_by(document_template_id=template.id).order_by(
-            DocumentRule.priority.desc()
-        ).all()
+    plan = get_checklist_plan()
+    affected = None if changed_fields is None else plan.templates_reading(changed_fields)
 
-        now_required = False
-        for rule in rules:
-            if _evaluate_conditions(rule.conditions, request):
-                now_required = True
-                break
-
-        existing = PackageDocument.query.filter_by(
-            request_id=request.id,
-            document_template_id=template.id,
-        ).first()
+    for template in plan:
+        existing = existing_docs.get(template.id)
+        if existing and affected is not None and template.id not in affected:
+            now_required = existing.is_required
+        else:
+            now_required = _matching_rule(template, request) is not None
 
         if existing:
             was = existing.is_required
@@ -128,118 +224,176 @@ def recalculate_checklist(request):
                 })
         else:
             # Create new document record
-            doc = PackageDocument(
-                request_id=request.id,
-                document_template_id=template.id,
-                document_type=template.doc_type_key,
-                title=template.name,
-                status='not_started' if now_required else 'not_required',
-                required_before_gate=template.required_before_gate,
-                is_required=now_required,
-                was_required=False,
-            )
-            db.session.add(doc)
+            new_rows.append(_new_document_row(request, template, now_required, now))
             if now_required:
                 diff['added'].append({
                     'doc_type_key': template.doc_type_key,
                     'name': template.name,
                 })
 
+    if new_rows:
+        db.session.execute(insert(PackageDocument), new_rows)
     db.session.commit()
     return diff
 
 
-def _evaluate_conditions(conditions_json, request):
-    """
-    Evaluate a JSON conditions string against request fields.
-
-    Condition format:
-    {
-        "allOf": [
-            {"field": "derived_acquisition_type", "operator": "in", "values": ["new_competitive", "recompete"]},
-            {"field": "estimated_value", "operator": ">", "value": 15000}
-        ]
-    }
-
-    Operators: in, not_in, ==, !=, >, <, >=, <=, exists
-    """
-    if not conditions_json:
-        return False
-
-    try:
-        conditions = json.loads(conditions_json) if isinstance(conditions_json, str) else conditions_json
-    except (json.JSONDecodeError, TypeError):
-        return False
-
-    # Handle allOf (AND logic)
-    if 'allOf' in conditions:
-        return all(_evaluate_single(c, request) for c in conditions['allOf'])
-
-    # Handle anyOf (OR logic)
-    if 'anyOf' in conditions:
-        return any(_evaluate_single(c, request) for c in conditions['anyOf'])
-
-    # Single condition
-    return _evaluate_single(conditions, request)
-
+# ---------------------------------------------------------------------------
+# Set-based rule impact (rule conditions compiled to SQL)
+# ---------------------------------------------------------------------------
 
-def _evaluate_single(condition, request):
-    """Evaluate a single condition against a request."""
-    field = condition.get('field')
-    operator = condition.get('operator')
+def _requirement_sql(conditions_list):
+    """WHERE clause matching requests for which any of the conditions holds."""
+    return or_(false(), *(
+        condition_to_sql(c, AcquisitionRequest, default=False) for c in conditions_list
+    ))
 
-    if not field or not operator:
-        return False
 
-    # Get field value from request
-    field_value = _get_field_value(request, field)
+def _open_requests():
+    return AcquisitionRequest.status.notin_(CLOSED_STATUSES)
 
-    if operator == 'exists':
-        return field_value is not None
 
-    if operator == 'in':
-        values = condition.get('values', [])
-        return field_value in values
+def preview_rule_impact(template_id, conditions=None, rule_id=None, delete=False):
+    """Count how a rule change would alter a template's checklist rows on open requests.
 
-    if operator == 'not_in':
-        values = condition.get('values', [])
-        return field_value not in values
-
-    compare_value = condition.get('value')
-
-    if operator == '==':
-        return field_value == compare_value
+    Args:
+        template_id: DocumentTemplate the rule belongs to
+        conditions: proposed conditions (JSON string or dict) for the rule;
+            None with rule_id keeps that rule's current conditions
+        rule_id: existing rule being edited or deleted (None for a new rule)
+        delete: preview removing rule_id instead of changing it
 
-    if operator == '!=':
-        return field_value != compare_value
+    Raises:
+        BadRequestError: a condition cannot be compiled to SQL
 
-    # Numeric comparisons
-    try:
-        fv = float(field_value) if field_value is not None else 0
-        cv = float(compare_value) if compare_value is not None else 0
-    except (ValueError, TypeError):
-        return False
+    Returns:
+        dict with open request count, how many match the rule, how many
+        would require the document, and how many PackageDocuments would
+        become required / stop being required
+    """
+    rules = DocumentRule.query.filter_by(document_template_id=template_id).all()
+    others = [r.conditions for r in rules if r.id != rule_id]
+    if rule_id is not None and conditions is None:
+        existing = next((r for r in rules if r.id == rule_id), None) or db.session.get(DocumentRule, rule_id)
+        conditions = existing.conditions if existing else None
+    rule_match = condition_to_sql(conditions, AcquisitionRequest) if not delete else false()
+    proposed = _requirement_sql(others + ([] if delete else [conditions]))
+
+    doc_required = func.coalesce(PackageDocument.is_required, false())
+    has_doc = PackageDocument.id.isnot(None)
+
+    def count(clause):
+        return func.coalesce(func.sum(case((clause, 1), else_=0)), 0)
+
+    row = db.session.query(
+        func.count(AcquisitionRequest.id),
+        count(rule_match),
+        count(proposed),
+        count(and_(has_doc, proposed, not_(doc_required))),
+        count(and_(has_doc, not_(proposed), doc_required)),
+    ).outerjoin(PackageDocument, and_(
+        PackageDocument.request_id == AcquisitionRequest.id,
+        PackageDocument.document_template_id == template_id,
+    )).filter(_open_requests()).one()
+
+    return {
+        'document_template_id': template_id,
+        'open_requests': row[0],
+        'rule_matches': row[1],
+        'required_after': row[2],
+        'newly_required': row[3],
+        'no_longer_required': row[4],
+    }
 
-    if operator == '>':
-        return fv > cv
-    if operator == '<':
-        return fv < cv
-    if operator == '>=':
-        return fv >= cv
-    if operator == '<=':
-        return fv <= cv
 
-    return False
+def apply_template_to_open_requests(template_id):
+    """Re-apply a template's current rules to every open request with set-based SQL.
 
+    Mirrors recalculate_checklist for one template: newly required documents
+    are reset from not_required to not_started, documents no longer required
+    are flagged was_required, and open requests with completed intake but no
+    row for the template get one.
 
-def _get_field_value(request, field):
-    """Get a field value from the request object."""
-    # Direct attribute access
-    if hasattr(request, field):
-        return getattr(request, field)
+    Raises:
+        BadRequestError: a rule of the template cannot be compiled to SQL
 
-    # Fallback: try dict access if request is a dict
-    if isinstance(request, dict):
-        return request.get(field)
+    Returns:
+        dict with added, removed and created row counts, or None if the
+        template does not exist
+    """
+    template = db.session.get(DocumentTemplate, template_id)
+    if template is None:
+        return None
+    rules = DocumentRule.query.filter_by(document_template_id=template_id).all()
+    required = _requirement_sql([r.conditions for r in rules])
+    now = datetime.utcnow()
+
+    def open_request_ids(clause):
+        return select(AcquisitionRequest.id).where(_open_requests(), clause)
+
+    added = db.session.execute(
+        update(PackageDocument)
+        .where(
+            PackageDocument.document_template_id == template_id,
+            func.coalesce(PackageDocument.is_required, false()) == false(),
+            PackageDocument.request_id.in_(open_request_ids(required)),
+        )
+        .values(
+            is_required=True,
+            was_required=False,
+            status=case((PackageDocument.status == 'not_required', 'not_started'),
+                        else_=PackageDocument.status),
+            updated_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+    removed = db.session.execute(
+        update(PackageDocument)
+        .where(
+            PackageDocument.document_template_id == template_id,
+            PackageDocument.is_required.is_(True),
+            PackageDocument.request_id.in_(open_request_ids(not_(required))),
+        )
+        .values(
+            is_required=False,
+            was_required=True,
+            status=case((PackageDocument.status == 'not_started', 'not_required'),
+                        else_=PackageDocument.status),
+            updated_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+    missing = select(
+        AcquisitionRequest.id,
+        literal(template.id),
+        literal(template.doc_type_key),
+        literal(template.name),
+        case((required, 'not_started'), else_='not_required'),
+        literal(template.required_before_gate),
+        case((required, True), else_=False),
+        literal(False),
+        literal(now),
+        literal(now),
+    ).where(
+        _open_requests(),
+        AcquisitionRequest.intake_completed.is_(True),
+        ~exists().where(
+            PackageDocument.request_id == AcquisitionRequest.id,
+            PackageDocument.document_template_id == template.id,
+        ),
+    )
+    created = db.session.execute(
+        insert(PackageDocument).from_select([
+            'request_id', 'document_template_id', 'document_type', 'title', 'status',
+            'required_before_gate', 'is_required', 'was_required', 'created_at', 'updated_at',
+        ], missing)
+    ).rowcount
 
-    return None
+    db.session.commit()
+    return {
+        'document_template_id': template_id,
+        'added': added,
+        'removed': removed,
+        'created': created,
+    }
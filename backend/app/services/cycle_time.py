@@ -0,0 +1,244 @@
+"""
+Cycle Time — percentiles and throughput from approval timestamps.
+
+Two kinds of duration are measured:
+
+    request   first 'submitted' ActivityLog entry -> 'fully_approved' entry
+    gate      ApprovalStep.activated_at -> acted_on_date, per step name
+              (approved, rejected or returned)
+
+Each completed request or step becomes one row in cycle_time_samples,
+tagged with the request's pipeline and tier. Samples are appended
+incrementally: request cycles past the last ingested ActivityLog id, gate
+dwells acted on since the newest ingested one.
+
+cycle_time_stats holds, per (kind, pipeline, tier, gate), the sample
+count, mean calendar and business days, p50/p90/p99 days (numpy) and the
+throughput over the last THROUGHPUT_WINDOW_DAYS. tier '*' rolls a pipeline
+up across tiers. A refresh recomputes percentiles only for the groups that
+gained samples; throughput is a single grouped count over the window.
+
+/api/dashboard/cycle-time only reads the stats table. The maintenance
+worker refreshes it every REFRESH_INTERVAL seconds; `flask
+refresh-cycle-times` runs it on demand.
+"""
+
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import bindparam, exists, func, update
+from app.extensions import db, dialect_insert
+from app.models.activity import ActivityLog
+from app.models.approval import ApprovalStep
+from app.models.cycle_time import CycleTimeSample, CycleTimeStat
+from app.models.request import AcquisitionRequest
+from app.services.sla_calendar import business_days_between
+
+REFRESH_INTERVAL = 10 * 60
+THROUGHPUT_WINDOW_DAYS = 28
+INGEST_BATCH_SIZE = 1000
+ALL_TIERS = '*'
+PERCENTILES = (50, 90, 99)
+
+GATE_OUTCOMES = ('approved', 'rejected', 'returned')
+
+
+def refresh_cycle_time_stats(now=None):
+    """Ingest new samples and refresh the stats they touch. Commits.
+
+    Returns:
+        dict with the number of request and gate samples added and the
+        number of stat groups recomputed
+    """
+    now = now or datetime.utcnow()
+    request_samples, request_groups = _ingest_request_samples()
+    gate_samples, gate_groups = _ingest_gate_samples()
+    groups = request_groups | gate_groups
+    _recompute(groups, now)
+    _refresh_throughput(now)
+    db.session.commit()
+    return {'request_samples': request_samples, 'gate_samples': gate_samples, 'groups': len(groups)}
+
+
+def _ingest_request_samples():
+    """Append a request sample per 'fully_approved' log entry not yet ingested."""
+    last_id = db.session.query(func.max(CycleTimeSample.source_id)).filter(
+        CycleTimeSample.kind == 'request'
+    ).scalar() or 0
+
+    added = 0
+    groups = set()
+    while True:
+        done = db.session.query(
+            ActivityLog.id, ActivityLog.request_id, ActivityLog.created_at,
+            AcquisitionRequest.derived_pipeline, AcquisitionRequest.derived_tier,
+        ).join(
+            AcquisitionRequest, AcquisitionRequest.id == ActivityLog.request_id
+        ).filter(
+            ActivityLog.id > last_id, ActivityLog.activity_type == 'fully_approved'
+        ).order_by(ActivityLog.id).limit(INGEST_BATCH_SIZE).all()
+        if not done:
+            break
+        last_id = done[-1].id
+
+        request_ids = {row.request_id for row in done}
+        submitted = dict(db.session.query(
+            ActivityLog.request_id, func.min(ActivityLog.created_at)
+        ).filter(
+            ActivityLog.request_id.in_(request_ids), ActivityLog.activity_type == 'submitted'
+        ).group_by(ActivityLog.request_id).all())
+        # Requests with no submission entry start at their first activated step
+        first_step = dict(db.session.query(
+            ApprovalStep.request_id, func.min(ApprovalStep.activated_at)
+        ).filter(ApprovalStep.request_id.in_(request_ids)).group_by(ApprovalStep.request_id).all())
+
+        rows = []
+        for row in done:
+            started = submitted.get(row.request_id) or first_step.get(row.request_id)
+            if started and row.created_at and started <= row.created_at:
+                rows.append({
+                    'kind': 'request', 'source_id': row.id, 'request_id': row.request_id,
+                    'pipeline': row.derived_pipeline or '', 'tier': row.derived_tier or '', 'gate': '',
+                    'outcome': 'approved', 'started_at': started, 'finished_at': row.created_at,
+                })
+        added += _insert_samples(rows, groups)
+    return added, groups
+
+
+def _ingest_gate_samples():
+    """Append a gate sample per approval step acted on since the newest one ingested."""
+    since = db.session.query(func.max(CycleTimeSample.finished_at)).filter(
+        CycleTimeSample.kind == 'gate'
+    ).scalar()
+
+    added = 0
+    groups = set()
+    last_id = 0
+    while True:
+        query = db.session.query(
+            ApprovalStep.id, ApprovalStep.request_id, ApprovalStep.step_name, ApprovalStep.status,
+            ApprovalStep.activated_at, ApprovalStep.acted_on_date,
+            AcquisitionRequest.derived_pipeline, AcquisitionRequest.derived_tier,
+        ).join(
+            AcquisitionRequest, AcquisitionRequest.id == ApprovalStep.request_id
+        ).filter(
+            ApprovalStep.id > last_id,
+            ApprovalStep.status.in_(GATE_OUTCOMES),
+            ApprovalStep.activated_at.isnot(None),
+            ApprovalStep.acted_on_date.isnot(None),
+        )
+        if since:
+            # >= and NOT EXISTS: steps acted on in the watermark's instant may
+            # not all have been ingested yet
+            query = query.filter(
+                ApprovalStep.acted_on_date >= since,
+                ~exists().where(CycleTimeSample.kind == 'gate', CycleTimeSample.source_id == ApprovalStep.id),
+            )
+        steps = query.order_by(ApprovalStep.id).limit(INGEST_BATCH_SIZE).all()
+        if not steps:
+            break
+        last_id = steps[-1].id
+
+        added += _insert_samples([{
+            'kind': 'gate', 'source_id': s.id, 'request_id': s.request_id,
+            'pipeline': s.derived_pipeline or '', 'tier': s.derived_tier or '', 'gate': s.step_name,
+            'outcome': s.status, 'started_at': s.activated_at, 'finished_at': s.acted_on_date,
+        } for s in steps if s.activated_at <= s.acted_on_date], groups)
+    return added, groups
+
+
+def _insert_samples(rows, groups):
+    """Insert sample rows (skipping ones already ingested) and note their groups."""
+    if not rows:
+        return 0
+    business = business_days_between([r['started_at'] for r in rows], [r['finished_at'] for r in rows])
+    for row, days in zip(rows, business):
+        row['days'] = (row['finished_at'] - row['started_at']).total_seconds() / 86400
+        row['business_days'] = days
+        groups.add((row['kind'], row['pipeline'], row['tier'], row['gate']))
+        groups.add((row['kind'], row['pipeline'], ALL_TIERS, row['gate']))
+    stmt = dialect_insert()(CycleTimeSample.__table__).on_conflict_do_nothing(index_elements=['kind', 'source_id'])
+    return db.session.execute(stmt, rows).rowcount
+
+
+def _recompute(groups, now):
+    """Recompute count, means and percentiles for `groups`, one sample query per pipeline."""
+    by_pipeline = {}
+    for kind, pipeline, tier, gate in groups:
+        by_pipeline.setdefault((kind, pipeline), set()).add(gate)
+
+    stats = []
+    for (kind, pipeline), gates in sorted(by_pipeline.items()):
+        samples = {}
+        for tier, gate, days, business_days in db.session.query(
+            CycleTimeSample.tier, CycleTimeSample.gate, CycleTimeSample.days, CycleTimeSample.business_days,
+        ).filter(
+            CycleTimeSample.kind == kind,
+            CycleTimeSample.pipeline == pipeline,
+            CycleTimeSample.gate.in_(gates),
+        ):
+            for group_tier in (tier, ALL_TIERS):
+                group = samples.setdefault((group_tier, gate), ([], []))
+                group[0].append(days)
+                group[1].append(business_days)
+
+        for tier, gate in sorted(samples):
+            if (kind, pipeline, tier, gate) not in groups:
+                continue
+            days, business_days = (np.array(values, dtype=float) for values in samples[(tier, gate)])
+            p50, p90, p99 = np.percentile(days, PERCENTILES)
+            stats.append({
+                'kind': kind, 'pipeline': pipeline, 'tier': tier, 'gate': gate,
+                'samples': len(days),
+                'mean_days': round(float(days.mean()), 2),
+                'mean_business_days': round(float(business_days.mean()), 2),
+                'p50_days': round(float(p50), 2),
+                'p90_days': round(float(p90), 2),
+                'p99_days': round(float(p99), 2),
+                'refreshed_at': now,
+            })
+
+    if stats:
+        stmt = dialect_insert()(CycleTimeStat)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['kind', 'pipeline', 'tier', 'gate'],
+            set_={c: stmt.excluded[c] for c in (
+                'samples', 'mean_days', 'mean_business_days',
+                'p50_days', 'p90_days', 'p99_days', 'refreshed_at',
+            )},
+        )
+        db.session.execute(stmt, stats)
+
+
+def _refresh_throughput(now):
+    """Set completed_recent and throughput_per_week on every stats row."""
+    since = now - timedelta(days=THROUGHPUT_WINDOW_DAYS)
+    recent = {}
+    for kind, pipeline, tier, gate, count in db.session.query(
+        CycleTimeSample.kind, CycleTimeSample.pipeline, CycleTimeSample.tier, CycleTimeSample.gate, func.count(),
+    ).filter(CycleTimeSample.finished_at >= since).group_by(
+        CycleTimeSample.kind, CycleTimeSample.pipeline, CycleTimeSample.tier, CycleTimeSample.gate,
+    ):
+        for group_tier in (tier, ALL_TIERS):
+            key = (kind, pipeline, group_tier, gate)
+            recent[key] = recent.get(key, 0) + count
+
+    keys = db.session.query(
+        CycleTimeStat.kind, CycleTimeStat.pipeline, CycleTimeStat.tier, CycleTimeStat.gate,
+    ).all()
+    if not keys:
+        return
+    weeks = THROUGHPUT_WINDOW_DAYS / 7
+    table = CycleTimeStat.__table__
+    db.session.execute(
+        update(table).where(
+            table.c.kind == bindparam('k_kind'),
+            table.c.pipeline == bindparam('k_pipeline'),
+            table.c.tier == bindparam('k_tier'),
+            table.c.gate == bindparam('k_gate'),
+        ).values(completed_recent=bindparam('count'), throughput_per_week=bindparam('throughput')),
+        [{
+            'k_kind': kind, 'k_pipeline': pipeline, 'k_tier': tier, 'k_gate': gate,
+            'count': recent.get((kind, pipeline, tier, gate), 0),
+            'throughput': round(recent.get((kind, pipeline, tier, gate), 0) / weeks, 2),
+        } for kind, pipeline, tier, gate in keys],
+    )
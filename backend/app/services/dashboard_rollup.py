@@ -0,0 +1,274 @@
+"""
+Dashboard Rollups — request, approval and advisory counts kept in summary tables.
+
+request_rollups holds the number and total estimated value of requests per
+(status, acquisition type, pipeline, tier, fiscal year); approval_rollups
+counts approval steps per (status, approver_role) and advisory_rollups
+advisory inputs per (status, team). The dashboard reads these, so its cost
+grows with the number of groups rather than the number of requests.
+
+The rollups are kept current by Session flush hooks instead of calls at
+each call site: every flush that inserts or deletes a request, approval
+step or advisory input, or changes one of its key columns (or a request's
+estimated_value), applies the matching -1/+1 deltas with one upsert per
+rollup table, inside the same transaction. The workflow, intake, advisory
+and request endpoints are covered without further changes, and a rollback
+discards the deltas together with the change.
+
+Bulk UPDATE/DELETE statements bypass the ORM, so they report their rows
+themselves: rederivation calls record_updates() and the workflow's step
+reset calls record_deletes().
+
+reconcile_rollups() rebuilds all three tables from the source tables and
+reports the groups that had drifted (`flask reconcile-rollups`).
+"""
+
+from datetime import datetime
+from sqlalchemy import delete, event, func, inspect, insert, select
+from sqlalchemy.orm import Session
+from app.extensions import db, dialect_insert
+from app.models.advisory import AdvisoryInput
+from app.models.approval import ApprovalStep
+from app.models.dashboard_rollup import AdvisoryRollup, ApprovalRollup, RequestRollup
+from app.models.request import AcquisitionRequest
+
+# Stored in place of NULL key parts, which a primary key cannot hold
+NO_KEY = ''
+
+# Request statuses shown as gates on the pipeline dashboard (and snapshotted), in flow order
+PIPELINE_GATES = (
+    ('draft', 'Draft'),
+    ('submitted', 'Submitted'),
+    ('iss_review', 'ISS Review'),
+    ('asr_review', 'ASR Review'),
+    ('finance_review', 'Finance'),
+    ('ko_review', 'KO Review'),
+    ('legal_review', 'Legal'),
+    ('cio_approval', 'CIO'),
+    ('senior_review', 'Senior'),
+    ('approved', 'Approved'),
+    ('awarded', 'Awarded'),
+)
+
+# Source model -> (rollup model, key columns, count column, summed value column)
+ROLLUPS = {
+    AcquisitionRequest: (
+        RequestRollup,
+        ('status', 'derived_acquisition_type', 'derived_pipeline', 'derived_tier', 'fiscal_year'),
+        'request_count', 'estimated_value',
+    ),
+    ApprovalStep: (ApprovalRollup, ('status', 'approver_role'), 'step_count', None),
+    AdvisoryInput: (AdvisoryRollup, ('status', 'team'), 'input_count', None),
+}
+
+_SESSION_KEY = 'rollup_committed_values'
+
+
+def key_column(column):
+    """A rollup key column with NO_KEY read back as NULL."""
+    return func.nullif(column, NO_KEY)
+
+
+def record_updates(model, changes):
+    """Apply the rollup deltas for rows changed by a bulk UPDATE of `model`.
+
+    Args:
+        changes: (old, new) pairs of dicts holding each row's key columns
+            (and estimated_value for requests) before and after the update
+    """
+    deltas = {}
+    for old, new in changes:
+        _move(deltas, model, old, new)
+    _apply(db.session, deltas)
+
+
+def record_deletes(model, *criteria):
+    """Subtract the `model` rows matching `criteria` ahead of a bulk DELETE of them."""
+    deltas = {}
+    for key, (count, value) in _grouped(model, *criteria).items():
+        _add(deltas, model, key, -count, -value)
+    _apply(db.session, deltas)
+
+
+def rebuild_rollups():
+    """Recompute every rollup from its source table and replace the stored rows.
+
+    Does not commit; see reconcile_rollups().
+
+    Returns:
+        {table name: {'groups': n, 'drifted': [...]}}, each drifted entry
+        holding the group key and its stored and actual count (and value)
+    """
+    report = {}
+    for model, (rollup, key_columns, count_column, value_column) in ROLLUPS.items():
+        actual = _grouped(model)
+        stored = {}
+        rollup_columns = [getattr(rollup, c) for c in key_columns]
+        measures = [getattr(rollup, count_column)] + ([rollup.total_value] if value_column else [])
+        for row in db.session.query(*rollup_columns, *measures):
+            counts = (row[len(key_columns)], row[-1] if value_column else 0)
+            if counts != (0, 0):
+                stored[tuple(row[:len(key_columns)])] = counts
+
+        drifted = []
+        for key in sorted(set(actual) | set(stored)):
+            have, want = stored.get(key, (0, 0)), actual.get(key, (0, 0))
+            if have[0] != want[0] or round(have[1] - want[1], 2):
+                entry = dict(zip(key_columns, key))
+                entry.update({'stored': have[0], 'actual': want[0]})
+                if value_column:
+                    entry.update({'stored_value': have[1], 'actual_value': want[1]})
+                drifted.append(entry)
+
+        db.session.execute(delete(rollup))
+        if actual:
+            now = datetime.utcnow()
+            rows = []
+            for key, (count, value) in actual.items():
+                row = dict(zip(key_columns, key))
+                row[count_column] = count
+                if value_column:
+                    row['total_value'] = value
+                row['updated_at'] = now
+                rows.append(row)
+            db.session.execute(insert(rollup), rows)
+        report[rollup.__tablename__] = {'groups': len(actual), 'drifted': drifted}
+    return report
+
+
+def reconcile_rollups():
+    """Rebuild the rollups from scratch and report drift. Commits."""
+    report = rebuild_rollups()
+    db.session.commit()
+    return report
+
+
+def _grouped(model, *criteria):
+    """{key: (count, value)} of the `model` rows matching `criteria`."""
+    _, key_columns, _, value_column = ROLLUPS[model]
+    columns = [getattr(model, c) for c in key_columns]
+    measures = [func.count()]
+    if value_column:
+        measures.append(func.coalesce(func.sum(getattr(model, value_column)), 0))
+    grouped = {}
+    for row in db.session.query(*columns, *measures).filter(*criteria).group_by(*columns):
+        key = _key(dict(zip(key_columns, row)), key_columns)
+        count, value = grouped.get(key, (0, 0))
+        grouped[key] = (count + row[len(key_columns)], value + (row[-1] if value_column else 0))
+    return grouped
+
+
+def _key(values, key_columns):
+    return tuple(NO_KEY if values.get(c) is None else values[c] for c in key_columns)
+
+
+def _add(deltas, model, key, count, value=0):
+    rollup = ROLLUPS[model][0]
+    delta = deltas.setdefault((rollup, key), [0, 0])
+    delta[0] += count
+    delta[1] += value
+
+
+def _add_row(deltas, model, values, sign):
+    """Count one row with column `values` into (sign=1) or out of (sign=-1) its group."""
+    _, key_columns, _, value_column = ROLLUPS[model]
+    value = (values.get(value_column) or 0) if value_column else 0
+    _add(deltas, model, _key(values, key_columns), sign, sign * value)
+
+
+def _move(deltas, model, old, new):
+    if old != new:
+        _add_row(deltas, model, old, -1)
+        _add_row(deltas, model, new, 1)
+
+
+def _apply(session, deltas):
+    """Add the accumulated deltas to the rollup tables, one upsert per table."""
+    now = datetime.utcnow()
+    by_rollup = {}
+    for (rollup, key), (count, value) in deltas.items():
+        if count or value:
+            by_rollup.setdefault(rollup, []).append((key, count, value))
+
+    for model, (rollup, key_columns, count_column, value_column) in ROLLUPS.items():
+        if rollup not in by_rollup:
+            continue
+        stmt = dialect_insert()(rollup)
+        set_ = {
+            count_column: getattr(rollup, count_column) + stmt.excluded[count_column],
+            'updated_at': now,
+        }
+        if value_column:
+            set_['total_value'] = rollup.total_value + stmt.excluded.total_value
+        stmt = stmt.on_conflict_do_update(index_elements=list(key_columns), set_=set_)
+        rows = []
+        for key, count, value in by_rollup[rollup]:
+            row = dict(zip(key_columns, key))
+            row[count_column] = count
+            if value_column:
+                row['total_value'] = value
+            row['updated_at'] = now
+            rows.append(row)
+        # Sorted so concurrent transactions lock the groups in the same order
+        session.execute(stmt, sorted(rows, key=lambda r: [r[c] for c in key_columns]))
+
+
+def _tracked_columns(model):
+    _, key_columns, _, value_column = ROLLUPS[model]
+    return key_columns + ((value_column,) if value_column else ())
+
+
+def _current_values(obj):
+    return {c: getattr(obj, c) for c in _tracked_columns(type(obj))}
+
+
+@event.listens_for(Session, 'before_flush')
+def _capture_committed_values(session, flush_context, instances):
+    """Record the pre-flush key values of changed and deleted rows."""
+    changed = [
+        obj for obj in list(session.dirty) + list(session.deleted)
+        if type(obj) in ROLLUPS and (obj in session.deleted or session.is_modified(obj))
+    ]
+    if not changed:
+        return
+
+    captured = {}
+    unknown = {}
+    for obj in changed:
+        state = inspect(obj)
+        values = {}
+        for c in _tracked_columns(type(obj)):
+            history = state.attrs[c].history
+            if history.deleted:
+                values[c] = history.deleted[0]
+            elif history.unchanged:
+                values[c] = history.unchanged[0]
+            else:
+                # Expired, or assigned without being loaded first: read the stored row
+                unknown.setdefault(type(obj), {})[state.identity[0]] = obj
+                break
+        else:
+            captured[obj] = values
+
+    for model, objs in unknown.items():
+        columns = [getattr(model, c) for c in _tracked_columns(model)]
+        for row in session.execute(select(model.id, *columns).where(model.id.in_(list(objs)))):
+            captured[objs[row.id]] = dict(zip(_tracked_columns(model), row[1:]))
+    session.info[_SESSION_KEY] = captured
+
+
+@event.listens_for(Session, 'after_flush')
+def _apply_flush_deltas(session, flush_context):
+    """Turn the flushed inserts, updates and deletes into rollup deltas."""
+    captured = session.info.pop(_SESSION_KEY, {})
+    deltas = {}
+    for obj in session.new:
+        if type(obj) in ROLLUPS:
+            _add_row(deltas, type(obj), _current_values(obj), 1)
+    for obj, old in captured.items():
+        if obj in session.deleted:
+            _add_row(deltas, type(obj), old, -1)
+        else:
+            _move(deltas, type(obj), old, _current_values(obj))
+    if deltas:
+        _apply(session, deltas)
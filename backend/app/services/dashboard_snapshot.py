@@ -0,0 +1,260 @@
+"""
+Dashboard Snapshots — one row per (day, metric, dimension) for trend charts.
+
+Every dashboard number is computed from current state, so without this
+table yesterday's backlog is gone. take_snapshot() records today's values
+from the same sources the dashboard reads:
+
+    backlog             requests at each pipeline gate (request rollup)
+    backlog_value       their estimated value
+    overdue_approvals   active steps past due, per approver role
+    pending_advisories  requested / in-review advisory inputs, per team
+    loa_utilization     (committed + obligated) / allocation %, per LOA
+
+Each metric also gets a '' dimension row holding its total (overall
+utilization for LOAs). A day's snapshot is replaced as a whole, so taking
+it again the same day is harmless. The maintenance worker takes it on its
+first check each day (UTC); `flask snapshot-dashboard` takes it on demand.
+
+backfill_snapshots() reconstructs the days before snapshots existed, as of
+midnight UTC, for every metric except LOA utilization (allocations keep no
+history):
+
+    - request status spans come from the activity log transitions
+      (created, submitted, approved, fully_approved, rejected, returned).
+      The last span uses the request's current status. Earlier spans use
+      the entry's new_value, else the next entry's old_value.
+    - backlog_value uses each request's current estimated value.
+    - overdue spans run from a step's due_date to its acted_on_date.
+    - pending spans run from an advisory's requested_date to its
+      completed_date.
+
+The spans are loaded once and counted for every day with numpy.searchsorted,
+so a backfill costs one pass over the history plus O(days) per dimension.
+Days that already have rows are left alone.
+"""
+
+from datetime import datetime, time, timedelta
+from itertools import groupby
+import numpy as np
+from sqlalchemy import delete, func, insert
+from app.extensions import db
+from app.models.activity import ActivityLog
+from app.models.advisory import AdvisoryInput
+from app.models.approval import ApprovalStep
+from app.models.dashboard_rollup import AdvisoryRollup, RequestRollup
+from app.models.dashboard_snapshot import DashboardSnapshot
+from app.models.loa import LineOfAccounting
+from app.models.request import AcquisitionRequest
+from app.services.dashboard_rollup import PIPELINE_GATES
+
+SNAPSHOT_CHECK_INTERVAL = 60 * 60
+DEFAULT_BACKFILL_DAYS = 90
+
+METRICS = ('backlog', 'backlog_value', 'overdue_approvals', 'pending_advisories', 'loa_utilization')
+PENDING_ADVISORY_STATUSES = ('requested', 'in_review')
+
+# Backlog dimensions: the pipeline dashboard's gate statuses
+GATES = [gate for gate, _ in PIPELINE_GATES]
+
+# Activity log entries that move a request between statuses, and the status
+# each leaves it in when the entry does not say
+TRANSITION_STATUSES = {
+    'created': 'draft',
+    'submitted': 'submitted',
+    'approved': None,
+    'fully_approved': 'approved',
+    'rejected': 'cancelled',
+    'returned': 'returned',
+}
+
+
+def take_snapshot(day=None, now=None):
+    """Record the current dashboard values under `day` (default today), replacing any. Commits.
+
+    Returns:
+        number of rows written
+    """
+    now = now or datetime.utcnow()
+    day = day or now.date()
+
+    backlog = {gate: 0 for gate in GATES}
+    backlog_value = {gate: 0 for gate in GATES}
+    for status, count, value in db.session.query(
+        RequestRollup.status, func.sum(RequestRollup.request_count), func.sum(RequestRollup.total_value),
+    ).filter(RequestRollup.status.in_(GATES)).group_by(RequestRollup.status):
+        backlog[status] = count
+        backlog_value[status] = value
+
+    overdue = dict(db.session.query(ApprovalStep.approver_role, func.count()).filter(
+        ApprovalStep.status == 'active', ApprovalStep.due_date < now,
+    ).group_by(ApprovalStep.approver_role).all())
+
+    pending = dict(db.session.query(AdvisoryRollup.team, func.sum(AdvisoryRollup.input_count)).filter(
+        AdvisoryRollup.status.in_(PENDING_ADVISORY_STATUSES),
+    ).group_by(AdvisoryRollup.team).all())
+
+    utilization = {}
+    allocation = used = 0
+    for loa in LineOfAccounting.query.all():
+        allocation += loa.total_allocation or 0
+        used += (loa.committed_amount or 0) + (loa.obligated_amount or 0)
+        utilization[loa.display_name] = _utilization(
+            (loa.committed_amount or 0) + (loa.obligated_amount or 0), loa.total_allocation
+        )
+
+    rows = []
+    rows += _metric_rows(day, 'backlog', backlog)
+    rows += _metric_rows(day, 'backlog_value', backlog_value)
+    rows += _metric_rows(day, 'overdue_approvals', overdue)
+    rows += _metric_rows(day, 'pending_advisories', pending)
+    rows += _metric_rows(day, 'loa_utilization', utilization, total=_utilization(used, allocation))
+
+    db.session.execute(delete(DashboardSnapshot).where(DashboardSnapshot.snapshot_date == day))
+    db.session.execute(insert(DashboardSnapshot), rows)
+    db.session.commit()
+    return len(rows)
+
+
+def ensure_daily_snapshot(now=None):
+    """Take today's snapshot unless it exists. Returns rows written (0 if already taken)."""
+    now = now or datetime.utcnow()
+    taken = db.session.query(DashboardSnapshot.snapshot_date).filter(
+        DashboardSnapshot.snapshot_date == now.date()
+    ).first()
+    return 0 if taken else take_snapshot(now=now)
+
+
+def backfill_snapshots(start, end=None):
+    """Reconstruct snapshots for the days from `start` to `end` (default yesterday). Commits.
+
+    Days that already have snapshot rows are skipped.
+
+    Returns:
+        dict with the number of days and rows written
+    """
+    end = end or (datetime.utcnow().date() - timedelta(days=1))
+    existing = {d for (d,) in db.session.query(DashboardSnapshot.snapshot_date.distinct()).filter(
+        DashboardSnapshot.snapshot_date.between(start, end)
+    )}
+    days = [start + timedelta(days=n) for n in range((end - start).days + 1)]
+    days = [d for d in days if d not in existing]
+    if not days:
+        return {'days': 0, 'rows': 0}
+
+    marks = np.array([datetime.combine(d, time.min) for d in days], dtype='datetime64[s]')
+
+    spans = _status_spans()
+    backlog = {gate: _open_at([(s, e, 1) for status, s, e, _ in spans if status == gate], marks) for gate in GATES}
+    backlog_value = {
+        gate: _open_at([(s, e, v) for status, s, e, v in spans if status == gate], marks) for gate in GATES
+    }
+
+    overdue = {}
+    for role, due, acted in db.session.query(
+        ApprovalStep.approver_role, ApprovalStep.due_date, ApprovalStep.acted_on_date,
+    ).filter(ApprovalStep.due_date.isnot(None)):
+        overdue.setdefault(role, []).append((due, acted, 1))
+
+    pending = {}
+    for team, requested, completed, status in db.session.query(
+        AdvisoryInput.team, AdvisoryInput.requested_date, AdvisoryInput.completed_date, AdvisoryInput.status,
+    ).filter(AdvisoryInput.requested_date.isnot(None)):
+        if completed or status in PENDING_ADVISORY_STATUSES:
+            pending.setdefault(team, []).append((requested, completed, 1))
+
+    series = {
+        'backlog': backlog,
+        'backlog_value': backlog_value,
+        'overdue_approvals': {role: _open_at(spans_, marks) for role, spans_ in overdue.items()},
+        'pending_advisories': {team: _open_at(spans_, marks) for team, spans_ in pending.items()},
+    }
+    rows = []
+    for i, day in enumerate(days):
+        for metric, by_dimension in series.items():
+            values = {dimension: float(counts[i]) for dimension, counts in by_dimension.items()}
+            rows += _metric_rows(day, metric, values, backfilled=True)
+
+    db.session.execute(insert(DashboardSnapshot), rows)
+    db.session.commit()
+    return {'days': len(days), 'rows': len(rows)}
+
+
+def _metric_rows(day, metric, values, total=None, backfilled=False):
+    """Snapshot rows for one metric: the '' total, then each dimension.
+
+    Backlog gates are always written (zeros included) so every gate's line
+    is continuous; other dimensions only when non-zero.
+    """
+    always = metric in ('backlog', 'backlog_value')
+    rows = [{
+        'snapshot_date': day, 'metric': metric, 'dimension': '',
+        'value': float(sum(values.values()) if total is None else total), 'backfilled': backfilled,
+    }]
+    for dimension, value in sorted(values.items(), key=lambda item: item[0] or ''):
+        if value or always:
+            rows.append({
+                'snapshot_date': day, 'metric': metric, 'dimension': dimension or '',
+                'value': float(value or 0), 'backfilled': backfilled,
+            })
+    return rows
+
+
+def _utilization(used, allocation):
+    return round(used / allocation * 100, 1) if allocation else 0
+
+
+def _status_spans():
+    """(status, start, end, estimated_value) spans per request from the activity log; end None = still open."""
+    requests = {
+        r.id: r for r in db.session.query(
+            AcquisitionRequest.id, AcquisitionRequest.status,
+            AcquisitionRequest.created_at, AcquisitionRequest.estimated_value,
+        )
+    }
+    logs = db.session.query(
+        ActivityLog.request_id, ActivityLog.activity_type, ActivityLog.old_value,
+        ActivityLog.new_value, ActivityLog.created_at,
+    ).filter(
+        ActivityLog.activity_type.in_(list(TRANSITION_STATUSES)),
+        ActivityLog.request_id.isnot(None),
+        ActivityLog.created_at.isnot(None),
+    ).order_by(ActivityLog.request_id, ActivityLog.created_at, ActivityLog.id).all()
+    by_request = {request_id: list(entries) for request_id, entries in groupby(logs, key=lambda e: e.request_id)}
+
+    spans = []
+    for request_id, r in requests.items():
+        entries = by_request.get(request_id, [])
+        timeline = []
+        if r.created_at and (not entries or r.created_at < entries[0].created_at):
+            timeline.append((r.created_at, 'draft' if entries else r.status))
+        for i, e in enumerate(entries):
+            if i == len(entries) - 1:
+                status = r.status
+            else:
+                status = (
+                    e.new_value or entries[i + 1].old_value
+                    or TRANSITION_STATUSES[e.activity_type] or (timeline[-1][1] if timeline else 'submitted')
+                )
+            timeline.append((e.created_at, status))
+        for i, (start, status) in enumerate(timeline):
+            end = timeline[i + 1][0] if i + 1 < len(timeline) else None
+            spans.append((status, start, end, r.estimated_value or 0))
+    return spans
+
+
+def _open_at(spans, marks):
+    """Sum of the weights of (start, end, weight) spans open at each mark (start <= mark < end)."""
+    spans = [(s, e, w) for s, e, w in spans if s and (e is None or e >= s)]
+    if not spans:
+        return np.zeros(len(marks))
+    starts = sorted((s, w) for s, _, w in spans)
+    ends = sorted((e, w) for _, e, w in spans if e is not None)
+    start_times = np.array([s for s, _ in starts], dtype='datetime64[s]')
+    start_totals = np.concatenate([[0], np.cumsum([w for _, w in starts])])
+    opened = start_totals[np.searchsorted(start_times, marks, side='right')]
+    if not ends:
+        return opened
+    end_times = np.array([e for e, _ in ends], dtype='datetime64[s]')
+    end_totals = np.concatenate([[0], np.cumsum([w for _, w in ends])])
+    return opened - end_totals[np.searchsorted(end_times, marks, side='right')]
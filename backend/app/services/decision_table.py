@@ -0,0 +1,215 @@
+"""
+Decision Table — every intake answer combination resolved to its IntakePath
+ahead of time.
+
+The IntakePath winner depends only on five answers (Q1, Q2, Q3, Q5 and buy
+category), each drawn from a small wizard domain, so the whole answer space
+is enumerated once per rules import and the winners persisted in
+derivation_tables. Workers load the stored table at startup and derivation
+becomes a dict lookup; answers outside the enumerated domain (e.g. raw Excel
+text posted by an API client) still go through the IntakePathMatcher.
+
+Building the table also produces an ambiguity report for rule authors:
+answer tuples where paths tie on score, paths that can never win, and tuples
+that fall through to the legacy decision tree.
+"""
+
+import hashlib
+import json
+from itertools import product
+from app.extensions import db
+from app.models.derivation_table import DerivationTable
+from app.services.derivation import (
+    Q2_NORMALIZE, Q3_NORMALIZE, _build_intake_matcher,
+    _derive_acquisition_type_fallback,
+)
+from app.services.rules_cache import get_cached, rules_version
+
+# Wizard answer values for the dimensions that are not read from the paths
+Q1_VALUES = ('new', 'continue_extend', 'change_existing')
+Q5_VALUES = ('add_scope', 'admin_correction', 'clin_reallocation', 'descope')
+BUY_VALUES = ('product', 'service', 'software_license', 'mixed')
+
+DIMENSIONS = ('q1', 'q2', 'q3', 'q5', 'buy_category')
+
+_MISS = object()
+
+
+class DecisionTable:
+    """Answer tuple → CompiledPath (or None) for the enumerated intake domain."""
+
+    def __init__(self, matcher, domain, winners, fingerprint, report=None):
+        self.matcher = matcher
+        self.domain = domain
+        self.fingerprint = fingerprint
+        self.report = report
+        self._entries = {}
+        for key, idx in zip(product(*(domain[d] for d in DIMENSIONS)), winners):
+            self._entries[key] = matcher.paths[idx] if idx >= 0 else None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, q1, q2, q3, q5, buy_category):
+        """Return the winning CompiledPath for these answers, or None."""
+        path = self._entries.get((q1, q2, q3, q5, buy_category), _MISS)
+        if path is _MISS:
+            return self.matcher.match(q1, q2, q3, q5, buy_category)
+        return path
+
+
+def get_decision_table():
+    """Return the DecisionTable for the current rules version.
+
+    Uses the table stored by the last import when it was built from the same
+    IntakePath rows; otherwise enumerates the domain in memory.
+    """
+    return get_cached('decision_table', _load_decision_table)
+
+
+def regenerate_decision_table():
+    """Build the decision table from the current IntakePath rows and store it.
+
+    Called by the rules import after the rules version is bumped; the caller
+    commits. Replaces any previously stored table.
+
+    Returns:
+        the ambiguity report dict
+    """
+    matcher = _build_intake_matcher()
+    fingerprint = _fingerprint(matcher)
+    domain = _answer_domain(matcher)
+    winners, report = _build(matcher, domain)
+
+    DerivationTable.query.delete()
+    db.session.add(DerivationTable(
+        fingerprint=fingerprint,
+        rules_version=rules_version(),
+        path_count=len(matcher.paths),
+        entry_count=len(winners),
+        table_json=json.dumps({'domain': domain, 'winners': winners}, separators=(',', ':')),
+        report_json=json.dumps(report),
+    ))
+    db.session.flush()
+    return report
+
+
+def get_decision_report():
+    """Return the stored table's metadata plus its ambiguity report.
+
+    Builds the report in memory if no table has been stored for the current
+    IntakePath rows.
+    """
+    table = get_decision_table()
+    row = DerivationTable.query.filter_by(fingerprint=table.fingerprint).first()
+    if row and row.report_json:
+        result = row.to_dict()
+        result['report'] = json.loads(row.report_json)
+        result['stored'] = True
+        return result
+
+    report = table.report
+    if report is None:
+        _, report = _build(table.matcher, table.domain)
+    return {
+        'fingerprint': table.fingerprint,
+        'path_count': len(table.matcher.paths),
+        'entry_count': len(table),
+        'report': report,
+        'stored': False,
+    }
+
+
+def _load_decision_table():
+    matcher = get_cached('intake_matcher', _build_intake_matcher)
+    fingerprint = _fingerprint(matcher)
+
+    row = DerivationTable.query.filter_by(fingerprint=fingerprint).first()
+    if row:
+        data = json.loads(row.table_json)
+        return DecisionTable(matcher, data['domain'], data['winners'], fingerprint)
+
+    domain = _answer_domain(matcher)
+    winners, report = _build(matcher, domain)
+    return DecisionTable(matcher, domain, winners, fingerprint, report)
+
+
+def _fingerprint(matcher):
+    """Hash of the path fields that matching and classification read."""
+    rows = [list(p) for p in matcher.paths]
+    return hashlib.sha256(json.dumps(rows, separators=(',', ':')).encode()).hexdigest()
+
+
+def _answer_domain(matcher):
+    """Every value each answer can take in the wizard, plus unanswered (None).
+
+    Q2 also includes each path's own normalized and raw situation, so tuples
+    that only a specific path can match are covered.
+    """
+    q1 = set(Q1_VALUES) | {p.q1 for p in matcher.paths if p.q1}
+    q2 = set(Q2_NORMALIZE.values())
+    for p in matcher.paths:
+        if p.q2_raw is not None:
+            q2.update((p.q2_norm, p.q2_raw))
+
+    def values(items):
+        return [None] + sorted(items)
+
+    return {
+        'q1': values(q1),
+        'q2': values(q2),
+        'q3': values(Q3_NORMALIZE),
+        'q5': values(Q5_VALUES),
+        'buy_category': values(BUY_VALUES),
+    }
+
+
+def _build(matcher, domain):
+    """Resolve every answer tuple in the domain.
+
+    Returns:
+        (winners, report) — winners is a list of path positions (-1 for no
+        match) in itertools.product order over DIMENSIONS
+    """
+    winners = []
+    won = set()
+    ties = []
+    fallthrough = {}
+
+    for key in product(*(domain[d] for d in DIMENSIONS)):
+        q1, q2, q3, q5, buy_category = key
+        best = matcher.top_matches(q1, q2, q3, q5, buy_category)
+        if not best:
+            winners.append(-1)
+            effective_q2 = q5 if q1 == 'change_existing' and q5 else q2
+            group = fallthrough.setdefault((q1, effective_q2), {'count': 0, 'acq_types': set()})
+            group['count'] += 1
+            group['acq_types'].add(_derive_acquisition_type_fallback(q1, q2, q3, q5))
+            continue
+
+        winners.append(best[0].order)
+        won.add(best[0].order)
+        if len(best) > 1:
+            ties.append({
+                'answers': dict(zip(DIMENSIONS, key)),
+                'path_ids': [p.path_id for p in best],
+                'winner': best[0].path_id,
+            })
+
+    return winners, {
+        'entry_count': len(winners),
+        'matched_count': sum(1 for w in winners if w >= 0),
+        'tie_count': len(ties),
+        'ties': ties,
+        'unreachable_paths': [p.path_id for p in matcher.paths if p.order not in won],
+        'fallthrough_count': sum(g['count'] for g in fallthrough.values()),
+        'fallthrough': [
+            {
+                'q1': q1,
+                'effective_q2': q2,
+                'count': g['count'],
+                'fallback_acq_types': sorted(g['acq_types']),
+            }
+            for (q1, q2), g in sorted(fallthrough.items(), key=lambda kv: (str(kv[0][0]), str(kv[0][1])))
+        ],
+    }
@@ -16,8 +16,9 @@ Also returns the matched path's approval_template_key, doc_template_set,
 and advisory_triggers for downstream use.
 """
 
-from app.models.threshold import ThresholdConfig
+from collections import namedtuple
 from app.models.intake_path import IntakePath
+from app.services.thresholds import get_threshold_snapshot
 
 
 # Maps Excel Q2 situation text → normalized keys used in the wizard
@@ -38,6 +39,17 @@ Q2_NORMALIZE = {
 }
 
 
+# Intake answer keys read by the derivation, in tuple order
+ANSWER_FIELDS = (
+    'intake_q1_need_type',
+    'intake_q2_situation',
+    'intake_q3_specific_vendor',
+    'intake_q5_change_type',
+    'intake_q_buy_category',
+    'intake_q_mixed_predominant',
+)
+
+
 def derive_classification(request_data):
     """
     Main derivation function. Matches intake answers against the IntakePath
@@ -52,13 +64,9 @@ def derive_classification(request_data):
       - intake_q_mixed_predominant: predominantly_product | predominantly_service | roughly_equal
       - estimated_value: float
     """
-    q1 = request_data.get('intake_q1_need_type')
-    q2 = request_data.get('intake_q2_situation')
-    q3 = request_data.get('intake_q3_specific_vendor')
-    q5 = request_data.get('intake_q5_change_type')
-    buy_category = request_data.get('intake_q_buy_category')
-    mixed_predominant = request_data.get('intake_q_mixed_predominant')
     estimated_value = float(request_data.get('estimated_value', 0) or 0)
+    answers = tuple(request_data.get(f) for f in ANSWER_FIELDS)
+    q1, q2, q3, q5, buy_category, _ = answers
 
     # Derive tier from configurable thresholds
     tier = _derive_tier(estimated_value)
@@ -66,6 +74,46 @@ def derive_classification(request_data):
     # Match against IntakePath table
     path = _match_intake_path(q1, q2, q3, q5, buy_category)
 
+    return _classify(answers, tier, path)
+
+
+def derive_classification_batch(rows):
+    """
+    Derive classifications for many answer sets in one pass.
+
+    Paths and thresholds are loaded once for the whole batch, and rows with
+    the same answers and tier share a single computed result.
+
+    Args:
+        rows: iterable of dicts with the same keys as derive_classification
+
+    Returns:
+        (results, unique_count) — results in input order, and the number of
+        distinct answer tuples actually computed
+    """
+    thresholds = get_threshold_snapshot()
+    table = _decision_table()
+
+    computed = {}
+    results = []
+    for row in rows:
+        tier = thresholds.tier_for(float(row.get('estimated_value', 0) or 0))
+        answers = tuple(row.get(f) for f in ANSWER_FIELDS)
+        key = answers + (tier,)
+        result = computed.get(key)
+        if result is None:
+            q1, q2, q3, q5, buy_category, _ = answers
+            path = table.lookup(q1, q2, q3, q5, buy_category)
+            result = computed[key] = _classify(answers, tier, path)
+        results.append(result)
+
+    return results, len(computed)
+
+
+def _classify(answers, tier, path):
+    """Build the derived classification dict from answers, tier and matched path."""
+    q1, q2, q3, q5, buy_category, mixed_predominant = answers
+
     if path:
         acquisition_type = path.derived_acq_type
         pipeline = path.derived_pipeline
@@ -117,138 +165,176 @@ def _match_intake_path(q1, q2, q3, q5, buy_category):
     Match user answers against IntakePath rows.
 
     Uses a scoring system: each matching non-wildcard field adds a point.
-    The path with the highest score wins (most specific match).
+    The path with the highest score wins (most specific match); ties go to
+    the earliest path.
+
+    Winners are precomputed for every wizard answer combination (see
+    services/decision_table.py); other answers are scored against the
+    compiled matcher for the current rules version.
     """
-    try:
-        paths = IntakePath.query.all()
-    except Exception:
-        return None
-
-    if not paths:
-        return None
-
-    # Normalize q1 to match path data
-    q1_map = {
-        'new': 'new',
-        'continue_extend': 'continue_extend',
-        'change_existing': 'change_existing',
-    }
-    q1_norm = q1_map.get(q1, q1) if q1 else None
-
-    # Build effective q2: for change_existing, q2 comes from q5
-    effective_q2 = q2
-    if q1 == 'change_existing' and q5:
-        effective_q2 = q5
-
-    # Normalize buy_category for matching
-    buy_cat_map = {
-        'software_license': 'software_license',
-        'product': 'product',
-        'service': 'service',
-        'mixed': 'mixed',
-    }
-    buy_cat_norm = buy_cat_map.get(buy_category, buy_category) if buy_category else None
-
-    # Normalize q3 for matching
-    q3_map = {
-        'yes': 'Yes',
-        'yes_sole': 'Yes',
-        'yes_limited': 'No',
-        'no': 'No',
-        'not_sure': 'No',
-    }
-    q3_norm = q3_map.get(q3, q3) if q3 else None
-
-    best_match = None
-    best_score = -1
-
-    for path in paths:
-        score = 0
-        match = True
-
-        # Q1 must match
-        if path.q1_need_type:
-            if path.q1_need_type != q1_norm:
-                match = False
-                continue
-            score += 1
-
-        # Q2 situation matching
-        if path.q2_situation and path.q2_situation.strip() not in ('-', ''):
-            # Normalize the path's Q2 to compare with the wizard's Q2
-            path_q2_norm = Q2_NORMALIZE.get(path.q2_situation.lower(), path.q2_situation.lower())
-            if effective_q2 and effective_q2.lower() != path_q2_norm and effective_q2 != path.q2_situation:
-                match = False
-                continue
-            if effective_q2:
-                score += 2  # Q2 is a strong discriminator
+    return _decision_table().lookup(q1, q2, q3, q5, buy_category)
 
-        # Q3 specific vendor matching
-        if path.q3_specific_vendor and path.q3_specific_vendor.strip() not in ('-', ''):
-            if q3_norm and q3_norm != path.q3_specific_vendor:
-                match = False
-                continue
-            if q3_norm:
-                score += 1
 
-        # Buy category matching
-        if path.buy_category and path.buy_category.strip() not in ('-', '', None):
-            if buy_cat_norm and buy_cat_norm != path.buy_category:
-                match = False
-                continue
-            if buy_cat_norm:
+def _decision_table():
+    """The decision table for the current rules version.
+
+    With no IntakePath rows every lookup misses and the legacy fallbacks
+    apply; any other failure propagates, for single and batch derivation
+    alike.
+    """
+    # Imported here: decision_table builds on this module's matcher and fallbacks
+    from app.services.decision_table import get_decision_table
+    return get_decision_table()
+
+
+# Normalize wizard answers to the values stored on IntakePath rows
+Q3_NORMALIZE = {
+    'yes': 'Yes',
+    'yes_sole': 'Yes',
+    'yes_limited': 'No',
+    'no': 'No',
+    'not_sure': 'No',
+}
+
+# Path fields copied onto each compiled entry (what derive_classification reads)
+CompiledPath = namedtuple('CompiledPath', [
+    'order', 'path_id', 'derived_acq_type', 'derived_pipeline',
+    'approval_template_key', 'doc_template_set', 'advisory_triggers',
+    'q1', 'q2_norm', 'q2_raw', 'q3', 'buy_category',
+])
+
+_ANY_Q2 = ('any',)
+_WILDCARD_Q2 = ('wildcard',)
+
+
+class IntakePathMatcher:
+    """IntakePath rows compiled into an index keyed by (q1, effective q2).
+
+    Each row is normalized once and filed under the q2 keys it can match
+    (its normalized situation, its raw Excel text, or the wildcard bucket),
+    so a lookup scores a handful of candidates instead of every row.
+    """
+
+    def __init__(self, paths):
+        self.paths = []
+        self._index = {}
+
+        for order, path in enumerate(paths):
+            q2_raw = None
+            q2_norm = None
+            if path.q2_situation and path.q2_situation.strip() not in ('-', ''):
+                q2_raw = path.q2_situation
+                q2_norm = Q2_NORMALIZE.get(q2_raw.lower(), q2_raw.lower())
+            q3 = path.q3_specific_vendor
+            if q3 and q3.strip() in ('-', ''):
+                q3 = None
+            buy = path.buy_category
+            if buy and buy.strip() in ('-', ''):
+                buy = None
+
+            entry = CompiledPath(
+                order=order,
+                path_id=path.path_id,
+                derived_acq_type=path.derived_acq_type,
+                derived_pipeline=path.derived_pipeline,
+                approval_template_key=path.approval_template_key,
+                doc_template_set=path.doc_template_set,
+                advisory_triggers=path.advisory_triggers,
+                q1=path.q1_need_type or None,
+                q2_norm=q2_norm,
+                q2_raw=q2_raw,
+                q3=q3 or None,
+                buy_category=buy or None,
+            )
+            self.paths.append(entry)
+
+            self._add(entry.q1, _ANY_Q2, entry)
+            if q2_raw is None:
+                self._add(entry.q1, _WILDCARD_Q2, entry)
+            else:
+                self._add(entry.q1, ('norm', q2_norm), entry)
+                self._add(entry.q1, ('raw', q2_raw), entry)
+
+    def _add(self, q1, q2_key, entry):
+        self._index.setdefault((q1, q2_key), []).append(entry)
+
+    def candidates(self, q1_norm, effective_q2):
+        """Paths whose q1 and q2 conditions accept these answers, in path order."""
+        q1_keys = [q1_norm] if q1_norm is None else [q1_norm, None]
+        if effective_q2:
+            q2_keys = [('norm', effective_q2.lower()), ('raw', effective_q2), _WILDCARD_Q2]
+        else:
+            q2_keys = [_ANY_Q2]
+
+        seen = {}
+        for q1_key in q1_keys:
+            for q2_key in q2_keys:
+                for entry in self._index.get((q1_key, q2_key), ()):
+                    seen[entry.order] = entry
+        return [seen[k] for k in sorted(seen)]
+
+    def match(self, q1, q2, q3, q5, buy_category):
+        """Return the most specific CompiledPath for these answers, or None."""
+        best = self.top_matches(q1, q2, q3, q5, buy_category)
+        return best[0] if best else None
+
+    def top_matches(self, q1, q2, q3, q5, buy_category):
+        """Return every path sharing the highest score, in path order.
+
+        More than one entry means the answers tie between paths and the
+        earliest row wins.
+        """
+        if not self.paths:
+            return []
+
+        q1_norm = q1 or None
+
+        # Build effective q2: for change_existing, q2 comes from q5
+        effective_q2 = q2
+        if q1 == 'change_existing' and q5:
+            effective_q2 = q5
+
+        buy_cat_norm = buy_category or None
+        q3_norm = Q3_NORMALIZE.get(q3, q3) if q3 else None
+
+        best = []
+        best_score = -1
+
+        for entry in self.candidates(q1_norm, effective_q2):
+            score = 0
+            if entry.q1:
                 score += 1
+            if entry.q2_raw is not None and effective_q2:
+                score += 2  # Q2 is a strong discriminator
+
+            if entry.q3:
+                if q3_norm and q3_norm != entry.q3:
+                    continue
+                if q3_norm:
+                    score += 1
+
+            if entry.buy_category:
+                if buy_cat_norm and buy_cat_norm != entry.buy_category:
+                    continue
+                if buy_cat_norm:
+                    score += 1
+
+            if score > best_score:
+                best_score = score
+                best = [entry]
+            elif score == best_score:
+                best.append(entry)
 
-        if match and score > best_score:
-            best_score = score
-            best_match = path
+        return best
 
-    return best_match
+
+def _build_intake_matcher():
+    return IntakePathMatcher(IntakePath.query.order_by(IntakePath.id).all())
 
 
 def _derive_tier(estimated_value):
     """Determine tier from configurable thresholds."""
-    thresholds = _get_thresholds()
-    micro_limit = thresholds.get('micro_purchase', 15000)
-    sat_limit = thresholds.get('simplified_acquisition', 350000)
-    above_sat_limit = thresholds.get('above_sat', 9000000)
-
-    if estimated_value <= micro_limit:
-        return 'micro'
-    elif estimated_value <= sat_limit:
-        return 'sat'
-    elif estimated_value <= above_sat_limit:
-        return 'above_sat'
-    else:
-        return 'major'
-
-
-def _get_thresholds():
-    """Load thresholds from DB, with defaults fallback."""
-    try:
-        configs = ThresholdConfig.query.all()
-        result = {}
-        for c in configs:
-            # Map various name formats to the expected keys
-            name = c.name.lower()
-            if 'micro' in name:
-                result['micro_purchase'] = c.dollar_limit
-            elif 'simplified' in name or name == 'simplified_acquisition':
-                result['simplified_acquisition'] = c.dollar_limit
-            elif 'above_sat' in name:
-                result['above_sat'] = c.dollar_limit
-            elif 'ja_ko' in name or name == 'ja_threshold':
-                result['ja_threshold'] = c.dollar_limit
-            else:
-                result[c.name] = c.dollar_limit
-        return result
-    except Exception:
-        return {
-            'micro_purchase': 15000,
-            'simplified_acquisition': 350000,
-            'above_sat': 9000000,
-            'ja_threshold': 900000,
-        }
+    return get_threshold_snapshot().tier_for(estimated_value)
 
 
 # ---------------------------------------------------------------------------
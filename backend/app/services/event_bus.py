@@ -0,0 +1,267 @@
+"""
+Event Bus — pub/sub feeding the /api/stream Server-Sent Events endpoint.
+
+Code publishes with publish(channel, event, data) (or the notification /
+queue_changed helpers). Messages are held on the SQLAlchemy session and only
+sent after the transaction commits, so a rolled-back action never reaches a
+browser.
+
+Channels:
+    user:<id>     notifications for one user
+    role:<role>   approval queue changes for an approver role
+    team:<team>   advisory queue changes for an advisory team
+    queues        every queue change (admins see all queues)
+
+Each process keeps its own EventBus of connected subscribers. How messages
+reach the other processes depends on EVENT_BUS_BACKEND:
+
+    local     stand-in for a single process (flask run, one gunicorn
+              worker); messages are dispatched in-process only
+    database  messages are relayed through the stream_events table; each
+              process serving streams polls it from one background thread
+              and dispatches new rows to its own subscribers. Required when
+              the notification worker runs as its own process. Ids are
+              taken at insert but become visible at commit, so a gap below
+              the newest id seen may still fill in; those ids are re-queried
+              for gap_grace seconds before being given up as rolled back.
+
+Other backends (e.g. Redis pub/sub) plug in by adding a class with
+publish(messages) and start(app) to BACKENDS.
+"""
+
+import json
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models.stream_event import StreamEvent
+
+SUBSCRIBER_QUEUE_SIZE = 100
+_SESSION_KEY = 'stream_messages'
+
+
+class Subscription:
+    """One connected client: the channels it listens on and its message queue."""
+
+    def __init__(self, channels):
+        self.channels = frozenset(channels)
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def get(self, timeout):
+        """Next (event, data) message, or None after `timeout` seconds."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            # A stalled client; it is told to resync once it catches up
+            self.overflowed = True
+
+
+class EventBus:
+    """In-process registry of subscriptions, indexed by channel."""
+
+    def __init__(self, backend_name='local'):
+        self._lock = threading.Lock()
+        self._by_channel = {}
+        self._count = 0
+        self.backend = BACKENDS[backend_name](self)
+        self._started = False
+
+    @property
+    def connection_count(self):
+        return self._count
+
+    def subscribe(self, channels, max_connections=None):
+        """Register a subscription; returns None when max_connections is reached."""
+        with self._lock:
+            if max_connections is not None and self._count >= max_connections:
+                return None
+            sub = Subscription(channels)
+            for channel in sub.channels:
+                self._by_channel.setdefault(channel, set()).add(sub)
+            self._count += 1
+            start = not self._started
+            self._started = True
+        if start:
+            self.backend.start(current_app._get_current_object())
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            for channel in sub.channels:
+                subs = self._by_channel.get(channel)
+                if subs is not None:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._by_channel[channel]
+            self._count -= 1
+
+    def dispatch(self, channel, event_name, data):
+        """Hand a message to this process's subscribers on `channel`."""
+        with self._lock:
+            subs = list(self._by_channel.get(channel, ()))
+        for sub in subs:
+            sub.put((event_name, data))
+
+
+class LocalBackend:
+    """Single-process stand-in: published messages go straight to local subscribers."""
+
+    def __init__(self, bus):
+        self.bus = bus
+
+    def publish(self, messages):
+        for channel, event_name, data in messages:
+            self.bus.dispatch(channel, event_name, data)
+
+    def start(self, app):
+        pass
+
+
+class DatabaseBackend:
+    """Relays messages between processes through the stream_events table."""
+
+    poll_interval = 1.0
+    retention = timedelta(minutes=5)
+    purge_every = 60.0
+    gap_grace = 30.0  # seconds a missing id is waited for
+    max_gaps = 1000
+
+    def __init__(self, bus):
+        self.bus = bus
+
+    def publish(self, messages):
+        now = datetime.utcnow()
+        rows = [
+            {'channel': channel, 'event': event_name, 'data': json.dumps(data), 'created_at': now}
+            for channel, event_name, data in messages
+        ]
+        with db.engine.begin() as conn:
+            conn.execute(insert(StreamEvent.__table__), rows)
+
+    def start(self, app):
+        thread = threading.Thread(target=self._poll, args=(app,), name='event-bus-poller', daemon=True)
+        thread.start()
+
+    def _poll(self, app):
+        table = StreamEvent.__table__
+        columns = (table.c.id, table.c.channel, table.c.event, table.c.data)
+        with app.app_context():
+            with db.engine.connect() as conn:
+                last_id = conn.execute(select(func.max(table.c.id))).scalar() or 0
+            gaps = {}  # id below last_id not yet seen -> monotonic time it was noticed
+            last_purge = time.monotonic()
+            while True:
+                time.sleep(self.poll_interval)
+                try:
+                    with db.engine.begin() as conn:
+                        late = []
+                        if gaps:
+                            late = conn.execute(
+                                select(*columns).where(table.c.id.in_(list(gaps))).order_by(table.c.id)
+                            ).all()
+                        rows = conn.execute(
+                            select(*columns).where(table.c.id > last_id).order_by(table.c.id).limit(500)
+                        ).all()
+                        if time.monotonic() - last_purge > self.purge_every:
+                            conn.execute(delete(table).where(
+                                table.c.created_at < datetime.utcnow() - self.retention
+                            ))
+                            last_purge = time.monotonic()
+                except Exception as e:
+                    print(f'Event bus poll failed: {e}', flush=True)
+                    continue
+
+                now = time.monotonic()
+                for row in late:
+                    gaps.pop(row.id, None)
+                    self._dispatch(row)
+                for row in rows:
+                    # Ids skipped over belong to transactions that may still commit
+                    for missing in range(max(last_id + 1, row.id - self.max_gaps), row.id):
+                        gaps.setdefault(missing, now)
+                    self._dispatch(row)
+                    last_id = row.id
+                for missing, noticed in list(gaps.items()):
+                    if now - noticed > self.gap_grace:
+                        del gaps[missing]
+                while len(gaps) > self.max_gaps:
+                    del gaps[min(gaps)]
+
+    def _dispatch(self, row):
+        self.bus.dispatch(row.channel, row.event, json.loads(row.data) if row.data else None)
+
+
+BACKENDS = {
+    'local': LocalBackend,
+    'database': DatabaseBackend,
+}
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_bus():
+    """The process-wide EventBus, created on first use (after any fork)."""
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                _bus = EventBus(current_app.config.get('EVENT_BUS_BACKEND', 'local'))
+    return _bus
+
+
+def publish(channel, event_name, data=None):
+    """Queue a message to be published when the current transaction commits."""
+    messages = db.session.info.setdefault(_SESSION_KEY, {})
+    messages[(channel, event_name, json.dumps(data, sort_keys=True))] = data
+
+
+def publish_notification(user_id, notification_type, title, request_id=None):
+    publish(f'user:{user_id}', 'notification', {
+        'notification_type': notification_type,
+        'title': title,
+        'request_id': request_id,
+    })
+
+
+def publish_queue_changed(role=None, team=None):
+    """Tell approvers with `role` (approvals queue) or `team` (advisory queue) to refresh."""
+    if role:
+        data = {'queue': 'approvals', 'role': role}
+        publish(f'role:{role}', 'queue_changed', data)
+        publish('queues', 'queue_changed', data)
+    if team:
+        data = {'queue': 'advisory', 'team': team}
+        publish(f'team:{team}', 'queue_changed', data)
+        publish('queues', 'queue_changed', data)
+
+
+@event.listens_for(Session, 'after_commit')
+def _send_after_commit(session):
+    messages = session.info.pop(_SESSION_KEY, None)
+    if not messages:
+        return
+    try:
+        get_bus().backend.publish([
+            (channel, event_name, data)
+            for (channel, event_name, _), data in messages.items()
+        ])
+    except Exception as e:
+        # Streams are best effort; the committed change stands
+        print(f'Event bus publish failed: {e}', flush=True)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop(_SESSION_KEY, None)
@@ -16,6 +16,8 @@ from app.models.advisory_trigger import AdvisoryTriggerRule
 from app.models.threshold import ThresholdConfig
 from app.models.approval import ApprovalTemplate, ApprovalTemplateStep
 from app.models.document import DocumentTemplate, DocumentRule
+from app.services.rules_cache import bump_rules_version
+from app.services.decision_table import regenerate_decision_table
 
 
 # ---------------------------------------------------------------------------
@@ -547,5 +549,14 @@ def import_all(filepath):
     db.session.flush()
     wb.close()
 
+    # Invalidate compiled rule caches in every worker
+    counts['rules_version'] = bump_rules_version()
+
+    # Precompute path winners for every intake answer combination
+    report = regenerate_decision_table()
+    counts['decision_table_ties'] = report['tie_count']
+    counts['decision_table_fallthrough'] = report['fallthrough_count']
+    counts['unreachable_paths'] = len(report['unreachable_paths'])
+
     print(f'  Rules import complete: {counts}')
     return counts
@@ -0,0 +1,85 @@
+"""
+Maintenance — the periodic jobs, run by `flask maintenance-worker`.
+
+Each job is one row of JOBS: a name, how often it runs, whether it waits a
+full interval before its first run, the function and a reporter that turns
+its result into a log line (None when there is nothing to say). Adding a
+job means adding a row; nothing else schedules it.
+
+The maintenance worker runs next to the notification worker under
+supervisord, as its own process, so a slow or failing job never holds up
+notification delivery. Each job runs in its own try block: a failure is
+rolled back and logged, and the job is tried again after its interval.
+"""
+
+import time
+from app.extensions import db
+from app.services.cycle_time import REFRESH_INTERVAL, refresh_cycle_time_stats
+from app.services.dashboard_snapshot import SNAPSHOT_CHECK_INTERVAL, ensure_daily_snapshot
+from app.services.notification_retention import ARCHIVE_INTERVAL, archive_notifications
+from app.services.sla_sweeper import SWEEP_INTERVAL, sweep_sla
+from app.services.unread_counter import RECONCILE_INTERVAL, reconcile_unread_counts
+
+DEFAULT_POLL_INTERVAL = 30.0
+
+# (name, interval seconds, wait an interval before the first run, job, report)
+JOBS = (
+    (
+        'unread counter reconciliation', RECONCILE_INTERVAL, True, reconcile_unread_counts,
+        lambda r: r['repaired'] and f'Repaired unread counters for users {r["repaired"]}',
+    ),
+    (
+        'notification archival', ARCHIVE_INTERVAL, True, archive_notifications,
+        lambda r: r['archived'] and f'Archived {r["archived"]} read notifications',
+    ),
+    (
+        'SLA sweep', SWEEP_INTERVAL, False, sweep_sla,
+        lambda r: (r['approvals'] or r['advisories']) and (
+            f'Escalated {r["approvals"]} overdue approvals and {r["advisories"]} overdue advisories'
+        ),
+    ),
+    (
+        'cycle-time refresh', REFRESH_INTERVAL, False, refresh_cycle_time_stats,
+        lambda r: r['groups'] and f'Cycle-time stats refreshed for {r["groups"]} groups',
+    ),
+    (
+        'dashboard snapshot', SNAPSHOT_CHECK_INTERVAL, False, ensure_daily_snapshot,
+        lambda rows: rows and f'Dashboard snapshot taken ({rows} rows)',
+    ),
+)
+
+
+def run_job(name, job, report):
+    """Run one job, logging its report or its failure. Returns True if it succeeded."""
+    try:
+        message = report(job())
+    except Exception as e:
+        db.session.rollback()
+        print(f'{name.capitalize()} failed: {e}', flush=True)
+        return False
+    if message:
+        print(message, flush=True)
+    return True
+
+
+def run_maintenance(poll_interval=DEFAULT_POLL_INTERVAL, once=False):
+    """Run each job in JOBS whenever its interval has passed, forever.
+
+    With once=True every job runs one time, in order, and the function
+    returns; that suits a cron entry in place of the long-running worker.
+    """
+    if once:
+        for name, _, _, job, report in JOBS:
+            run_job(name, job, report)
+            db.session.remove()
+        return
+
+    started = time.monotonic()
+    last_run = {name: started if delayed else None for name, _, delayed, _, _ in JOBS}
+    while True:
+        for name, interval, _, job, report in JOBS:
+            if last_run[name] is None or time.monotonic() - last_run[name] > interval:
+                run_job(name, job, report)
+                last_run[name] = time.monotonic()
+        db.session.remove()
+        time.sleep(poll_interval)
@@ -0,0 +1,222 @@
+"""
+Notification Outbox — expands NotificationEvents into per-user Notifications.
+
+notify_users_by_role/notify_users_by_team/notify_requestor write one
+NotificationEvent in the caller's transaction. The notification worker
+(`flask notification-worker`, run by supervisord next to gunicorn) drains
+pending events in batches:
+
+1. claim the batch with UPDATE ... SET processed_at WHERE processed_at IS NULL
+2. resolve every audience in the batch with one User and one request query
+3. bulk-insert the notifications and commit, all in one transaction
+
+A crash before the commit leaves the events unclaimed, and a second worker
+that loses the claim race rolls back, so each event is delivered exactly
+once. The (event_id, user_id) unique constraint on notifications backs this
+up at the database level.
+
+Lag is processed_at - created_at per event; outbox_stats() reports it.
+"""
+
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert, update
+from app.extensions import db
+from app.models.notification import Notification
+from app.models.notification_event import NotificationEvent
+from app.models.request import AcquisitionRequest
+from app.models.user import User
+from app.services.event_bus import publish_notification
+from app.services.unread_counter import add_unread
+
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_POLL_INTERVAL = 1.0
+
+# Advisory team -> user roles notified for it (same mapping as the advisory queue)
+TEAM_ROLES = {
+    'scrm': ['scrm'],
+    'sbo': ['sb'],
+    'cio': ['cto', 'cio'],
+    'section508': ['cto', 'cio'],
+    'fm': ['budget'],
+    'legal': ['legal'],
+    'fedramp': ['cto', 'cio'],
+}
+
+
+def deliver_events(events, now=None):
+    """Insert the notifications for `events` and mark them processed.
+
+    Does not commit and does not claim; callers either own the events
+    (inline delivery in the transaction that created them) or have
+    claimed them (process_outbox).
+
+    Returns:
+        number of notifications inserted
+    """
+    now = now or datetime.utcnow()
+    recipients = _resolve_recipients(events)
+
+    rows = []
+    for event in events:
+        user_ids = recipients.get(event.id, [])
+        rows.extend({
+            'event_id': event.id,
+            'user_id': user_id,
+            'request_id': event.request_id,
+            'notification_type': event.notification_type,
+            'title': event.title,
+            'message': event.message,
+            'is_read': False,
+            'created_at': event.created_at or now,
+        } for user_id in user_ids)
+        for user_id in user_ids:
+            publish_notification(user_id, event.notification_type, event.title, event.request_id)
+        event.processed_at = now
+        event.delivered_count = len(user_ids)
+
+    if rows:
+        db.session.execute(insert(Notification), rows)
+        add_unread(row['user_id'] for row in rows)
+    return len(rows)
+
+
+def process_outbox(batch_size=DEFAULT_BATCH_SIZE):
+    """Deliver one batch of pending events and commit.
+
+    Returns:
+        (events delivered, notifications inserted); (0, 0) when the outbox
+        is empty or another worker claimed part of the batch first
+    """
+    events = NotificationEvent.query.filter(
+        NotificationEvent.processed_at.is_(None)
+    ).order_by(NotificationEvent.id).limit(batch_size).all()
+    if not events:
+        db.session.rollback()
+        return 0, 0
+
+    now = datetime.utcnow()
+    ids = [e.id for e in events]
+    claimed = db.session.execute(
+        update(NotificationEvent)
+        .where(NotificationEvent.id.in_(ids), NotificationEvent.processed_at.is_(None))
+        .values(processed_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if claimed != len(ids):
+        db.session.rollback()
+        return 0, 0
+
+    inserted = deliver_events(events, now)
+    db.session.commit()
+    return len(events), inserted
+
+
+def run_worker(batch_size=DEFAULT_BATCH_SIZE, poll_interval=DEFAULT_POLL_INTERVAL, once=False):
+    """Drain the outbox forever (or until empty with once=True).
+
+    Delivery only: the periodic jobs run in the maintenance worker
+    (services/maintenance.py).
+    """
+    while True:
+        try:
+            delivered, inserted = process_outbox(batch_size)
+        except Exception as e:
+            db.session.rollback()
+            print(f'Notification worker error: {e}', flush=True)
+            delivered = 0
+            if once:
+                raise
+
+        if delivered:
+            print(f'Delivered {delivered} events ({inserted} notifications)', flush=True)
+            continue
+        if once:
+            return
+        db.session.remove()
+        time.sleep(poll_interval)
+
+
+def outbox_stats(window_minutes=60):
+    """Backlog and enqueue-to-delivery lag for the notification outbox.
+
+    Returns:
+        dict with the pending count, age of the oldest pending event and
+        lag percentiles (seconds) over events delivered in the window
+    """
+    now = datetime.utcnow()
+    pending = NotificationEvent.query.filter(NotificationEvent.processed_at.is_(None))
+    oldest = pending.order_by(NotificationEvent.id).first()
+
+    delivered = db.session.query(
+        NotificationEvent.created_at, NotificationEvent.processed_at
+    ).filter(
+        NotificationEvent.processed_at >= now - timedelta(minutes=window_minutes)
+    ).all()
+    lags = sorted(
+        max((processed - created).total_seconds(), 0)
+        for created, processed in delivered if created
+    )
+
+    def percentile(p):
+        if not lags:
+            return None
+        return round(lags[min(len(lags) - 1, int(p / 100 * len(lags)))], 3)
+
+    return {
+        'pending': pending.count(),
+        'oldest_pending_seconds': (
+            round((now - oldest.created_at).total_seconds(), 3) if oldest and oldest.created_at else None
+        ),
+        'window_minutes': window_minutes,
+        'delivered': len(lags),
+        'lag_p50_seconds': percentile(50),
+        'lag_p95_seconds': percentile(95),
+        'lag_max_seconds': round(lags[-1], 3) if lags else None,
+    }
+
+
+def _resolve_recipients(events):
+    """Map event id -> ordered, de-duplicated recipient user ids."""
+    roles = set()
+    request_ids = set()
+    for e in events:
+        if e.audience_type == 'role':
+            roles.add(e.audience)
+        elif e.audience_type == 'team':
+            roles.update(TEAM_ROLES.get(e.audience, []))
+        elif e.audience_type == 'requestor' and e.request_id:
+            request_ids.add(e.request_id)
+
+    users_by_role = {}
+    if roles:
+        for user_id, role in db.session.query(User.id, User.role).filter(
+            User.role.in_(roles), User.is_active.is_(True)
+        ).order_by(User.id):
+            users_by_role.setdefault(role, []).append(user_id)
+
+    requestors = {}
+    if request_ids:
+        requestors = dict(db.session.query(
+            AcquisitionRequest.id, AcquisitionRequest.requestor_id
+        ).filter(AcquisitionRequest.id.in_(request_ids)))
+
+    recipients = {}
+    for e in events:
+        if e.audience_type == 'role':
+            user_ids = users_by_role.get(e.audience, [])
+        elif e.audience_type == 'team':
+            user_ids = []
+            for role in TEAM_ROLES.get(e.audience, []):
+                for user_id in users_by_role.get(role, []):
+                    if user_id not in user_ids:
+                        user_ids.append(user_id)
+        elif e.audience_type == 'requestor':
+            requestor_id = requestors.get(e.request_id)
+            user_ids = [requestor_id] if requestor_id else []
+        elif e.audience_type == 'user':
+            user_ids = [int(e.audience)]
+        else:
+            user_ids = []
+        recipients[e.id] = user_ids
+    return recipients
@@ -0,0 +1,117 @@
+"""
+Notification Retention — move old read notifications to notifications_archive.
+
+Read notifications older than their type's retention period are copied into
+notifications_archive (keeping their ids) and deleted from notifications, so
+the inbox table only holds recent and unread rows. Unread notifications are
+never archived, which leaves the unread counters untouched.
+
+Retention comes from config: NOTIFICATION_RETENTION_DAYS for every type,
+overridden per type by NOTIFICATION_RETENTION_BY_TYPE ('type=days,...',
+0 = never archive).
+
+Rows move in batches of `batch_size`, one short transaction each, so SQLite
+never holds its write lock for long. The maintenance worker runs
+archive_notifications() every ARCHIVE_INTERVAL seconds;
+`flask archive-notifications` runs it on demand.
+"""
+
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, insert, literal, select, true
+from app.extensions import db
+from app.models.notification import Notification, NotificationArchive
+
+ARCHIVE_INTERVAL = 60 * 60
+DEFAULT_BATCH_SIZE = 500
+
+_COPIED_COLUMNS = [
+    'id', 'user_id', 'request_id', 'notification_type', 'title',
+    'message', 'is_read', 'created_at', 'event_id',
+]
+
+
+def retention_policy():
+    """Resolve the configured retention periods.
+
+    Returns:
+        (default_days, {notification_type: days}) — 0 days means keep forever
+    """
+    config = current_app.config
+    default_days = int(config.get('NOTIFICATION_RETENTION_DAYS', 90))
+    by_type = {}
+    for item in (config.get('NOTIFICATION_RETENTION_BY_TYPE') or '').split(','):
+        if '=' not in item:
+            continue
+        notification_type, days = item.split('=', 1)
+        by_type[notification_type.strip()] = int(days)
+    return default_days, by_type
+
+
+def archive_notifications(batch_size=DEFAULT_BATCH_SIZE, now=None):
+    """Archive read notifications past their retention period.
+
+    Args:
+        batch_size: notifications moved per transaction
+        now: reference time (defaults to utcnow)
+
+    Returns:
+        dict with the total archived, counts per notification type and the
+        number of batches committed
+    """
+    now = now or datetime.utcnow()
+    default_days, by_type = retention_policy()
+
+    # One (filter, days) rule per overridden type, plus the default for the rest
+    rules = [
+        (Notification.notification_type == notification_type, days)
+        for notification_type, days in sorted(by_type.items())
+    ]
+    rules.append((Notification.notification_type.notin_(list(by_type)) if by_type else true(), default_days))
+
+    archived = {}
+    batches = 0
+    for type_filter, days in rules:
+        if days <= 0:
+            continue
+        cutoff = now - timedelta(days=days)
+        while True:
+            moved = _archive_batch(type_filter, cutoff, batch_size, now)
+            if not moved:
+                break
+            batches += 1
+            for t, n in moved.items():
+                archived[t] = archived.get(t, 0) + n
+            if sum(moved.values()) < batch_size:
+                break
+
+    return {'archived': sum(archived.values()), 'by_type': archived, 'batches': batches}
+
+
+def _archive_batch(type_filter, cutoff, batch_size, now):
+    """Move one batch in its own transaction. Returns {notification_type: count}."""
+    rows = db.session.execute(
+        select(Notification.id, Notification.notification_type).where(
+            type_filter,
+            Notification.is_read.is_(True),
+            Notification.created_at < cutoff,
+        ).order_by(Notification.id).limit(batch_size)
+    ).all()
+    if not rows:
+        return {}
+    ids = [row.id for row in rows]
+
+    source = Notification.__table__
+    archive = NotificationArchive.__table__
+    db.session.execute(insert(archive).from_select(
+        _COPIED_COLUMNS + ['archived_at'],
+        select(*[source.c[name] for name in _COPIED_COLUMNS], literal(now))
+        .where(source.c.id.in_(ids)),
+    ))
+    db.session.execute(delete(source).where(source.c.id.in_(ids)))
+    db.session.commit()
+
+    counts = {}
+    for row in rows:
+        counts[row.notification_type] = counts.get(row.notification_type, 0) + 1
+    return counts
@@ -2,12 +2,20 @@
 Notification helpers — create notifications for workflow events.
 
 Called from workflow.py, intake.py, and advisory.py.
+
+The notify_* helpers write one NotificationEvent to the outbox in the
+caller's transaction; the notification worker expands it into per-user
+notifications (see notification_outbox.py). With NOTIFICATION_DELIVERY set
+to 'inline' (the default when no worker runs) the event is expanded right
+away, in the same transaction.
 """
 
+from flask import current_app
 from app.extensions import db
 from app.models.notification import Notification
-from app.models.user import User
-from app.models.request import AcquisitionRequest
+from app.models.notification_event import NotificationEvent
+from app.services.notification_outbox import deliver_events
+from app.services.unread_counter import add_unread
 
 
 def create_notification(user_id, request_id, notification_type, title, message=None):
@@ -20,47 +28,42 @@ def create_notification(user_id, request_id, notification_type, title, message=N
         message=message,
     )
     db.session.add(n)
+    add_unread([user_id])
     return n
 
 
+def enqueue_notification(audience_type, audience, request_id, notification_type, title, message=None):
+    """Write a NotificationEvent for an audience (role, team, requestor or user)."""
+    event = NotificationEvent(
+        audience_type=audience_type,
+        audience=str(audience) if audience is not None else None,
+        request_id=request_id,
+        notification_type=notification_type,
+        title=title,
+        message=message,
+    )
+    db.session.add(event)
+    if current_app.config.get('NOTIFICATION_DELIVERY', 'inline') == 'inline':
+        db.session.flush()
+        deliver_events([event])
+    return event
+
+
 def notify_users_by_role(role, request_id, notification_type, title, message=None):
-    """Create notifications for ALL active users with the given role."""
-    users = User.query.filter_by(role=role, is_active=True).all()
-    for u in users:
-        create_notification(u.id, request_id, notification_type, title, message)
+    """Notify ALL active users with the given role."""
+    return enqueue_notification('role', role, request_id, notification_type, title, message)
 
 
 def notify_users_by_team(team, request_id, notification_type, title, message=None):
-    """Create notifications for users whose role maps to the advisory team.
+    """Notify users whose role maps to the advisory team.
 
-    Uses the same role-to-team mapping as the advisory queue endpoint.
+    Uses the same role-to-team mapping as the advisory queue endpoint
+    (notification_outbox.TEAM_ROLES). Admins already see every advisory
+    queue, so they are not notified.
     """
-    # Map advisory team names to user roles
-    team_to_roles = {
-        'scrm': ['scrm'],
-        'sbo': ['sb'],
-        'cio': ['cto', 'cio'],
-        'section508': ['cto', 'cio'],
-        'fm': ['budget'],
-        'legal': ['legal'],
-        'fedramp': ['cto', 'cio'],
-    }
-
-    roles = team_to_roles.get(team, [])
-    notified_ids = set()
-    for role in roles:
-        users = User.query.filter_by(role=role, is_active=True).all()
-        for u in users:
-            if u.id not in notified_ids:
-                create_notification(u.id, request_id, notification_type, title, message)
-                notified_ids.add(u.id)
-
-    # Also notify admins (they see all advisory queues)
-    # Skip — admins already see everything; keep notifications focused
+    return enqueue_notification('team', team, request_id, notification_type, title, message)
 
 
 def notify_requestor(request_id, notification_type, title, message=None):
-    """Create a notification for the requestor of a given acquisition request."""
-    req = AcquisitionRequest.query.get(request_id)
-    if req and req.requestor_id:
-        create_notification(req.requestor_id, request_id, notification_type, title, message)
+    """Notify the requestor of a given acquisition request."""
+    return enqueue_notification('requestor', None, request_id, notification_type, title, message)
@@ -0,0 +1,166 @@
+"""
+Bulk Re-derivation — reclassify open requests after the rules change.
+
+A rules import replaces IntakePaths and thresholds, which leaves the
+derived_* columns on existing requests stale. This job walks the open
+requests in id order, one chunk at a time, reading only the intake answers
+and current derived values (plain column tuples, so nothing accumulates in
+the session). Each chunk is classified with derive_classification_batch,
+and only rows whose derived values changed are written back in a single
+bulk UPDATE per chunk, together with the matching dashboard rollup
+deltas. The checklist and approval chain are left alone.
+"""
+
+import time
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import insert, update
+from app.extensions import db
+from app.models.request import CLOSED_STATUSES, AcquisitionRequest
+from app.models.activity import ActivityLog
+from app.services.dashboard_rollup import record_updates
+from app.services.derivation import ANSWER_FIELDS, derive_classification_batch
+from app.services.rules_cache import rules_version
+
+DERIVED_FIELDS = (
+    'derived_acquisition_type',
+    'derived_tier',
+    'derived_pipeline',
+    'derived_contract_character',
+    'derived_requirements_doc_type',
+    'derived_scls_applicable',
+    'derived_qasp_required',
+    'derived_eval_approach',
+)
+
+# Changes to these fields are counted and logged on the request's activity feed
+REPORTED_FIELDS = ('derived_tier', 'derived_pipeline', 'derived_acquisition_type')
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def rederive_open_requests(chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False,
+                           detail_limit=500, actor='System'):
+    """Re-derive classification for every open request with completed intake.
+
+    Commits after each chunk unless dry_run is set, in which case nothing is
+    written and the report shows what would change.
+
+    Args:
+        chunk_size: requests read and updated per round trip
+        dry_run: compute the diff without writing
+        detail_limit: maximum per-request entries in the report
+        actor: name recorded on the activity log entries
+
+    Returns:
+        dict report with scanned/changed counts, per-field change counts and
+        old -> new transitions, and per-request details (up to detail_limit)
+    """
+    started = time.monotonic()
+    columns = [
+        AcquisitionRequest.id,
+        AcquisitionRequest.request_number,
+        AcquisitionRequest.estimated_value,
+        AcquisitionRequest.status,
+        AcquisitionRequest.fiscal_year,
+    ]
+    columns += [getattr(AcquisitionRequest, f) for f in ANSWER_FIELDS]
+    columns += [getattr(AcquisitionRequest, f) for f in DERIVED_FIELDS]
+
+    scanned = 0
+    changed = 0
+    field_changes = Counter()
+    transitions = {f: Counter() for f in REPORTED_FIELDS}
+    details = []
+    last_id = 0
+
+    while True:
+        rows = (
+            db.session.query(*columns)
+            .filter(
+                AcquisitionRequest.id > last_id,
+                AcquisitionRequest.intake_completed.is_(True),
+                AcquisitionRequest.status.notin_(CLOSED_STATUSES),
+            )
+            .order_by(AcquisitionRequest.id)
+            .limit(chunk_size)
+            .all()
+        )
+        if not rows:
+            break
+        last_id = rows[-1].id
+        scanned += len(rows)
+
+        results, _ = derive_classification_batch(r._asdict() for r in rows)
+
+        now = datetime.utcnow()
+        updates = []
+        logs = []
+        moves = []
+        for row, derived in zip(rows, results):
+            diff = {
+                f: (getattr(row, f), derived[f])
+                for f in DERIVED_FIELDS
+                if getattr(row, f) != derived[f]
+            }
+            if not diff:
+                continue
+
+            changed += 1
+            field_changes.update(diff.keys())
+            updates.append(dict(
+                {f: derived[f] for f in DERIVED_FIELDS},
+                id=row.id, intake_last_modified=now,
+            ))
+            before = row._asdict()
+            moves.append((before, dict(before, **{f: derived[f] for f in DERIVED_FIELDS})))
+
+            reported = {f: diff[f] for f in REPORTED_FIELDS if f in diff}
+            for f, (old, new) in reported.items():
+                transitions[f][f'{old} -> {new}'] += 1
+            if reported:
+                logs.append({
+                    'request_id': row.id,
+                    'activity_type': 'rederived',
+                    'description': 'Re-derived after rules change: ' + ', '.join(
+                        f'{f.replace("derived_", "")} {old} -> {new}'
+                        for f, (old, new) in reported.items()
+                    ),
+                    'actor': actor,
+                    'old_value': f'{row.derived_acquisition_type}/{row.derived_tier}/{row.derived_pipeline}',
+                    'new_value': (
+                        f'{derived["derived_acquisition_type"]}/'
+                        f'{derived["derived_tier"]}/{derived["derived_pipeline"]}'
+                    ),
+                    'created_at': now,
+                })
+
+            if len(details) < detail_limit:
+                details.append({
+                    'id': row.id,
+                    'request_number': row.request_number,
+                    'changes': {f: {'old': old, 'new': new} for f, (old, new) in diff.items()},
+                })
+
+        if updates and not dry_run:
+            db.session.execute(update(AcquisitionRequest), updates)
+            record_updates(AcquisitionRequest, moves)
+            if logs:
+                db.session.execute(insert(ActivityLog), logs)
+            db.session.commit()
+
+    return {
+        'dry_run': dry_run,
+        'rules_version': rules_version(),
+        'scanned': scanned,
+        'changed': changed,
+        'unchanged': scanned - changed,
+        'tier_changes': field_changes['derived_tier'],
+        'pipeline_changes': field_changes['derived_pipeline'],
+        'acquisition_type_changes': field_changes['derived_acquisition_type'],
+        'field_changes': dict(field_changes),
+        'transitions': {f: dict(c) for f, c in transitions.items()},
+        'requests': details,
+        'truncated': changed > len(details),
+        'elapsed_seconds': round(time.monotonic() - started, 3),
+    }
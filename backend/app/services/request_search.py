@@ -0,0 +1,157 @@
+"""
+Request Search — full-text index over request number, title and description.
+
+The index lives in the database and is kept in sync there, so every write
+path (ORM, bulk statements, raw SQL) is covered:
+
+    sqlite      an external-content FTS5 table, request_search, filled by
+                AFTER INSERT / UPDATE / DELETE triggers on
+                acquisition_requests. Ranked with bm25(); highlight() and
+                snippet() mark the matches.
+    postgresql  a generated tsvector column, search_vector, with a GIN
+                index. Ranked with ts_rank_cd() (Postgres has no BM25);
+                ts_headline() marks the matches.
+
+Each word of the search becomes a prefix term ("dock stat" matches
+"Docking Stations") and all terms must match. apply_search() adds the
+match, the rank and the highlights to the request list query, so they run
+in one statement with its other filters. Searches with no indexable words,
+or on other databases, fall back to the substring match.
+
+The index is created with the acquisition_requests table (and by the wsgi
+migration); `flask rebuild-search-index` refills it.
+"""
+
+import html
+import re
+from sqlalchemy import DDL, column, event, func, literal, literal_column, or_, table, text
+from app.extensions import db
+from app.models.request import AcquisitionRequest
+
+# Column weights: request number and title count ten times the description
+BM25_WEIGHTS = (10.0, 10.0, 1.0)
+SNIPPET_TOKENS = 16
+
+# Match markers: control characters that cannot come from user text, turned
+# into <mark> after the rest is HTML-escaped
+_START, _STOP = '\x02', '\x03'
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+_fts = table('request_search', column('rowid'))
+
+_SQLITE_DDL = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS request_search USING fts5(
+        request_number, title, description,
+        content='acquisition_requests', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS request_search_ai AFTER INSERT ON acquisition_requests BEGIN
+        INSERT INTO request_search (rowid, request_number, title, description)
+        VALUES (new.id, new.request_number, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS request_search_ad AFTER DELETE ON acquisition_requests BEGIN
+        INSERT INTO request_search (request_search, rowid, request_number, title, description)
+        VALUES ('delete', old.id, old.request_number, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS request_search_au
+    AFTER UPDATE OF request_number, title, description ON acquisition_requests BEGIN
+        INSERT INTO request_search (request_search, rowid, request_number, title, description)
+        VALUES ('delete', old.id, old.request_number, old.title, old.description);
+        INSERT INTO request_search (rowid, request_number, title, description)
+        VALUES (new.id, new.request_number, new.title, new.description);
+    END""",
+)
+
+_POSTGRES_DDL = (
+    """ALTER TABLE acquisition_requests ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(request_number, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_acquisition_requests_search ON acquisition_requests USING GIN (search_vector)",
+)
+
+
+def install_search_index(connection):
+    """Create the index for the connection's dialect (idempotent) and fill it."""
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        for statement in _SQLITE_DDL:
+            connection.execute(text(statement))
+        connection.execute(text("INSERT INTO request_search (request_search) VALUES ('rebuild')"))
+    elif dialect == 'postgresql':
+        for statement in _POSTGRES_DDL:
+            connection.execute(text(statement))
+
+
+def rebuild_search_index():
+    """Refill the index from acquisition_requests. Commits."""
+    with db.engine.begin() as conn:
+        install_search_index(conn)
+
+
+def search_terms(search):
+    """The words of a search string, lowercased, in order and without repeats."""
+    return list(dict.fromkeys(word.lower() for word in _WORD.findall(search or '')))
+
+
+def apply_search(query, search):
+    """Filter a query of AcquisitionRequest rows to those matching `search`.
+
+    Returns:
+        (query, rank, columns): rank orders best match first (None for the
+        substring fallback); columns are the highlighted title and
+        description snippet, to add to the query's entities (empty for the
+        fallback)
+    """
+    terms = search_terms(search)
+    dialect = db.engine.dialect.name
+    if not terms or dialect not in ('sqlite', 'postgresql'):
+        return query.filter(or_(
+            AcquisitionRequest.title.ilike(f'%{search}%'),
+            AcquisitionRequest.request_number.ilike(f'%{search}%'),
+            AcquisitionRequest.description.ilike(f'%{search}%'),
+        )), None, []
+
+    if dialect == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        query = query.join(_fts, _fts.c.rowid == AcquisitionRequest.id).filter(
+            text('request_search MATCH :search_match').bindparams(search_match=match)
+        )
+        fts = literal_column('request_search')
+        rank = func.bm25(fts, *BM25_WEIGHTS)
+        columns = [
+            func.highlight(fts, 1, _START, _STOP),
+            func.snippet(fts, 2, _START, _STOP, '…', SNIPPET_TOKENS),
+        ]
+        return query, rank, columns
+
+    tsquery = func.to_tsquery('english', literal(' & '.join(f'{term}:*' for term in terms)))
+    vector = literal_column('acquisition_requests.search_vector')
+    options = f'StartSel={_START}, StopSel={_STOP}, MaxWords={SNIPPET_TOKENS}, MinWords=5'
+    query = query.filter(vector.op('@@')(tsquery))
+    rank = -func.ts_rank_cd(vector, tsquery)
+    columns = [
+        func.ts_headline('english', AcquisitionRequest.title, tsquery, f'StartSel={_START}, StopSel={_STOP}, HighlightAll=true'),
+        func.ts_headline('english', func.coalesce(AcquisitionRequest.description, ''), tsquery, options),
+    ]
+    return query, rank, columns
+
+
+def markup(fragment):
+    """HTML-escape a highlighted fragment and wrap its matches in <mark>."""
+    if fragment is None:
+        return None
+    return html.escape(fragment).replace(_START, '<mark>').replace(_STOP, '</mark>')
+
+
+event.listen(
+    AcquisitionRequest.__table__, 'after_create',
+    lambda target, connection, **kw: install_search_index(connection),
+)
+event.listen(
+    AcquisitionRequest.__table__, 'before_drop',
+    DDL('DROP TABLE IF EXISTS request_search').execute_if(dialect='sqlite'),
+)
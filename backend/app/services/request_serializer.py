@@ -0,0 +1,43 @@
+"""
+Request Serializer — serializes lists of AcquisitionRequests without
+per-row queries.
+
+action_with reads the denormalized holder columns (see action_holder.py), so
+the only relation a request dict needs is its requestor. These helpers load
+the requestors for a whole page in one query and attach them to the
+instances, so to_dict() and the dashboard summaries never lazy-load.
+"""
+
+from sqlalchemy.orm.attributes import set_committed_value
+from app.models.request import AcquisitionRequest
+from app.models.user import User
+
+
+def prefetch_requestors(requests):
+    """Load the requestor of every request in one query and attach it."""
+    pending = [r for r in requests if 'requestor' not in r.__dict__]
+    ids = {r.requestor_id for r in pending if r.requestor_id is not None}
+    users = {u.id: u for u in User.query.filter(User.id.in_(ids))} if ids else {}
+    for r in pending:
+        set_committed_value(r, 'requestor', users.get(r.requestor_id))
+    return requests
+
+
+def load_requests(request_ids):
+    """Load requests by id with their requestors, in two queries.
+
+    Returns:
+        dict of request id -> AcquisitionRequest (missing ids are absent)
+    """
+    ids = {i for i in request_ids if i is not None}
+    if not ids:
+        return {}
+    requests = AcquisitionRequest.query.filter(AcquisitionRequest.id.in_(ids)).all()
+    prefetch_requestors(requests)
+    return {r.id: r for r in requests}
+
+
+def serialize_requests(requests, include_relations=False):
+    """to_dict() for a list of requests, prefetching their requestors first."""
+    prefetch_requestors(requests)
+    return [r.to_dict(include_relations=include_relations) for r in requests]
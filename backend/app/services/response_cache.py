@@ -0,0 +1,286 @@
+"""
+Response Cache — write-invalidated caching of read-heavy GET responses.
+
+Endpoints opt in with @cached_response(*models), placed below
+@jwt_required(). An entry is keyed by the endpoint, its view and query
+arguments, the caller's JWT role and the current generation of each table
+the response is built from. Writes are counted per table by Session events:
+
+    after_flush      tables of the rows the ORM inserted, updated or deleted
+    do_orm_execute   the table of a bulk INSERT / UPDATE / DELETE statement
+
+Only tables some cached endpoint reads are tracked (CACHED_TABLES, filled
+by the decorator). When the transaction commits, each of them it wrote
+moves to its next generation, once per commit, so the next request builds
+a new key and recomputes. A rollback bumps nothing. Responses carry an ETag
+(a hash of the body) with `Cache-Control: private, no-cache`, so browsers
+revalidate with If-None-Match and get a bodiless 304 while nothing has
+changed.
+
+Where generations and entries live depends on RESPONSE_CACHE_BACKEND:
+
+    local     stand-in for a single process: generations in memory and an
+              LRU of RESPONSE_CACHE_SIZE entries. Only sees writes committed
+              by this process.
+    database  generations in cache_generations and entries in
+              response_cache_entries, shared by every gunicorn worker.
+              Generations are bumped after the commit with one upsert on a
+              connection of their own, so writers never hold the counter
+              rows for the rest of their transaction. Writes from the
+              workers and CLI commands invalidate too.
+
+Entries also expire after `ttl` seconds (RESPONSE_CACHE_TTL by default).
+That bounds staleness from writes the events cannot see (raw SQL, other
+processes under the local backend, a bump lost to a crash right after the
+commit) and from values that depend on the clock, such as overdue counts.
+
+Other backends (e.g. Redis) plug in by adding a class with
+generations(tables), bump(tables), get(key, max_age),
+set(key, endpoint, etag, body) and stats() to BACKENDS.
+"""
+
+import functools
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from flask import current_app, request
+from flask_jwt_extended import get_jwt
+from sqlalchemy import delete, event
+from sqlalchemy.orm import Session
+from app.extensions import db, dialect_insert
+from app.models.response_cache import CacheGeneration, ResponseCacheEntry
+
+_SESSION_KEY = 'response_cache_tables'
+
+# Tables read by some @cached_response endpoint; writes to others bump nothing
+CACHED_TABLES = set()
+
+_stats = {}  # endpoint -> {'hits': int, 'misses': int, 'not_modified': int}
+
+
+class LocalBackend:
+    """Single-process stand-in: in-memory generations and an LRU of responses."""
+
+    def __init__(self, app):
+        self.max_entries = app.config.get('RESPONSE_CACHE_SIZE', 512)
+        self._lock = threading.Lock()
+        self._generations = {}
+        self._entries = OrderedDict()  # key -> (etag, body, stored at)
+
+    def generations(self, tables):
+        with self._lock:
+            return [self._generations.get(t, 0) for t in tables]
+
+    def bump(self, tables):
+        with self._lock:
+            for t in tables:
+                self._generations[t] = self._generations.get(t, 0) + 1
+
+    def get(self, key, max_age):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[2] > max_age:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0], entry[1]
+
+    def set(self, key, endpoint, etag, body):
+        with self._lock:
+            self._entries[key] = (etag, body, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'generations': dict(sorted(self._generations.items())),
+            }
+
+
+class DatabaseBackend:
+    """Generations and entries in the database, shared by every process."""
+
+    retention = timedelta(hours=1)
+    purge_every = 300.0
+
+    def __init__(self, app):
+        self._last_purge = time.monotonic()
+
+    def generations(self, tables):
+        stored = dict(db.session.query(CacheGeneration.table_name, CacheGeneration.generation).filter(
+            CacheGeneration.table_name.in_(tables)
+        ).all())
+        return [stored.get(t, 0) for t in tables]
+
+    def bump(self, tables):
+        now = datetime.utcnow()
+        table = CacheGeneration.__table__
+        # Sorted so concurrent bumps lock the counters in the same order
+        stmt = dialect_insert()(table).values([
+            {'table_name': t, 'generation': 1, 'updated_at': now} for t in sorted(tables)
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['table_name'],
+            set_={'generation': table.c.generation + 1, 'updated_at': now},
+        )
+        with db.engine.begin() as conn:
+            conn.execute(stmt)
+
+    def get(self, key, max_age):
+        return db.session.query(ResponseCacheEntry.etag, ResponseCacheEntry.body).filter(
+            ResponseCacheEntry.cache_key == key,
+            ResponseCacheEntry.created_at >= datetime.utcnow() - timedelta(seconds=max_age),
+        ).first()
+
+    def set(self, key, endpoint, etag, body):
+        now = datetime.utcnow()
+        table = ResponseCacheEntry.__table__
+        stmt = dialect_insert()(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['cache_key'],
+            set_={'etag': stmt.excluded.etag, 'body': stmt.excluded.body, 'created_at': now},
+        )
+        # Own connection: the request's session is left as the view left it
+        with db.engine.begin() as conn:
+            conn.execute(stmt, {'cache_key': key, 'endpoint': endpoint, 'etag': etag, 'body': body, 'created_at': now})
+            if time.monotonic() - self._last_purge > self.purge_every:
+                conn.execute(delete(table).where(table.c.created_at < now - self.retention))
+                self._last_purge = time.monotonic()
+
+    def stats(self):
+        return {
+            'entries': db.session.query(ResponseCacheEntry).count(),
+            'generations': dict(db.session.query(
+                CacheGeneration.table_name, CacheGeneration.generation
+            ).order_by(CacheGeneration.table_name).all()),
+        }
+
+
+BACKENDS = {
+    'local': LocalBackend,
+    'database': DatabaseBackend,
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """The process-wide cache backend, created on first use (after any fork)."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                app = current_app._get_current_object()
+                _backend = BACKENDS[app.config.get('RESPONSE_CACHE_BACKEND', 'local')](app)
+    return _backend
+
+
+def cached_response(*models, ttl=None):
+    """Cache a JSON GET view's 200 responses until a table it reads is written.
+
+    Args:
+        models: the models whose tables the response is built from
+        ttl: seconds an entry may be served (default RESPONSE_CACHE_TTL)
+    """
+    tables = sorted({m.__tablename__ for m in models})
+    CACHED_TABLES.update(tables)
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            backend = get_backend()
+            max_age = ttl or current_app.config.get('RESPONSE_CACHE_TTL', 300)
+            key = _cache_key(tables, backend.generations(tables))
+            stats = _stats.setdefault(request.endpoint, {'hits': 0, 'misses': 0, 'not_modified': 0})
+
+            entry = backend.get(key, max_age)
+            if entry is not None:
+                etag, body = entry
+                response = current_app.response_class(body, mimetype='application/json')
+                stats['hits'] += 1
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                body = response.get_data()
+                etag = hashlib.sha1(body).hexdigest()
+                backend.set(key, request.endpoint, etag, body)
+                stats['misses'] += 1
+
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            response.vary.add('Authorization')
+            response.make_conditional(request)
+            if response.status_code == 304:
+                stats['not_modified'] += 1
+            return response
+        return wrapper
+    return decorator
+
+
+def response_cache_stats():
+    """Backend state and per-endpoint hit/miss/304 counters for this process."""
+    return {
+        'backend': current_app.config.get('RESPONSE_CACHE_BACKEND', 'local'),
+        **get_backend().stats(),
+        'endpoints': {endpoint: dict(s) for endpoint, s in sorted(_stats.items())},
+    }
+
+
+def _cache_key(tables, generations):
+    parts = [
+        request.endpoint,
+        sorted(request.view_args.items()),
+        sorted(request.args.items(multi=True)),
+        get_jwt().get('role', ''),
+        list(zip(tables, generations)),
+    ]
+    return hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()
+
+
+def _note_tables(session, names):
+    names = {n for n in names if n in CACHED_TABLES}
+    if names:
+        session.info.setdefault(_SESSION_KEY, set()).update(names)
+
+
+@event.listens_for(Session, 'after_flush')
+def _note_flushed_tables(session, flush_context):
+    written = list(session.new) + list(session.deleted) + [
+        obj for obj in session.dirty if session.is_modified(obj)
+    ]
+    _note_tables(session, {getattr(type(obj), '__tablename__', None) for obj in written})
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _note_bulk_tables(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, 'table', None)
+        _note_tables(orm_execute_state.session, {getattr(table, 'name', None)})
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_after_commit(session):
+    tables = session.info.pop(_SESSION_KEY, None)
+    if not tables:
+        return
+    try:
+        get_backend().bump(tables)
+    except Exception as e:
+        # The committed change stands; entries still expire after their ttl
+        print(f'Response cache invalidation failed: {e}', flush=True)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop(_SESSION_KEY, None)
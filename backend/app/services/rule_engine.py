@@ -0,0 +1,292 @@
+"""
+Rule Engine — JSON rule conditions compiled into predicates.
+
+DocumentRule.conditions and ApprovalTemplateStep.condition_rule share one
+format:
+
+{
+    "allOf": [
+        {"field": "derived_acquisition_type", "operator": "in", "values": ["new_competitive", "recompete"]},
+        {"anyOf": [
+            {"field": "estimated_value", "operator": ">", "value": 15000},
+            {"field": "intake_q_buy_category", "operator": "==", "value": "service"}
+        ]}
+    ]
+}
+
+Operators: in, not_in, ==, !=, >, <, >=, <=, exists. allOf/anyOf groups
+may be nested to any depth.
+
+Each condition is parsed once into a closure. The checklist plan and the
+approval template graph hold the closures for the current rules version, so
+rules are evaluated without re-reading JSON or dispatching on operator
+strings.
+
+condition_to_sql() compiles the same format into a SQLAlchemy WHERE clause
+with identical semantics, for set-based "which requests match" queries.
+"""
+
+import json
+from sqlalchemy import Boolean, Float, Integer, Numeric, String, and_, false, func, not_, or_, true
+from app.errors import BadRequestError
+
+OPERATORS = ('in', 'not_in', '==', '!=', '>', '<', '>=', '<=', 'exists')
+
+
+def compile_condition(conditions, default=False):
+    """Compile a condition (JSON text or parsed dict) into a predicate.
+
+    Args:
+        conditions: JSON string or dict in the format above
+        default: result for conditions that are empty, unparseable or
+            incomplete (a leaf without field/operator, an unknown operator)
+
+    Returns:
+        callable taking a request (model instance or dict) and returning bool
+    """
+    if not conditions:
+        return _constant(default)
+    try:
+        parsed = json.loads(conditions) if isinstance(conditions, str) else conditions
+    except (json.JSONDecodeError, TypeError):
+        return _constant(default)
+    return _compile_node(parsed, default)
+
+
+def condition_fields(conditions):
+    """Return the set of request fields a condition reads.
+
+    Conditions that are empty or cannot be parsed read no fields (their
+    predicate is constant).
+    """
+    if not conditions:
+        return frozenset()
+    try:
+        parsed = json.loads(conditions) if isinstance(conditions, str) else conditions
+    except (json.JSONDecodeError, TypeError):
+        return frozenset()
+
+    fields = set()
+    stack = [parsed]
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, dict):
+            continue
+        if 'allOf' in node:
+            stack.extend(node['allOf'] or ())
+        elif 'anyOf' in node:
+            stack.extend(node['anyOf'] or ())
+        elif node.get('field') and node.get('operator') in OPERATORS:
+            fields.add(node['field'])
+    return frozenset(fields)
+
+
+def build_field_index(rule_fields):
+    """Invert (rule_id, fields) pairs into field -> frozenset of rule ids."""
+    index = {}
+    for rule_id, fields in rule_fields:
+        for field in fields:
+            index.setdefault(field, set()).add(rule_id)
+    return {field: frozenset(ids) for field, ids in index.items()}
+
+
+def _constant(result):
+    return lambda request: result
+
+
+def _compile_node(node, default):
+    if not isinstance(node, dict):
+        return _constant(default)
+
+    # allOf (AND logic)
+    if 'allOf' in node:
+        parts = [_compile_node(c, default) for c in node['allOf'] or ()]
+        return lambda request: all(p(request) for p in parts)
+
+    # anyOf (OR logic)
+    if 'anyOf' in node:
+        parts = [_compile_node(c, default) for c in node['anyOf'] or ()]
+        return lambda request: any(p(request) for p in parts)
+
+    return _compile_leaf(node, default)
+
+
+def _compile_leaf(condition, default):
+    field = condition.get('field')
+    operator = condition.get('operator')
+    if not field or not operator or operator not in OPERATORS:
+        return _constant(default)
+
+    def get(request):
+        if isinstance(request, dict):
+            return request.get(field)
+        return getattr(request, field, None)
+
+    if operator == 'exists':
+        return lambda request: get(request) is not None
+
+    if operator in ('in', 'not_in'):
+        values = condition.get('values', [])
+        contains = _membership(values)
+        if operator == 'in':
+            return lambda request: contains(get(request))
+        return lambda request: not contains(get(request))
+
+    compare_value = condition.get('value')
+    if operator == '==':
+        return lambda request: get(request) == compare_value
+    if operator == '!=':
+        return lambda request: get(request) != compare_value
+
+    # Numeric comparisons (missing values compare as 0)
+    try:
+        cv = float(compare_value) if compare_value is not None else 0
+    except (ValueError, TypeError):
+        return _constant(False)
+    compare = {
+        '>': lambda fv: fv > cv,
+        '<': lambda fv: fv < cv,
+        '>=': lambda fv: fv >= cv,
+        '<=': lambda fv: fv <= cv,
+    }[operator]
+
+    def numeric(request):
+        value = get(request)
+        try:
+            fv = float(value) if value is not None else 0
+        except (ValueError, TypeError):
+            return False
+        return compare(fv)
+
+    return numeric
+
+
+def _membership(values):
+    """Membership test for an 'in'/'not_in' value list, using a set when possible."""
+    if not isinstance(values, (list, tuple)):
+        return lambda value: value in values
+    try:
+        lookup = frozenset(values)
+    except TypeError:
+        return lambda value: value in values
+
+    def contains(value):
+        try:
+            return value in lookup
+        except TypeError:
+            return value in values
+
+    return contains
+
+
+# ---------------------------------------------------------------------------
+# SQL compilation
+# ---------------------------------------------------------------------------
+
+_NUMERIC_TYPES = (Integer, Float, Numeric, Boolean)
+
+
+def condition_to_sql(conditions, model, default=False):
+    """Compile a condition into a WHERE clause over `model`'s table.
+
+    The clause matches exactly the rows the compiled predicate accepts,
+    including the Python handling of NULLs (a missing value is not `in`
+    any list, compares as 0, and so on). Every clause is two-valued, so it
+    can be safely negated with not_().
+
+    Args:
+        conditions: JSON string or dict
+        model: mapped class whose columns the condition fields name
+        default: result for empty, unparseable or incomplete conditions
+
+    Raises:
+        BadRequestError: a field is not a column of the model, or a value
+            cannot be compared in SQL the way Python compares it
+
+    Returns:
+        SQLAlchemy boolean clause
+    """
+    if not conditions:
+        return _sql_constant(default)
+    try:
+        parsed = json.loads(conditions) if isinstance(conditions, str) else conditions
+    except (json.JSONDecodeError, TypeError):
+        return _sql_constant(default)
+    return _sql_node(parsed, model, default)
+
+
+def _sql_constant(result):
+    return true() if result else false()
+
+
+def _sql_node(node, model, default):
+    if not isinstance(node, dict):
+        return _sql_constant(default)
+    if 'allOf' in node:
+        parts = [_sql_node(c, model, default) for c in node['allOf'] or ()]
+        return and_(true(), *parts)
+    if 'anyOf' in node:
+        parts = [_sql_node(c, model, default) for c in node['anyOf'] or ()]
+        return or_(false(), *parts)
+    return _sql_leaf(node, model, default)
+
+
+def _sql_leaf(condition, model, default):
+    field = condition.get('field')
+    operator = condition.get('operator')
+    if not field or not operator or operator not in OPERATORS:
+        return _sql_constant(default)
+
+    column = model.__table__.columns.get(field)
+    if column is None:
+        raise BadRequestError(f'Field "{field}" cannot be queried in SQL')
+    col = getattr(model, column.key)
+    numeric = isinstance(column.type, _NUMERIC_TYPES)
+
+    def check_value(value):
+        # Python never equates a str with a number; keep SQL from coercing
+        if value is None:
+            return
+        if numeric and isinstance(value, str) or not numeric and not isinstance(value, str):
+            raise BadRequestError(f'Value {value!r} does not match the type of "{field}"')
+
+    if operator == 'exists':
+        return col.isnot(None)
+    if not numeric and not isinstance(column.type, String):
+        raise BadRequestError(f'"{field}" can only be tested with "exists" in SQL')
+
+    if operator in ('in', 'not_in'):
+        values = condition.get('values', [])
+        if not isinstance(values, (list, tuple)):
+            raise BadRequestError(f'"{operator}" on "{field}" needs a list of values')
+        for v in values:
+            check_value(v)
+        non_null = [v for v in values if v is not None]
+        matches = and_(col.isnot(None), col.in_(non_null))
+        if len(non_null) < len(values):
+            matches = or_(col.is_(None), matches)
+        return matches if operator == 'in' else not_(matches)
+
+    compare_value = condition.get('value')
+    if operator in ('==', '!='):
+        check_value(compare_value)
+        if compare_value is None:
+            equal = col.is_(None)
+        else:
+            equal = and_(col.isnot(None), col == compare_value)
+        return equal if operator == '==' else not_(equal)
+
+    # Numeric comparisons (missing values compare as 0)
+    try:
+        cv = float(compare_value) if compare_value is not None else 0
+    except (ValueError, TypeError):
+        return false()
+    if not numeric:
+        raise BadRequestError(f'"{operator}" needs a numeric field, "{field}" is not')
+    value = func.coalesce(col, 0)
+    return {
+        '>': value > cv,
+        '<': value < cv,
+        '>=': value >= cv,
+        '<=': value <= cv,
+    }[operator]
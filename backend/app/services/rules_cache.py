@@ -0,0 +1,162 @@
+"""
+Rules Cache — process-local caches of compiled rule tables, keyed by the
+shared rules version counter.
+
+Rule tables (intake paths, thresholds, approval templates, document rules,
+advisory triggers) only change on an Excel import or an admin edit. Code
+that changes them calls bump_rules_version() inside the same transaction.
+Each worker re-reads the counter at most every VERSION_CHECK_SECONDS and
+rebuilds a cached value the first time it is asked for under a new version.
+
+A bump only touches the database counter until its transaction commits; a
+Session after_commit hook then moves this process to the new version and
+drops its caches, and a rollback leaves them alone. Until then, the
+bumping transaction builds values from the rows it sees but caches none of
+them, and other threads keep serving the committed rules. Each value is
+tagged with the version read just before it was built, so a value built
+from rules that changed mid-build is rebuilt on the next check.
+"""
+
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models.rules_version import RulesVersion
+
+# How long a worker trusts its last read of the version counter before
+# checking the database again. Bumps made in this process apply immediately.
+VERSION_CHECK_SECONDS = 5
+
+# Session.info key: the version a transaction bumped to, applied on commit
+_PENDING_KEY = 'rules_version_pending'
+
+_lock = threading.Lock()  # guards _state, _caches and _stats
+_state = {'version': None, 'checked_at': 0.0}
+_caches = {}  # name -> (version, value)
+_stats = {}   # name -> {'hits': int, 'misses': int}
+
+
+def rules_version():
+    """Return the current rules version (0 if the counter row does not exist).
+
+    Inside a transaction that bumped the version, that uncommitted version.
+    """
+    pending = db.session.info.get(_PENDING_KEY)
+    if pending is not None:
+        return pending
+    with _lock:
+        version, checked_at = _state['version'], _state['checked_at']
+    if version is not None and time.monotonic() - checked_at < VERSION_CHECK_SECONDS:
+        return version
+    version = _read_version()
+    _advance(version)
+    return version
+
+
+def bump_rules_version():
+    """Increment the rules version. Call in the transaction that changes the rules.
+
+    Returns:
+        the new version number
+    """
+    updated = db.session.query(RulesVersion).filter_by(id=1).update(
+        {'version': RulesVersion.version + 1}, synchronize_session=False
+    )
+    if not updated:
+        db.session.add(RulesVersion(id=1, version=1))
+    db.session.flush()
+
+    version = _read_version()
+    db.session.info[_PENDING_KEY] = version
+    return version
+
+
+def get_cached(name, builder):
+    """Return the cached value for `name`, rebuilding it if the rules changed.
+
+    Args:
+        name: cache key, e.g. 'intake_matcher'
+        builder: zero-argument callable that builds the value from the DB
+
+    Returns:
+        the cached (or freshly built) value
+    """
+    if db.session.info.get(_PENDING_KEY) is not None:
+        # This transaction changed the rules: build from what it sees, but
+        # keep uncommitted rules out of the shared cache
+        return builder()
+
+    version = rules_version()
+    with _lock:
+        stats = _stats.setdefault(name, {'hits': 0, 'misses': 0})
+        entry = _caches.get(name)
+        if entry is not None and entry[0] == version:
+            stats['hits'] += 1
+            return entry[1]
+        stats['misses'] += 1
+
+    # Read in the transaction the builder reads from, so the tag is never
+    # newer than the rows the value is built from
+    built_version = _read_version()
+    value = builder()
+    with _lock:
+        _caches[name] = (built_version, value)
+    _advance(built_version)
+    return value
+
+
+def cache_stats():
+    """Return hit/miss counters for each named cache in this process."""
+    version = rules_version()
+    with _lock:
+        return {
+            'rules_version': version,
+            'caches': {
+                name: {
+                    'hits': s['hits'],
+                    'misses': s['misses'],
+                    'cached_version': _caches[name][0] if name in _caches else None,
+                }
+                for name, s in sorted(_stats.items())
+            },
+        }
+
+
+def clear_caches():
+    """Drop every cached value and force a re-read of the version counter."""
+    with _lock:
+        _caches.clear()
+        _state['version'] = None
+
+
+def _advance(version):
+    """Record `version` as current unless this process already knows a newer one."""
+    with _lock:
+        if _state['version'] is None or version >= _state['version']:
+            _state['version'] = version
+            _state['checked_at'] = time.monotonic()
+
+
+def _read_version():
+    try:
+        version = db.session.query(RulesVersion.version).filter_by(id=1).scalar()
+    except Exception:
+        return 0  # Table may not exist yet
+    return version or 0
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_committed_bump(session):
+    version = session.info.pop(_PENDING_KEY, None)
+    if version is None:
+        return
+    with _lock:
+        _caches.clear()
+        _state['version'] = version
+        _state['checked_at'] = time.monotonic()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_bump(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,251 @@
+"""
+SLA Calendar — business-day due dates and elapsed days.
+
+SLA days count business days: weekends and the dates in the holidays table
+are skipped. The arithmetic is numpy's busday_offset/busday_count over a
+numpy.busdaycalendar built from the holidays table and cached per rules
+version (holiday edits bump it).
+
+A due date is the start rolled forward to a business day, plus sla_days
+business days, at the start's time of day: a step activated Friday 15:00
+with a 1-day SLA is due Monday 15:00 (Tuesday if Monday is a holiday).
+
+due_dates() and business_days_between() take lists and make one numpy
+call; recompute_open_due_dates() uses them to re-date every open approval
+step, advisory input and execution approval in one pass per table, e.g.
+after holidays change (`flask recompute-due-dates`).
+backfill_advisory_due_dates() dates the advisory inputs that have none,
+DEFAULT_CHUNK_SIZE rows per executemany UPDATE.
+"""
+
+from datetime import date, datetime, timedelta
+import numpy as np
+from sqlalchemy import bindparam, update
+from app.extensions import db
+from app.models.advisory import AdvisoryInput
+from app.models.advisory_pipeline_config import AdvisoryPipelineConfig
+from app.models.approval import ApprovalStep
+from app.models.execution import CLINExecutionRequest
+from app.models.holiday import Holiday
+from app.models.request import AcquisitionRequest
+from app.services.action_holder import OPEN_ADVISORY_STATUSES
+from app.services.approval_templates import DEFAULT_SLA_DAYS, get_template_graph
+from app.services.rules_cache import bump_rules_version, get_cached
+
+WEEKMASK = '1111100'  # Monday-Friday
+DEFAULT_CHUNK_SIZE = 1000
+
+# Execution approvals follow the clin_execution template's step numbers
+EXECUTION_PIPELINE = 'clin_execution'
+EXECUTION_STEPS = {'pm': 1, 'cto': 2}
+
+
+def get_calendar():
+    """numpy.busdaycalendar for the current holidays table."""
+    return get_cached('sla_calendar', _build_calendar)
+
+
+def _build_calendar():
+    holidays = [d for (d,) in db.session.query(Holiday.date).order_by(Holiday.date)]
+    return np.busdaycalendar(weekmask=WEEKMASK, holidays=np.array(holidays, dtype='datetime64[D]'))
+
+
+def due_date(start, sla_days):
+    """Due date `sla_days` business days after `start` (default now)."""
+    return due_dates([start or datetime.utcnow()], [sla_days])[0]
+
+
+def due_dates(starts, sla_days):
+    """Vectorized due_date() over parallel lists of start datetimes and SLA days."""
+    if not starts:
+        return []
+    days = np.array([s.date() for s in starts], dtype='datetime64[D]')
+    offsets = np.array([d if d is not None else DEFAULT_SLA_DAYS for d in sla_days], dtype=np.int64)
+    due = np.busday_offset(days, offsets, roll='forward', busdaycal=get_calendar())
+    return [datetime.combine(d, s.time()) for d, s in zip(due.astype(object), starts)]
+
+
+def business_days_between(starts, ends):
+    """Business days elapsed from each start to each end, counting start's day and not end's."""
+    if not starts:
+        return []
+    begin = np.array([s.date() for s in starts], dtype='datetime64[D]')
+    end = np.array([e.date() for e in ends], dtype='datetime64[D]')
+    return np.busday_count(begin, end, busdaycal=get_calendar()).tolist()
+
+
+def advisory_sla_days():
+    """{(pipeline_type, team): sla_days} from the advisory pipeline config."""
+    return {
+        (c.pipeline_type, c.team): c.sla_days
+        for c in AdvisoryPipelineConfig.query.all()
+    }
+
+
+def recompute_open_due_dates():
+    """Re-date every open approval step, advisory input and execution approval. Commits.
+
+    Returns:
+        dict with the number of rows re-dated per table
+    """
+    graph = get_template_graph()
+    counts = {}
+
+    steps = db.session.query(
+        ApprovalStep.id, ApprovalStep.step_number, ApprovalStep.activated_at,
+        AcquisitionRequest.derived_pipeline,
+    ).join(
+        AcquisitionRequest, AcquisitionRequest.id == ApprovalStep.request_id
+    ).filter(ApprovalStep.status == 'active', ApprovalStep.activated_at.isnot(None)).all()
+
+    def step_sla(pipeline, step_number):
+        template = graph.by_pipeline.get(pipeline) if pipeline else None
+        return template.sla_days(step_number) if template else DEFAULT_SLA_DAYS
+
+    counts['approval_steps'] = _write_due_dates(ApprovalStep, steps, [
+        (s.activated_at, step_sla(s.derived_pipeline, s.step_number)) for s in steps
+    ])
+
+    sla = advisory_sla_days()
+    advisories = db.session.query(
+        AdvisoryInput.id, AdvisoryInput.team, AdvisoryInput.requested_date,
+        AcquisitionRequest.derived_pipeline,
+    ).join(
+        AcquisitionRequest, AcquisitionRequest.id == AdvisoryInput.request_id
+    ).filter(
+        AdvisoryInput.status.in_(OPEN_ADVISORY_STATUSES), AdvisoryInput.requested_date.isnot(None)
+    ).all()
+    counts['advisory_inputs'] = _write_due_dates(AdvisoryInput, advisories, [
+        (a.requested_date, sla.get((a.derived_pipeline, a.team))) for a in advisories
+    ])
+
+    executions = CLINExecutionRequest.query.filter(
+        (CLINExecutionRequest.pm_approval == 'pending') | (CLINExecutionRequest.cto_approval == 'pending')
+    ).all()
+    executions = [e for e in executions if execution_approval_start(e)]
+    counts['clin_execution_requests'] = _write_due_dates(CLINExecutionRequest, executions, [
+        (execution_approval_start(e), execution_sla_days(e)) for e in executions
+    ])
+
+    db.session.commit()
+    return counts
+
+
+def backfill_advisory_due_dates(chunk_size=DEFAULT_CHUNK_SIZE):
+    """Set due_date on advisory inputs that have none. Commits.
+
+    Uses the pipeline x team SLA from advisory_pipeline_configs and falls
+    back to DEFAULT_SLA_DAYS; inputs with no requested_date count from now.
+
+    Returns:
+        number of advisory inputs updated
+    """
+    sla = advisory_sla_days()
+    now = datetime.utcnow()
+    rows = db.session.query(
+        AdvisoryInput.id, AdvisoryInput.team, AdvisoryInput.requested_date,
+        AcquisitionRequest.derived_pipeline,
+    ).join(
+        AcquisitionRequest, AcquisitionRequest.id == AdvisoryInput.request_id
+    ).filter(AdvisoryInput.due_date.is_(None)).all()
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        _write_due_dates(AdvisoryInput, chunk, [
+            (row.requested_date or now, sla.get((row.derived_pipeline, row.team))) for row in chunk
+        ])
+    db.session.commit()
+    return len(rows)
+
+
+def execution_sla_days(execution):
+    """SLA days for the execution request's pending PM or CTO approval."""
+    stage = 'pm' if execution.pm_approval == 'pending' else 'cto'
+    template = get_template_graph().by_pipeline.get(EXECUTION_PIPELINE)
+    return template.sla_days(EXECUTION_STEPS[stage]) if template else DEFAULT_SLA_DAYS
+
+
+def execution_approval_start(execution):
+    """When the execution request's pending approval started (None if none is pending)."""
+    if execution.pm_approval == 'pending':
+        return execution.submitted_date
+    if execution.cto_approval == 'pending':
+        return execution.pm_approved_date or execution.submitted_date
+    return None
+
+
+def federal_holidays(year):
+    """U.S. federal holidays for `year` as (observed date, name) pairs.
+
+    Fixed-date holidays on a Saturday are observed the Friday before and on
+    a Sunday the Monday after; the Monday/Thursday holidays use busday_offset
+    with a one-day weekmask to find the nth weekday of the month.
+    """
+    def nth(weekday, month, n):
+        start = np.datetime64(f'{year}-{month:02d}', 'D')
+        return np.busday_offset(start, n - 1, roll='forward', weekmask=weekday).astype(object)
+
+    def last(weekday, month):
+        start = np.datetime64(f'{year}-{month + 1:02d}', 'D')
+        return np.busday_offset(start, -1, roll='forward', weekmask=weekday).astype(object)
+
+    def observed(month, day):
+        d = date(year, month, day)
+        if d.weekday() == 5:
+            return d - timedelta(days=1)
+        if d.weekday() == 6:
+            return d + timedelta(days=1)
+        return d
+
+    return [
+        (observed(1, 1), "New Year's Day"),
+        (nth('Mon', 1, 3), 'Birthday of Martin Luther King, Jr.'),
+        (nth('Mon', 2, 3), "Washington's Birthday"),
+        (last('Mon', 5), 'Memorial Day'),
+        (observed(6, 19), 'Juneteenth National Independence Day'),
+        (observed(7, 4), 'Independence Day'),
+        (nth('Mon', 9, 1), 'Labor Day'),
+        (nth('Mon', 10, 2), 'Columbus Day'),
+        (observed(11, 11), 'Veterans Day'),
+        (nth('Thu', 11, 4), 'Thanksgiving Day'),
+        (observed(12, 25), 'Christmas Day'),
+    ]
+
+
+def seed_federal_holidays(years):
+    """Add federal holidays for `years` that are not already in the table. Commits.
+
+    Returns:
+        number of holidays added
+    """
+    existing = {d for (d,) in db.session.query(Holiday.date)}
+    added = 0
+    for year in years:
+        for d, name in federal_holidays(year):
+            if d not in existing:
+                db.session.add(Holiday(date=d, name=name, is_federal=True))
+                existing.add(d)
+                added += 1
+    if added:
+        bump_rules_version()
+    db.session.commit()
+    return added
+
+
+def default_holiday_years(today=None):
+    """Last year through two years ahead."""
+    year = (today or date.today()).year
+    return range(year - 1, year + 3)
+
+
+def _write_due_dates(model, rows, schedule):
+    """Set due_date on `rows` from (start, sla_days) pairs with one executemany UPDATE."""
+    if not rows:
+        return 0
+    dates = due_dates([start for start, _ in schedule], [days for _, days in schedule])
+    table = model.__table__
+    db.session.execute(
+        update(table).where(table.c.id == bindparam('row_id')).values(due_date=bindparam('due')),
+        [{'row_id': r.id, 'due': d} for r, d in zip(rows, dates)],
+    )
+    return len(rows)
@@ -0,0 +1,198 @@
+"""
+SLA Sweeper — finds overdue approval steps and advisories and escalates them.
+
+Active approval steps and pending advisory inputs carry a due_date, and
+both tables are indexed on (status, due_date), so overdue rows are found
+with one range query each instead of loading every open row.
+
+sweep_sla() stamps overdue_since on each newly overdue row and sends one
+'sla_escalation' notification to the escalation role. Stamped rows are
+skipped on later sweeps, so each breach escalates once. If a due date is
+pushed back past now the stamp is cleared and a later breach escalates
+again.
+
+Escalation targets come from ApprovalTemplateStep.escalation_to (by the
+request's pipeline template) and AdvisoryTriggerRule.escalation_to. They
+hold job titles from the rules workbook (e.g. 'Division Chief', 'CFO'),
+which ESCALATION_ROLE_MAP maps to system roles. A breach with no target,
+or a title that maps to no role, escalates to admins.
+
+The maintenance worker runs the sweep every SWEEP_INTERVAL seconds;
+`flask sweep-sla` runs it on demand.
+"""
+
+from datetime import datetime
+from sqlalchemy import update
+from app.extensions import db
+from app.models.activity import ActivityLog
+from app.models.advisory import AdvisoryInput
+from app.models.approval import ApprovalStep
+from app.models.request import AcquisitionRequest
+from app.services.action_holder import PENDING_ADVISORY_STATUSES, find_trigger_rule
+from app.services.approval_templates import get_template_graph
+from app.services.notifications import notify_users_by_role
+
+SWEEP_INTERVAL = 5 * 60
+DEFAULT_BATCH_SIZE = 200
+FALLBACK_ESCALATION_ROLE = 'admin'
+
+ROLES = (
+    'admin', 'requestor', 'branch_chief', 'cto', 'scrm', 'budget',
+    'ko', 'legal', 'sb', 'cio', 'section508',
+)
+
+# Escalation titles used in the rules workbook -> the role that receives them
+ESCALATION_ROLE_MAP = {
+    'Division Chief': 'branch_chief',
+    'Acq Division Chief': 'branch_chief',
+    'Agency Head': 'branch_chief',
+    'PM': 'branch_chief',
+    'Deputy PM': 'branch_chief',
+    'CFO': 'budget',
+    'FM': 'budget',
+    'FM Lead': 'budget',
+    'Lead KO': 'ko',
+    'Deputy GC': 'legal',
+    'Deputy CIO': 'cio',
+    'ISSM': 'cio',
+    '508 Coordinator': 'cio',
+    'Deputy CTO': 'cto',
+    'SCRM Lead': 'scrm',
+    'SBO Lead': 'sb',
+}
+
+
+def escalation_role(escalation_to):
+    """System role for a configured escalation target."""
+    if not escalation_to:
+        return FALLBACK_ESCALATION_ROLE
+    title = escalation_to.strip()
+    if title in ESCALATION_ROLE_MAP:
+        return ESCALATION_ROLE_MAP[title]
+    key = title.lower().replace(' ', '_')
+    return key if key in ROLES else FALLBACK_ESCALATION_ROLE
+
+
+def sweep_sla(now=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Stamp and escalate newly overdue approval steps and advisories.
+
+    Each batch is claimed with UPDATE ... WHERE overdue_since IS NULL and
+    committed together with its notifications; a sweeper that loses the
+    claim race rolls back. Commits.
+
+    Returns:
+        dict with the number of approvals and advisories escalated and the
+        number of stale stamps cleared
+    """
+    now = now or datetime.utcnow()
+    report = {'approvals': 0, 'advisories': 0, 'cleared': 0}
+
+    report['cleared'] += ApprovalStep.query.filter(
+        ApprovalStep.status == 'active',
+        ApprovalStep.overdue_since.isnot(None),
+        ApprovalStep.due_date >= now,
+    ).update({'overdue_since': None}, synchronize_session=False)
+    report['cleared'] += AdvisoryInput.query.filter(
+        AdvisoryInput.status.in_(PENDING_ADVISORY_STATUSES),
+        AdvisoryInput.overdue_since.isnot(None),
+        AdvisoryInput.due_date >= now,
+    ).update({'overdue_since': None}, synchronize_session=False)
+    db.session.commit()
+
+    while True:
+        steps = ApprovalStep.query.filter(
+            ApprovalStep.status == 'active',
+            ApprovalStep.due_date < now,
+            ApprovalStep.overdue_since.is_(None),
+        ).order_by(ApprovalStep.id).limit(batch_size).all()
+        if not steps:
+            break
+        if not _claim(ApprovalStep, steps, now):
+            continue
+        _escalate_steps(steps)
+        db.session.commit()
+        report['approvals'] += len(steps)
+
+    rule_cache = {}
+    while True:
+        advisories = AdvisoryInput.query.filter(
+            AdvisoryInput.status.in_(PENDING_ADVISORY_STATUSES),
+            AdvisoryInput.due_date < now,
+            AdvisoryInput.overdue_since.is_(None),
+        ).order_by(AdvisoryInput.id).limit(batch_size).all()
+        if not advisories:
+            break
+        if not _claim(AdvisoryInput, advisories, now):
+            continue
+        _escalate_advisories(advisories, rule_cache)
+        db.session.commit()
+        report['advisories'] += len(advisories)
+
+    return report
+
+
+def _claim(model, rows, now):
+    """Stamp overdue_since on `rows`; False (rolled back) if another sweeper got any first."""
+    ids = [r.id for r in rows]
+    claimed = db.session.execute(
+        update(model).where(model.id.in_(ids), model.overdue_since.is_(None))
+        .values(overdue_since=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if claimed != len(ids):
+        db.session.rollback()
+        return False
+    return True
+
+
+def _load_requests(request_ids):
+    return {
+        r.id: r for r in db.session.query(
+            AcquisitionRequest.id, AcquisitionRequest.title,
+            AcquisitionRequest.request_number, AcquisitionRequest.derived_pipeline,
+        ).filter(AcquisitionRequest.id.in_(set(request_ids)))
+    }
+
+
+def _escalate_steps(steps):
+    requests = _load_requests(s.request_id for s in steps)
+    graph = get_template_graph()
+    for s in steps:
+        r = requests.get(s.request_id)
+        if not r:
+            continue
+        template = graph.by_pipeline.get(r.derived_pipeline) if r.derived_pipeline else None
+        role = escalation_role(template.escalation_to(s.step_number) if template else None)
+        _escalate(
+            r, role, f'Overdue: {s.step_name}',
+            f'{s.step_name} ({s.approver_role}) was due {s.due_date:%Y-%m-%d}',
+        )
+
+
+def _escalate_advisories(advisories, rule_cache):
+    requests = _load_requests(a.request_id for a in advisories)
+    for a in advisories:
+        r = requests.get(a.request_id)
+        if not r:
+            continue
+        if a.team not in rule_cache:
+            rule = find_trigger_rule(a.team)
+            rule_cache[a.team] = rule.escalation_to if rule else None
+        role = escalation_role(rule_cache[a.team])
+        _escalate(
+            r, role, f'Overdue: {a.team.upper()} advisory review',
+            f'{a.team.upper()} advisory review was due {a.due_date:%Y-%m-%d}',
+        )
+
+
+def _escalate(r, role, title, what):
+    notify_users_by_role(
+        role, r.id, 'sla_escalation', title,
+        f'Request "{r.title}" ({r.request_number}): {what} and is still open.'
+    )
+    db.session.add(ActivityLog(
+        request_id=r.id,
+        activity_type='sla_escalated',
+        description=f'{what}; escalated to {role}',
+        actor='System',
+    ))
@@ -0,0 +1,82 @@
+"""
+Threshold Snapshot — dollar thresholds (micro-purchase, SAT, etc.) loaded
+once per rules version and shared by derivation, execution funding and
+forecasts.
+
+ThresholdConfig rows only change on a rules import or an admin edit, both of
+which bump the rules version, so callers never need to query the table
+themselves.
+"""
+
+from app.models.threshold import ThresholdConfig
+from app.services.rules_cache import get_cached
+
+DEFAULT_THRESHOLDS = {
+    'micro_purchase': 15000,
+    'simplified_acquisition': 350000,
+    'above_sat': 9000000,
+    'ja_threshold': 900000,
+}
+
+
+class ThresholdSnapshot:
+    """Immutable view of the threshold table, keyed by normalized name."""
+
+    def __init__(self, limits):
+        self._limits = dict(limits)
+
+    def get(self, name, default=None):
+        return self._limits.get(name, default)
+
+    @property
+    def micro_purchase(self):
+        return self._limits.get('micro_purchase', DEFAULT_THRESHOLDS['micro_purchase'])
+
+    @property
+    def simplified_acquisition(self):
+        return self._limits.get('simplified_acquisition', DEFAULT_THRESHOLDS['simplified_acquisition'])
+
+    @property
+    def above_sat(self):
+        return self._limits.get('above_sat', DEFAULT_THRESHOLDS['above_sat'])
+
+    def tier_for(self, estimated_value):
+        """Determine tier (micro, sat, above_sat, major) for a dollar value."""
+        value = float(estimated_value or 0)
+        if value <= self.micro_purchase:
+            return 'micro'
+        elif value <= self.simplified_acquisition:
+            return 'sat'
+        elif value <= self.above_sat:
+            return 'above_sat'
+        else:
+            return 'major'
+
+
+def get_threshold_snapshot():
+    """Return the ThresholdSnapshot for the current rules version.
+
+    Falls back to the FAR defaults (uncached) if the table cannot be read.
+    """
+    try:
+        return get_cached('thresholds', _build_snapshot)
+    except Exception:
+        return ThresholdSnapshot(DEFAULT_THRESHOLDS)
+
+
+def _build_snapshot():
+    result = {}
+    for c in ThresholdConfig.query.order_by(ThresholdConfig.id).all():
+        # Map various name formats to the expected keys
+        name = c.name.lower()
+        if 'micro' in name:
+            result['micro_purchase'] = c.dollar_limit
+        elif 'simplified' in name or name == 'simplified_acquisition':
+            result['simplified_acquisition'] = c.dollar_limit
+        elif 'above_sat' in name:
+            result['above_sat'] = c.dollar_limit
+        elif 'ja_ko' in name or name == 'ja_threshold':
+            result['ja_threshold'] = c.dollar_limit
+        else:
+            result[c.name] = c.dollar_limit
+    return ThresholdSnapshot(result)
@@ -0,0 +1,96 @@
+"""
+Unread Counter — per-user unread notification counts in notification_counters.
+
+Every path that inserts notifications calls add_unread() in the same
+transaction; mark_read/mark_all_read call remove_unread() with the number of
+rows they actually flipped. /api/notifications/unread-count then reads one
+primary-key row instead of counting notifications.
+
+reconcile_unread_counts() recounts from the notifications table and repairs
+any drift. The maintenance worker runs it every RECONCILE_INTERVAL seconds;
+`flask reconcile-unread-counts` runs it on demand.
+"""
+
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import func, select, update
+from app.extensions import db, dialect_insert
+from app.models.notification import Notification, NotificationCounter
+
+RECONCILE_INTERVAL = 15 * 60
+
+
+def get_unread_count(user_id):
+    """The user's unread count (0 when they have never had a notification)."""
+    count = db.session.query(NotificationCounter.unread_count).filter_by(user_id=user_id).scalar()
+    return count or 0
+
+
+def add_unread(user_ids):
+    """Increment the counters for an iterable of recipient user ids (repeats count twice)."""
+    deltas = Counter(user_ids)
+    if not deltas:
+        return
+    now = datetime.utcnow()
+    stmt = dialect_insert()(NotificationCounter)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[NotificationCounter.user_id],
+        set_={
+            'unread_count': NotificationCounter.unread_count + stmt.excluded.unread_count,
+            'updated_at': now,
+        },
+    )
+    db.session.execute(stmt, [
+        {'user_id': user_id, 'unread_count': n, 'updated_at': now}
+        for user_id, n in sorted(deltas.items())
+    ])
+
+
+def remove_unread(user_id, count):
+    """Decrement a user's counter by `count` notifications that were marked read."""
+    if count <= 0:
+        return
+    db.session.execute(
+        update(NotificationCounter)
+        .where(NotificationCounter.user_id == user_id)
+        .values(unread_count=NotificationCounter.unread_count - count, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+
+def reconcile_unread_counts():
+    """Recount unread notifications per user and fix counters that drifted.
+
+    Drifted counters are rewritten with a correlated subquery, so the value
+    written is counted in the same statement that writes it. Commits.
+
+    Returns:
+        dict with the number of counters checked and the ids of users whose
+        counter was repaired
+    """
+    actual = dict(db.session.query(Notification.user_id, func.count()).filter(
+        Notification.is_read.is_(False)
+    ).group_by(Notification.user_id).all())
+    stored = dict(db.session.query(NotificationCounter.user_id, NotificationCounter.unread_count).all())
+
+    drifted = sorted(u for u in set(actual) | set(stored) if actual.get(u, 0) != stored.get(u, 0))
+    missing = [u for u in drifted if u not in stored]
+    if missing:
+        now = datetime.utcnow()
+        db.session.execute(
+            dialect_insert()(NotificationCounter).on_conflict_do_nothing(),
+            [{'user_id': u, 'unread_count': 0, 'updated_at': now} for u in missing],
+        )
+    if drifted:
+        recount = select(func.count()).select_from(Notification).where(
+            Notification.user_id == NotificationCounter.user_id,
+            Notification.is_read.is_(False),
+        ).scalar_subquery()
+        db.session.execute(
+            update(NotificationCounter)
+            .where(NotificationCounter.user_id.in_(drifted))
+            .values(unread_count=recount, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+    db.session.commit()
+    return {'checked': len(set(actual) | set(stored)), 'repaired': drifted}
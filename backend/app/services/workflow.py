@@ -8,13 +8,16 @@ Now supports template_key-based selection (from IntakePath derivation)
 in addition to pipeline_type fallback.
 """
 
-import json
-from datetime import datetime, timedelta
+from datetime import datetime
 from app.extensions import db
-from app.models.approval import ApprovalTemplate, ApprovalTemplateStep, ApprovalStep
+from app.models.approval import ApprovalStep
 from app.models.request import AcquisitionRequest
 from app.models.activity import ActivityLog
+from app.services.action_holder import set_current_step
+from app.services.approval_templates import DEFAULT_SLA_DAYS, get_template_graph
+from app.services.dashboard_rollup import record_deletes
 from app.services.notifications import notify_users_by_role, notify_requestor
+from app.services.sla_calendar import due_date
 
 
 def select_template(request, template_key=None):
@@ -30,11 +33,13 @@ def select_template(request, template_key=None):
         template_key: Optional specific template key from derivation
 
     Returns:
-        ApprovalTemplate or None
+        TemplateNode (cached snapshot of the ApprovalTemplate) or None
     """
+    graph = get_template_graph()
+
     # Try template_key first (most specific)
     if template_key:
-        template = ApprovalTemplate.query.filter_by(template_key=template_key).first()
+        template = graph.by_key.get(template_key)
         if template:
             return template
 
@@ -43,8 +48,7 @@ def select_template(request, template_key=None):
     if not pipeline:
         return None
 
-    template = ApprovalTemplate.query.filter_by(pipeline_type=pipeline).first()
-    return template
+    return graph.by_pipeline.get(pipeline)
 
 
 def submit_request(request_id, template_key=None):
@@ -72,24 +76,16 @@ def submit_request(request_id, template_key=None):
         return {'error': f'No approval template found for pipeline: {request.derived_pipeline}'}
 
     # Clear any existing steps (for resubmission after return)
-    existing_steps = ApprovalStep.query.filter_by(request_id=request_id).all()
-    for step in existing_steps:
-        db.session.delete(step)
-    db.session.flush()
+    record_deletes(ApprovalStep, ApprovalStep.request_id == request_id)
+    ApprovalStep.query.filter_by(request_id=request_id).delete(synchronize_session='fetch')
 
     # Create steps from template, evaluating conditional steps (skip disabled gates)
-    template_steps = ApprovalTemplateStep.query.filter_by(
-        template_id=template.id,
-        is_enabled=True,
-    ).order_by(ApprovalTemplateStep.step_number).all()
-
-    active_step_number = 0
     created_steps = []
 
-    for ts in template_steps:
+    for ts in template.enabled_steps:
         # Evaluate conditional steps
-        if ts.is_conditional and ts.condition_rule:
-            if not _evaluate_step_condition(ts.condition_rule, request):
+        if ts.is_conditional:
+            if not ts.predicate(request):
                 # Create as skipped
                 step = ApprovalStep(
                     request_id=request_id,
@@ -115,13 +111,16 @@ def submit_request(request_id, template_key=None):
     db.session.flush()
 
     # Activate the first non-skipped step
+    active_step = None
     for step in created_steps:
         if step.status == 'pending':
             step.status = 'active'
             step.activated_at = datetime.utcnow()
-            step.due_date = datetime.utcnow() + timedelta(days=_get_sla_days(template, step.step_number))
+            step.due_date = due_date(step.activated_at, template.sla_days(step.step_number))
             request.status = _step_to_status(step.step_name)
+            active_step = step
             break
+    set_current_step(request, active_step)
 
     request.status = request.status if request.status != 'draft' else 'submitted'
 
@@ -205,9 +204,10 @@ def process_approval(step_id, action, actor_name, actor_id=None, comments=None):
             next_step.status = 'active'
             next_step.activated_at = now
             template = select_template(request)
-            sla = _get_sla_days(template, next_step.step_number) if template else 5
-            next_step.due_date = now + timedelta(days=sla)
+            sla = template.sla_days(next_step.step_number) if template else DEFAULT_SLA_DAYS
+            next_step.due_date = due_date(now, sla)
             request.status = _step_to_status(next_step.step_name)
+            set_current_step(request, next_step)
             log.new_value = request.status
 
             # Notify next approver
@@ -219,6 +219,7 @@ def process_approval(step_id, action, actor_name, actor_id=None, comments=None):
         else:
             # All steps complete — approved!
             request.status = 'approved'
+            set_current_step(request, None)
             log.new_value = 'approved'
             log_final = ActivityLog(
                 request_id=request.id,
@@ -244,6 +245,7 @@ def process_approval(step_id, action, actor_name, actor_id=None, comments=None):
         step.action_by_id = actor_id
         step.comments = comments
         request.status = 'cancelled'
+        set_current_step(request, None)
 
         log = ActivityLog(
             request_id=request.id,
@@ -268,6 +270,7 @@ def process_approval(step_id, action, actor_name, actor_id=None, comments=None):
         step.action_by_id = actor_id
         step.comments = comments
         request.status = 'returned'
+        set_current_step(request, None)
 
         log = ActivityLog(
             request_id=request.id,
@@ -390,50 +393,3 @@ def _step_to_status(step_name):
     }
     return name_map.get(step_name, 'submitted')
 
-
-def _get_sla_days(template, step_number):
-    """Get SLA days for a specific step from the template."""
-    if not template:
-        return 5
-    ts = ApprovalTemplateStep.query.filter_by(
-        template_id=template.id,
-        step_number=step_number,
-    ).first()
-    return ts.sla_days if ts else 5
-
-
-def _evaluate_step_condition(condition_json, request):
-    """Evaluate whether a conditional step applies to this request."""
-    try:
-        conditions = json.loads(condition_json) if isinstance(condition_json, str) else condition_json
-    except (json.JSONDecodeError, TypeError):
-        return True  # If we can't parse, include the step
-
-    if 'allOf' in conditions:
-        return all(_eval_single(c, request) for c in conditions['allOf'])
-    if 'anyOf' in conditions:
-        return any(_eval_single(c, request) for c in conditions['anyOf'])
-    return _eval_single(conditions, request)
-
-
-def _eval_single(condition, request):
-    """Evaluate a single condition."""
-    field = condition.get('field')
-    operator = condition.get('operator')
-    if not field or not operator:
-        return True
-
-    value = getattr(request, field, None)
-
-    if operator == 'in':
-        return value in condition.get('values', [])
-    if operator == 'not_in':
-        return value not in condition.get('values', [])
-    if operator == '==':
-        return value == condition.get('value')
-    if operator == '!=':
-        return value != condition.get('value')
-    if operator == 'exists':
-        return value is not None
-
-    return True
@@ -87,6 +87,16 @@ with app.app_context():
                     ))
             db.session.commit()
 
+        # Migration: create rules_versions table if missing
+        if 'rules_versions' not in tables:
+            from app.models.rules_version import RulesVersion
+            RulesVersion.__table__.create(db.engine)
+
+        # Migration: create derivation_tables table if missing
+        if 'derivation_tables' not in tables:
+            from app.models.derivation_table import DerivationTable
+            DerivationTable.__table__.create(db.engine)
+
         # Migration: add project/task columns to LOA table
         loa_cols = [c['name'] for c in inspector.get_columns('lines_of_accounting')]
         if 'project' not in loa_cols:
@@ -101,3 +111,151 @@ with app.app_context():
             db.session.execute(text("ALTER TABLE demand_forecasts ADD COLUMN clin_number VARCHAR(50)"))
             db.session.execute(text("ALTER TABLE demand_forecasts ADD COLUMN color_of_money VARCHAR(30)"))
             db.session.commit()
+
+        # Migration: add denormalized action holder columns to requests and backfill them
+        req_cols = [c['name'] for c in inspector.get_columns('acquisition_requests')]
+        if 'current_step_id' not in req_cols:
+            db.session.execute(text("ALTER TABLE acquisition_requests ADD COLUMN current_step_id INTEGER"))
+            db.session.execute(text("ALTER TABLE acquisition_requests ADD COLUMN current_step_role VARCHAR(50)"))
+            db.session.execute(text("ALTER TABLE acquisition_requests ADD COLUMN pending_advisory_teams VARCHAR(200)"))
+            db.session.execute(text("ALTER TABLE acquisition_requests ADD COLUMN advisory_info_requested BOOLEAN DEFAULT 0"))
+            db.session.commit()
+            from app.services.action_holder import backfill_action_holders
+            backfill_action_holders()
+
+        # Migration: create notification_events outbox and link notifications to it
+        if 'notification_events' not in tables:
+            from app.models.notification_event import NotificationEvent
+            NotificationEvent.__table__.create(db.engine)
+        notif_cols = [c['name'] for c in inspector.get_columns('notifications')]
+        if 'event_id' not in notif_cols:
+            db.session.execute(text("ALTER TABLE notifications ADD COLUMN event_id INTEGER REFERENCES notification_events(id)"))
+            db.session.execute(text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS uix_notification_event_user ON notifications (event_id, user_id)"
+            ))
+            db.session.commit()
+
+        # Migration: create stream_events relay table if missing
+        if 'stream_events' not in tables:
+            from app.models.stream_event import StreamEvent
+            StreamEvent.__table__.create(db.engine)
+
+        # Migration: create per-user unread counters and fill them
+        if 'notification_counters' not in tables:
+            from app.models.notification import NotificationCounter
+            from app.services.unread_counter import reconcile_unread_counts
+            NotificationCounter.__table__.create(db.engine)
+            reconcile_unread_counts()
+
+        # Migration: notification archive table and the composite inbox index
+        if 'notifications_archive' not in tables:
+            from app.models.notification import NotificationArchive
+            NotificationArchive.__table__.create(db.engine)
+        notif_indexes = [ix['name'] for ix in inspector.get_indexes('notifications')]
+        if 'ix_notifications_user_read_created' not in notif_indexes:
+            db.session.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_notifications_user_read_created "
+                "ON notifications (user_id, is_read, created_at)"
+            ))
+            # The composite index's leading column covers user_id lookups
+            db.session.execute(text("DROP INDEX IF EXISTS ix_notifications_user_id"))
+            db.session.commit()
+
+        # Migration: SLA due dates / overdue stamps on approvals and advisories
+        step_cols = [c['name'] for c in inspector.get_columns('approval_steps')]
+        if 'overdue_since' not in step_cols:
+            db.session.execute(text("ALTER TABLE approval_steps ADD COLUMN overdue_since DATETIME"))
+            db.session.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_approval_steps_status_due ON approval_steps (status, due_date)"
+            ))
+            db.session.commit()
+        adv_cols = [c['name'] for c in inspector.get_columns('advisory_inputs')]
+        if 'due_date' not in adv_cols:
+            db.session.execute(text("ALTER TABLE advisory_inputs ADD COLUMN due_date DATETIME"))
+            db.session.execute(text("ALTER TABLE advisory_inputs ADD COLUMN overdue_since DATETIME"))
+            db.session.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_advisory_inputs_status_due ON advisory_inputs (status, due_date)"
+            ))
+            db.session.commit()
+            from app.services.sla_calendar import backfill_advisory_due_dates
+            backfill_advisory_due_dates()
+
+        # Migration: holiday calendar and business-day due dates
+        exec_cols = [c['name'] for c in inspector.get_columns('clin_execution_requests')]
+        if 'submitted_date' not in exec_cols:
+            db.session.execute(text("ALTER TABLE clin_execution_requests ADD COLUMN submitted_date DATETIME"))
+            db.session.execute(text("ALTER TABLE clin_execution_requests ADD COLUMN due_date DATETIME"))
+            # Best available start for requests submitted before the column existed
+            db.session.execute(text(
+                "UPDATE clin_execution_requests SET submitted_date = requested_date WHERE status != 'draft'"
+            ))
+            db.session.commit()
+        if 'holidays' not in tables:
+            from app.models.holiday import Holiday
+            from app.services.sla_calendar import default_holiday_years, recompute_open_due_dates, seed_federal_holidays
+            Holiday.__table__.create(db.engine)
+            seed_federal_holidays(default_holiday_years())
+            recompute_open_due_dates()
+
+        # Migration: dashboard rollup tables, built from the current rows
+        if 'request_rollups' not in tables:
+            from app.models.dashboard_rollup import AdvisoryRollup, ApprovalRollup, RequestRollup
+            from app.services.dashboard_rollup import reconcile_rollups
+            for model in (RequestRollup, ApprovalRollup, AdvisoryRollup):
+                model.__table__.create(db.engine, checkfirst=True)
+            reconcile_rollups()
+
+        # Migration: (status, created_at) index for per-gate request pages
+        db.session.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_acquisition_requests_status_created "
+            "ON acquisition_requests (status, created_at)"
+        ))
+        db.session.commit()
+
+        # Migration: cycle-time samples/stats, filled from the existing history
+        db.session.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_activity_logs_request_type ON activity_logs (request_id, activity_type)"
+        ))
+        db.session.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_approval_steps_acted_on ON approval_steps (acted_on_date)"
+        ))
+        db.session.commit()
+        if 'cycle_time_stats' not in tables:
+            from app.models.cycle_time import CycleTimeSample, CycleTimeStat
+            from app.services.cycle_time import refresh_cycle_time_stats
+            CycleTimeSample.__table__.create(db.engine, checkfirst=True)
+            CycleTimeStat.__table__.create(db.engine)
+            refresh_cycle_time_stats()
+
+        # Migration: daily dashboard snapshots, backfilled from the activity log
+        if 'dashboard_snapshots' not in tables:
+            from datetime import datetime, timedelta
+            from app.models.dashboard_snapshot import DashboardSnapshot
+            from app.services.dashboard_snapshot import DEFAULT_BACKFILL_DAYS, backfill_snapshots, take_snapshot
+            DashboardSnapshot.__table__.create(db.engine)
+            backfill_snapshots(datetime.utcnow().date() - timedelta(days=DEFAULT_BACKFILL_DAYS))
+            take_snapshot()
+
+        # Migration: shared response cache tables (RESPONSE_CACHE_BACKEND=database)
+        if 'cache_generations' not in tables:
+            from app.models.response_cache import CacheGeneration, ResponseCacheEntry
+            CacheGeneration.__table__.create(db.engine)
+            ResponseCacheEntry.__table__.create(db.engine, checkfirst=True)
+
+        # Migration: full-text search index over requests (FTS5 / tsvector)
+        search_ready = (
+            'request_search' in tables if db.engine.dialect.name == 'sqlite'
+            else 'search_vector' in [c['name'] for c in inspector.get_columns('acquisition_requests')]
+        )
+        if not search_ready:
+            from app.services.request_search import rebuild_search_index
+            rebuild_search_index()
+
+    # Load the precomputed intake decision table and approval templates before serving requests
+    try:
+        from app.services.decision_table import get_decision_table
+        from app.services.approval_templates import get_template_graph
+        get_decision_table()
+        get_template_graph()
+    except Exception as e:
+        print(f'  WARNING: Could not load rule caches: {e}')
@@ -3,6 +3,8 @@ import client from './client';
 export const dashboardApi = {
   metrics: () => client.get('/dashboard').then(r => r.data),
   pipeline: () => client.get('/dashboard/pipeline').then(r => r.data),
+  pipelineGate: (gate: string, page = 1, perPage = 100) =>
+    client.get(`/dashboard/pipeline/${gate}/requests`, { params: { page, per_page: perPage } }).then(r => r.data),
   cycleTime: () => client.get('/dashboard/cycle-time').then(r => r.data),
   funding: () => client.get('/dashboard/funding').then(r => r.data),
   drilldownApprovals: (overdueOnly = false) =>
@@ -9,4 +9,6 @@ export const notificationsApi = {
     client.post(`/notifications/${notificationId}/read`).then(r => r.data),
   markAllRead: () =>
     client.post('/notifications/mark-all-read').then(r => r.data),
+  streamTicket: () =>
+    client.post('/stream/ticket').then(r => r.data as { ticket: string; expires_in: number }),
 };
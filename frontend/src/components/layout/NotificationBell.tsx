@@ -2,6 +2,7 @@ import { useState, useEffect, useRef, useCallback } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { Bell, Check, CheckCheck, AlertCircle, ArrowRight, FileCheck, MessageSquare } from 'lucide-react';
 import { notificationsApi } from '../../api/notifications';
+import { useStream, isStreamOpen } from '../../hooks/useStream';
 import type { Notification } from '../../types';
 
 const POLL_INTERVAL = 30000;
@@ -24,6 +25,8 @@ function getIcon(type: string) {
       return <MessageSquare size={16} className="text-eaw-warning" />;
     case 'info_provided':
       return <FileCheck size={16} className="text-eaw-info" />;
+    case 'sla_escalation':
+      return <AlertCircle size={16} className="text-eaw-danger" />;
     default:
       return <Bell size={16} className="text-gray-400" />;
   }
@@ -58,9 +61,15 @@ export default function NotificationBell() {
     }
   }, []);
 
+  // New notifications arrive over the stream; polling is only a fallback
+  useStream('notification', fetchUnreadCount);
+  useStream('resync', fetchUnreadCount);
+
   useEffect(() => {
     fetchUnreadCount();
-    const interval = setInterval(fetchUnreadCount, POLL_INTERVAL);
+    const interval = setInterval(() => {
+      if (!isStreamOpen()) fetchUnreadCount();
+    }, POLL_INTERVAL);
     return () => clearInterval(interval);
   }, [fetchUnreadCount]);
 
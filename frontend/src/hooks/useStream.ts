@@ -0,0 +1,92 @@
+import { useEffect, useRef } from 'react';
+import { notificationsApi } from '../api/notifications';
+
+export type StreamEventName = 'notification' | 'queue_changed' | 'resync';
+
+type Handler = (data: any) => void;
+
+const EVENTS: StreamEventName[] = ['notification', 'queue_changed', 'resync'];
+const handlers = new Map<StreamEventName, Set<Handler>>();
+let source: EventSource | null = null;
+let sourceToken: string | null = null;
+let connecting = false;
+
+/** True while the shared /api/stream connection is open. */
+export function isStreamOpen(): boolean {
+  return source?.readyState === EventSource.OPEN;
+}
+
+function hasHandlers(): boolean {
+  return Array.from(handlers.values()).some(set => set.size > 0);
+}
+
+function connect() {
+  const token = localStorage.getItem('acql_token');
+  if (sourceToken === token && (source || connecting)) return;
+  source?.close();
+  source = null;
+  sourceToken = token;
+  if (!token || typeof EventSource === 'undefined') return;
+
+  // The URL carries a short-lived stream ticket, not the access token,
+  // which would otherwise end up in access logs
+  connecting = true;
+  notificationsApi.streamTicket()
+    .then(({ ticket }) => {
+      connecting = false;
+      if (sourceToken === token && !source && hasHandlers()) open(ticket);
+    })
+    .catch(() => {
+      connecting = false;
+    });
+}
+
+function open(ticket: string) {
+  // One connection per tab, shared by every subscriber
+  const es = new EventSource(`/api/stream?ticket=${encodeURIComponent(ticket)}`);
+  source = es;
+  for (const name of EVENTS) {
+    es.addEventListener(name, (e) => {
+      const data = JSON.parse((e as MessageEvent).data || '{}');
+      handlers.get(name)?.forEach(h => h(data));
+    });
+  }
+  // Reconnects reuse the URL; once the ticket has expired the server
+  // refuses it and the browser stops retrying, so fetch a fresh one
+  es.addEventListener('error', () => {
+    if (source !== es || es.readyState !== EventSource.CLOSED) return;
+    source = null;
+    sourceToken = null;
+    setTimeout(() => {
+      if (hasHandlers()) connect();
+    }, 5000);
+  });
+}
+
+function disconnectIfUnused() {
+  if (!hasHandlers()) {
+    source?.close();
+    source = null;
+    sourceToken = null;
+  }
+}
+
+/**
+ * Subscribe to a server-sent event. The handler is called with the event's
+ * JSON payload; 'resync' fires when the server dropped events for this tab.
+ */
+export function useStream(name: StreamEventName, handler: Handler) {
+  const ref = useRef(handler);
+  ref.current = handler;
+
+  useEffect(() => {
+    const h: Handler = (data) => ref.current(data);
+    if (!handlers.has(name)) handlers.set(name, new Set());
+    handlers.get(name)!.add(h);
+    connect();
+    return () => {
+      handlers.get(name)!.delete(h);
+      disconnectIfUnused();
+    };
+  }, [name]);
+}
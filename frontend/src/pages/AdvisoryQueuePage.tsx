@@ -4,6 +4,7 @@ import { Shield, Send, MessageSquare, Clock, Download } from 'lucide-react';
 import { advisoryApi } from '../api/advisory';
 import StatusBadge from '../components/common/StatusBadge';
 import { ADVISORY_LABELS } from '../types';
+import { useStream } from '../hooks/useStream';
 
 interface AdvisoryData {
   id: number;
@@ -66,6 +67,8 @@ export default function AdvisoryQueuePage() {
   };
 
   useEffect(() => { loadQueue(); }, []);
+  useStream('queue_changed', (data) => { if (data.queue === 'advisory') loadQueue(); });
+  useStream('resync', loadQueue);
 
   const resetForm = () => {
     setActiveId(null);
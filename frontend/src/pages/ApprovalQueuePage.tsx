@@ -4,6 +4,7 @@ import { ClipboardCheck, Check, X } from 'lucide-react';
 import { approvalsApi } from '../api/approvals';
 import { useAuthStore } from '../store/authStore';
 import StatusBadge from '../components/common/StatusBadge';
+import { useStream } from '../hooks/useStream';
 
 interface QueueItem {
   id: number;
@@ -59,6 +60,8 @@ export default function ApprovalQueuePage() {
   };
 
   useEffect(() => { loadQueue(); }, []);
+  useStream('queue_changed', (data) => { if (data.queue === 'approvals') loadQueue(); });
+  useStream('resync', loadQueue);
 
   const handleAction = async (stepId: number, action: 'approve' | 'reject') => {
     await approvalsApi.action(stepId, { action, role: user?.role || '', comments });
@@ -13,7 +13,7 @@ import { useIsMobile } from '@/hooks/useIsMobile';
 interface Metrics {
   requests: { total: number; by_status: Record<string, number>; by_type: Record<string, number>; by_tier: Record<string, number>; total_value: number };
   approvals: { active: number; overdue: number };
-  advisories: { pending: number };
+  advisories: { pending: number; overdue: number };
   executions: { active: number };
   forecasts: { open: number };
 }
@@ -1,7 +1,6 @@
 import { useEffect, useState, useCallback } from 'react';
 import { BarChart3, Loader2 } from 'lucide-react';
 import { dashboardApi } from '../api/dashboard';
-import { requestsApi } from '../api/requests';
 import FundingBar from '../components/charts/FundingBar';
 import PipelineFlow from '../components/charts/PipelineFlow';
 import Modal from '../components/common/Modal';
@@ -98,9 +97,11 @@ export default function PipelineDashboardPage() {
     const gate = gateMap[stage];
     const statusKey = gate?.gate || stage;
     const label = STATUS_LABELS[statusKey] || stage;
-    openDrillDown(`Pipeline: ${label} (${gate?.count ?? '?'})`, () =>
-      requestsApi.list({ status: statusKey, per_page: '100' }),
-    );
+    openDrillDown(`Pipeline: ${label} (${gate?.count ?? '?'})`, async () => {
+      const data = await dashboardApi.pipelineGate(statusKey);
+      // eslint-disable-next-line @typescript-eslint/no-explicit-any
+      return (data.requests || []).map((r: any) => ({ ...r, tier: r.derived_tier, status: statusKey }));
+    });
   }, [gateMap, openDrillDown]);
 
   const handleFundingBarClick = useCallback((name: string) => {